@@ -0,0 +1,108 @@
+"""
+Chat Concurrency Benchmark
+
+This script measures how many chat streams per second the backend can serve when
+N clients stream from `/api/chat/global/stream` at the same time. It drives the
+real `chat_controller.stream_global_chat` generator, but swaps the OpenRouter
+client inside `ai_handler` for an offline fake upstream so no API key or network
+access is needed.
+
+Two upstream modes are compared:
+1. blocking: Every token waits with `time.sleep`, the way the old synchronous
+   `OpenAI` client blocked the event loop (the "before" numbers).
+2. async: Every token waits with `asyncio.sleep`, matching the AsyncOpenAI-based
+   `AIHandler` (the "after" numbers).
+
+Usage:
+    python Benchmarks/bench_chat_concurrency.py --streams 50 --tokens 20 --delay 0.01
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENROUTER_API_KEY", "benchmark-key")
+
+from Config.ai_config import ai_handler
+from Config.ai_admission import AdmissionController
+from Controllers import chat_controller
+
+
+def make_chunk(text: str):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class FakeStream:
+    def __init__(self, tokens: int, delay: float, blocking: bool):
+        self.tokens = tokens
+        self.delay = delay
+        self.blocking = blocking
+        self.sent = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.sent >= self.tokens:
+            raise StopAsyncIteration
+        if self.blocking:
+            time.sleep(self.delay)
+        else:
+            await asyncio.sleep(self.delay)
+        self.sent += 1
+        return make_chunk("tok ")
+
+    async def close(self):
+        pass
+
+
+class FakeCompletions:
+    def __init__(self, tokens: int, delay: float, blocking: bool):
+        self.tokens = tokens
+        self.delay = delay
+        self.blocking = blocking
+
+    async def create(self, model: str, messages: list, stream: bool = False, **kwargs):
+        return FakeStream(self.tokens, self.delay, self.blocking)
+
+
+def make_fake_client(tokens: int, delay: float, blocking: bool):
+    return SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(tokens, delay, blocking)))
+
+
+async def consume_stream(message: str):
+    frames = 0
+    async for _ in chat_controller.stream_global_chat(message):
+        frames += 1
+    return frames
+
+
+async def run_mode(streams: int, tokens: int, delay: float, blocking: bool):
+    ai_handler.client = make_fake_client(tokens, delay, blocking)
+    ai_handler.cache = None  # measure upstream streaming, not cache replay
+    ai_handler.admission = AdmissionController(default_limit=streams)  # no upstream cap
+    start = time.perf_counter()
+    await asyncio.gather(*(consume_stream(f"question {i}") for i in range(streams)))
+    elapsed = time.perf_counter() - start
+    return elapsed, streams / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel chat stream throughput benchmark")
+    parser.add_argument("--streams", type=int, default=50, help="Number of parallel chat streams")
+    parser.add_argument("--tokens", type=int, default=20, help="Tokens emitted per stream")
+    parser.add_argument("--delay", type=float, default=0.01, help="Upstream delay per token (seconds)")
+    args = parser.parse_args()
+
+    print(f"Streams: {args.streams} | Tokens/stream: {args.tokens} | Delay/token: {args.delay}s")
+    for label, blocking in (("before (blocking client)", True), ("after (async client)", False)):
+        elapsed, rps = asyncio.run(run_mode(args.streams, args.tokens, args.delay, blocking))
+        print(f"{label:<26} total={elapsed:7.3f}s  streams/sec={rps:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
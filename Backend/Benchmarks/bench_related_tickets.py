@@ -0,0 +1,89 @@
+"""
+Related Tickets Benchmark
+
+This script measures the in-process vector index behind
+`/api/tickets/{id}/related` on a synthetic collection (100k tickets by
+default). It needs no database: synthetic tickets are vectorized with the
+production `vectorize` and loaded into a `VectorIndex` directly.
+
+Reported numbers:
+1. build: Time to vectorize and index every ticket (the startup backfill cost).
+2. related: Per-lookup latency (p50/p95) of `VectorIndex.related`.
+3. batched: Per-query latency when `top_k` scores a batch of queries at once.
+
+Usage:
+    python Benchmarks/bench_related_tickets.py --tickets 100000 --lookups 500 --dim 256
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from Config.ticket_vectors import VectorIndex, vectorize
+
+WORDS = (
+    "neural network gradient descent podcast episode algebra matrix calculus physics "
+    "quantum python async database index query recursion proof theorem biology cell "
+    "history essay startup market design pattern compiler memory cache latency"
+).split()
+
+
+def make_ticket(i: int) -> dict:
+    rng = random.Random(i)
+    return {
+        "title": " ".join(rng.choices(WORDS, k=5)),
+        "description": " ".join(rng.choices(WORDS, k=40)),
+        "tags": rng.sample(WORDS, k=3),
+    }
+
+
+def report(label: str, samples: list):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{label:<10} p50={statistics.median(samples):7.2f}ms  p95={p95:7.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=32)
+    args = parser.parse_args()
+
+    index = VectorIndex(dim=args.dim)
+    started = time.perf_counter()
+    ids = [f"{i:024x}" for i in range(args.tickets)]
+    vectors = np.stack([vectorize(make_ticket(i), args.dim) for i in range(args.tickets)])
+    index.add_many(ids, vectors)
+    print(f"build      {args.tickets} tickets in {time.perf_counter() - started:.1f}s "
+          f"({index.matrix.nbytes / 1024 / 1024:.0f} MiB matrix)")
+
+    rng = random.Random(0)
+    samples = []
+    for _ in range(args.lookups):
+        ticket_id = rng.choice(ids)
+        t0 = time.perf_counter()
+        index.related(ticket_id, args.k)
+        samples.append((time.perf_counter() - t0) * 1000)
+    report("related", samples)
+
+    samples = []
+    for _ in range(max(1, args.lookups // args.batch)):
+        batch = [rng.choice(ids) for _ in range(args.batch)]
+        queries = np.stack([index.vector(ticket_id) for ticket_id in batch])
+        t0 = time.perf_counter()
+        index.top_k(queries, args.k, exclude=batch)
+        samples.append((time.perf_counter() - t0) * 1000 / args.batch)
+    report("batched", samples)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Serialization Benchmark
+
+This script compares the old and new JSON paths for ticket lists and chat SSE
+frames. It needs no database or network.
+
+Reported numbers:
+1. list/response_model: `posts_serializer` followed by FastAPI's response_model
+   step (validate every item against `List[TicketResponse]`, then dump JSON).
+2. list/stdlib: `posts_serializer` + `jsonable_encoder` + `json.dumps`, the
+   encoding path of a plain JSONResponse.
+3. list/fast: `posts_serializer` + `FastJSONResponse.render` (orjson, no
+   validation), which the ticket routes now return.
+4. sse/json.dumps vs sse/fast: Building N chat text frames with an f-string
+   around `json.dumps` (encoded to bytes like StreamingResponse does) vs the
+   pre-encoded `text_frame` template.
+
+Usage:
+    python Benchmarks/bench_serialization.py --tickets 10000 --frames 100000
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import datetime
+import argparse
+import statistics
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from pydantic import TypeAdapter
+from fastapi.encoders import jsonable_encoder
+from Schema.post_model import TicketResponse, posts_serializer
+from Config.fast_json import FastJSONResponse, text_frame
+
+WORDS = (
+    "neural network gradient descent podcast episode algebra matrix calculus physics "
+    "quantum python async database index query recursion proof theorem biology cell "
+    "history essay startup market design pattern compiler memory cache latency"
+).split()
+
+
+def make_document(i: int) -> dict:
+    rng = random.Random(i)
+    return {
+        "_id": ObjectId(),
+        "title": " ".join(rng.choices(WORDS, k=6)),
+        "description": " ".join(rng.choices(WORDS, k=60)),
+        "category": rng.choice(["AI", "Math", "Science", "Programming"]),
+        "tags": rng.sample(WORDS, k=3),
+        "ai_summary": " ".join(rng.choices(WORDS, k=40)),
+        "summary_status": "completed",
+        "created_at": datetime.datetime(2024, 1, 1) + datetime.timedelta(seconds=i),
+    }
+
+
+def timed(fn, repeat: int) -> list:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def report(label: str, samples: list, size: int = None):
+    extra = f"  {size / 1024:8.0f} KiB" if size is not None else ""
+    print(f"{label:<22} median={statistics.median(samples):8.2f}ms  min={min(samples):8.2f}ms{extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=10_000)
+    parser.add_argument("--frames", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    documents = [make_document(i) for i in range(args.tickets)]
+    adapter = TypeAdapter(List[TicketResponse])
+
+    def response_model():
+        return adapter.dump_json(adapter.validate_python(posts_serializer(documents)))
+
+    def stdlib():
+        return json.dumps(jsonable_encoder(posts_serializer(documents))).encode("utf-8")
+
+    def fast():
+        return FastJSONResponse(posts_serializer(documents)).body
+
+    print(f"Listing {args.tickets} tickets:")
+    report("list/response_model", timed(response_model, args.repeat), len(response_model()))
+    report("list/stdlib", timed(stdlib, args.repeat), len(stdlib()))
+    report("list/fast", timed(fast, args.repeat), len(fast()))
+
+    rng = random.Random(0)
+    tokens = [rng.choice(WORDS) + " " for _ in range(args.frames)]
+
+    def sse_stdlib():
+        return [f"data: {json.dumps({'text': token})}\n\n".encode("utf-8") for token in tokens]
+
+    def sse_fast():
+        return [text_frame(token) for token in tokens]
+
+    print(f"\nEmitting {args.frames} SSE frames:")
+    report("sse/json.dumps", timed(sse_stdlib, args.repeat))
+    report("sse/fast", timed(sse_fast, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
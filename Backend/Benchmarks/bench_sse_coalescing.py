@@ -0,0 +1,118 @@
+"""
+SSE Coalescing Benchmark
+
+This script measures what `TokenCoalescer` changes on the wire for one chat
+answer: how many SSE frames and bytes are written, the time to the first
+frame (TTFT), and how long each token waits before it is sent. It uses an
+offline fake upstream that emits one token per delta with a fixed gap, so no
+API key or network access is needed.
+
+Two modes are compared:
+1. per-delta: Every upstream delta becomes its own frame (max_chars=1), the
+   way `relay_stream` used to relay them.
+2. coalesced: Deltas are grouped with the configured SSE_COALESCE_CHARS /
+   SSE_COALESCE_DELAY.
+
+Frames are built exactly like `relay_stream` builds them (event ID line plus
+`text_frame`), so the byte counts match what clients receive.
+
+Usage:
+    python Benchmarks/bench_sse_coalescing.py --tokens 1000 --interval 0.002
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Config.fast_json import text_frame, with_event_id
+from Config.sse_coalescer import TokenCoalescer, SSE_COALESCE_CHARS, SSE_COALESCE_DELAY
+
+
+def make_chunk(text: str):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class FakeStream:
+    """Emits `tokens` single-token deltas, `interval` seconds apart, recording when each was sent."""
+
+    def __init__(self, tokens: int, interval: float):
+        self.tokens = tokens
+        self.interval = interval
+        self.sent_at = []
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if len(self.sent_at) >= self.tokens:
+            raise StopAsyncIteration
+        if self.sent_at:
+            await asyncio.sleep(self.interval)
+        self.sent_at.append(time.perf_counter())
+        return make_chunk("tok ")
+
+
+async def run(tokens: int, interval: float, max_chars: int, max_delay: float) -> dict:
+    upstream = FakeStream(tokens, interval)
+    coalescer = TokenCoalescer(upstream, max_chars=max_chars, max_delay=max_delay)
+    started = time.perf_counter()
+    first_frame = None
+    frames = 0
+    sent_bytes = 0
+    waits = []  # seconds between a token leaving the upstream and its frame being written
+    relayed = 0
+    async for text in coalescer:
+        if text is None:
+            continue
+        now = time.perf_counter()
+        if first_frame is None:
+            first_frame = now - started
+        frames += 1
+        sent_bytes += len(with_event_id(frames, text_frame(text)))
+        count = len(text) // len("tok ")
+        waits.extend(now - sent for sent in upstream.sent_at[relayed:relayed + count])
+        relayed += count
+    return {
+        "frames": frames,
+        "bytes": sent_bytes,
+        "ttft_ms": first_frame * 1000,
+        "wait_mean_ms": statistics.mean(waits) * 1000,
+        "wait_max_ms": max(waits) * 1000,
+        "total_ms": (time.perf_counter() - started) * 1000,
+    }
+
+
+def report(label: str, result: dict):
+    print(
+        f"{label:<11} frames={result['frames']:6d}  bytes={result['bytes'] / 1024:8.1f} KiB  "
+        f"ttft={result['ttft_ms']:6.2f}ms  token wait mean={result['wait_mean_ms']:6.2f}ms "
+        f"max={result['wait_max_ms']:6.2f}ms  total={result['total_ms']:8.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=1000)
+    parser.add_argument("--interval", type=float, default=0.002, help="Seconds between upstream deltas")
+    parser.add_argument("--chars", type=int, default=SSE_COALESCE_CHARS)
+    parser.add_argument("--delay", type=float, default=SSE_COALESCE_DELAY)
+    args = parser.parse_args()
+
+    print(f"Streaming {args.tokens} deltas, {args.interval * 1000:.1f}ms apart "
+          f"(coalescing: {args.chars} chars / {args.delay * 1000:.0f}ms):")
+    per_delta = asyncio.run(run(args.tokens, args.interval, 1, args.delay))
+    coalesced = asyncio.run(run(args.tokens, args.interval, args.chars, args.delay))
+    report("per-delta", per_delta)
+    report("coalesced", coalesced)
+    print(f"\n{per_delta['frames'] / coalesced['frames']:.1f}x fewer frames, "
+          f"{per_delta['bytes'] / coalesced['bytes']:.1f}x fewer bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Ticket Search Benchmark
+
+This script measures `/api/tickets/search` on a synthetic collection (100k
+tickets by default) against the previous approach of downloading the whole
+collection and filtering client-side. Unlike the chat benchmark it needs a real
+MongoDB: it connects to MONGODB_URI (or --uri), fills a scratch database
+(`ThinkBackBench` by default), runs the production `CreateIndexes()` and drives
+the real `post_controller.search_tickets`.
+
+Three query shapes are timed for each approach:
+1. text: Full-text query only.
+2. filtered: Full-text query plus a category and a tag filter.
+3. facets-only: Category + tag filters without text (first page, with facets).
+
+Usage:
+    python Benchmarks/bench_ticket_search.py --tickets 100000 --runs 20
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import datetime
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENROUTER_API_KEY", "benchmark-key")
+
+from motor.motor_asyncio import AsyncIOMotorClient
+import Config.db as db_module
+from Config.db import CreateIndexes
+from Controllers import post_controller
+from Schema.post_model import allowed
+
+WORDS = (
+    "neural network gradient descent podcast episode algebra matrix calculus physics "
+    "quantum python async database index query recursion proof theorem biology cell "
+    "history essay startup market design pattern compiler memory cache latency"
+).split()
+TAGS = [f"tag{i}" for i in range(200)]
+
+
+def make_ticket(i: int, now: datetime.datetime) -> dict:
+    rng = random.Random(i)
+    return {
+        "title": " ".join(rng.choices(WORDS, k=5)),
+        "description": " ".join(rng.choices(WORDS, k=40)),
+        "category": rng.choice(sorted(allowed)),
+        "tags": rng.sample(TAGS, k=3),
+        "image": None,
+        "ai_summary": " ".join(rng.choices(WORDS, k=25)),
+        "summary_status": "completed",
+        "created_at": now - datetime.timedelta(seconds=i),
+        "updated_at": now - datetime.timedelta(seconds=i),
+    }
+
+
+async def seed(db, count: int, batch: int = 5000):
+    await db.tickets.drop()
+    now = datetime.datetime.utcnow()
+    started = time.perf_counter()
+    for offset in range(0, count, batch):
+        await db.tickets.insert_many([make_ticket(i, now) for i in range(offset, min(count, offset + batch))])
+    print(f"seeded {count} tickets in {time.perf_counter() - started:.1f}s")
+
+
+def client_side_search(tickets: list, q: str = None, category: str = None, tag: str = None) -> list:
+    """What the frontend had to do: scan every downloaded ticket."""
+    words = (q or "").lower().split()
+    results = []
+    for t in tickets:
+        if category and t["category"] != category:
+            continue
+        if tag and tag not in t["tags"]:
+            continue
+        if words:
+            blob = f"{t['title']} {t['description']} {t['ai_summary']} {' '.join(t['tags'])}".lower()
+            if not any(w in blob for w in words):
+                continue
+        results.append(t)
+    return results[:50]
+
+
+async def timed(fn, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def report(label: str, samples: list):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{label:<32} p50={statistics.median(samples):8.1f}ms  p95={p95:8.1f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default=os.getenv("MONGODB_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--database", default="ThinkBackBench")
+    parser.add_argument("--tickets", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch database afterwards")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(args.uri)
+    db = client.get_database(args.database)
+    db_module.db = db  # point the controller at the scratch database
+    try:
+        await seed(db, args.tickets)
+        await CreateIndexes()
+
+        queries = {
+            "text": {"q": "quantum compiler"},
+            "filtered": {"q": "quantum compiler", "category": "Science", "tag": "tag7"},
+            "facets-only": {"category": "Math", "tag": "tag42"},
+        }
+        for name, params in queries.items():
+            async def indexed():
+                await post_controller.search_tickets(
+                    q=params.get("q"),
+                    categories=[params["category"]] if "category" in params else None,
+                    tags=[params["tag"]] if "tag" in params else None,
+                    view="list",
+                )
+            report(f"search endpoint [{name}]", await timed(indexed, args.runs))
+
+        async def download_all():
+            return await db.tickets.find({}).to_list(length=None)
+
+        # Baseline: full download once per run, then a client-side filter
+        runs = max(1, args.runs // 5)
+        for name, params in queries.items():
+            async def client_side():
+                client_side_search(await download_all(), **params)
+            report(f"download + client filter [{name}]", await timed(client_side, runs))
+    finally:
+        if not args.keep:
+            await client.drop_database(args.database)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""
+Tracing Overhead Benchmark
+
+This script measures what the instrumentation in Config/tracing.py costs per
+call, to check that it stays negligible next to the work it measures (a
+MongoDB round-trip or an upstream token take milliseconds). It needs no
+database or network.
+
+Reported numbers:
+1. span: One `with span(...)` block inside a request trace (histogram
+   observation plus the trace's span list).
+2. observe: One histogram observation on its own.
+3. stream/plain vs stream/traced: Iterating N fake upstream chunks directly vs
+   through `TracedStream` (TTFT, duration, throughput and token count).
+4. render: Rendering `/metrics` once the histograms hold many label sets.
+
+Usage:
+    python Benchmarks/bench_tracing_overhead.py --calls 200000 --chunks 100000
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Config import tracing
+from Config.tracing import Trace, TracedStream, span, span_seconds, render_metrics
+
+
+def make_chunk(text: str):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class FakeStream:
+    def __init__(self, chunks: int):
+        self.chunks = chunks
+        self.chunk = make_chunk("tok ")
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.chunks <= 0:
+            raise StopAsyncIteration
+        self.chunks -= 1
+        return self.chunk
+
+
+def per_call_ns(fn, calls: int) -> float:
+    started = time.perf_counter()
+    fn(calls)
+    return (time.perf_counter() - started) / calls * 1e9
+
+
+async def drain(stream) -> float:
+    started = time.perf_counter()
+    async for _ in stream:
+        pass
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--chunks", type=int, default=100_000)
+    args = parser.parse_args()
+
+    trace = Trace({"endpoint": None, "path": "/api/tickets/{ticket_id}"}, "bench")
+    tracing._current_trace.set(trace)
+
+    def spans(calls):
+        for _ in range(calls):
+            trace.spans.clear()
+            with span("db.get_ticket"):
+                pass
+
+    def observations(calls):
+        for _ in range(calls):
+            span_seconds.observe(0.003, "/api/tickets/{ticket_id}", "db.get_ticket")
+
+    def baseline(calls):
+        for _ in range(calls):
+            trace.spans.clear()
+
+    base = per_call_ns(baseline, args.calls)
+    print(f"span            {per_call_ns(spans, args.calls) - base:8.0f} ns/call")
+    print(f"observe         {per_call_ns(observations, args.calls):8.0f} ns/call")
+
+    plain = asyncio.run(drain(FakeStream(args.chunks)))
+    traced = asyncio.run(drain(TracedStream(FakeStream(args.chunks), "bench-model", time.perf_counter())))
+    print(f"stream/plain    {plain / args.chunks * 1e9:8.0f} ns/chunk")
+    print(f"stream/traced   {traced / args.chunks * 1e9:8.0f} ns/chunk  (+{(traced - plain) / args.chunks * 1e9:.0f} ns)")
+
+    for i in range(50):
+        for name in ("db.list_tickets", "db.search", "ai.connect", "ai.ttft"):
+            span_seconds.observe(0.01 * i, f"/api/route{i}", name)
+    started = time.perf_counter()
+    body = render_metrics()
+    print(f"render          {(time.perf_counter() - started) * 1000:8.2f} ms  ({len(body) / 1024:.0f} KiB, {body.count(chr(10))} lines)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+AI Admission Control Module
+
+This module caps how many simultaneous OpenRouter calls the process makes.
+Without a cap, a burst of requests gets rate-limited upstream, and the
+`AIHandler` fallback loop then multiplies that load across every model.
+
+Key Features:
+1. Per-Model Limits: Each model gets AI_MODEL_CONCURRENCY concurrent slots
+   (override per model with AI_MODEL_CONCURRENCY_MAP="model=4,other=2").
+   A streaming call holds its slot until the stream ends or is closed.
+2. Priority Queue: When a model is saturated, callers wait in a priority
+   queue. Interactive chat (PRIORITY_INTERACTIVE) is admitted before
+   background summaries (PRIORITY_BACKGROUND); ties are served FIFO.
+3. Load Shedding: The wait queue is bounded (AI_QUEUE_MAX_DEPTH) and each
+   priority has a maximum wait (AI_QUEUE_MAX_WAIT / AI_QUEUE_BACKGROUND_MAX_WAIT).
+   Requests beyond either limit fail fast with `AdmissionRejected`.
+4. Metrics: Queue depth, shed count and wait times are exposed via `stats()`.
+"""
+
+import os
+import time
+import heapq
+import asyncio
+from Config.logger import log_warning
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+BUSY_MESSAGE = "AI service is busy right now. Please try again in a few seconds."
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of being admitted upstream."""
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def parse_concurrency_map(raw: str) -> dict:
+    limits = {}
+    for item in (raw or "").split(","):
+        model, _, limit = item.partition("=")
+        try:
+            if model.strip():
+                limits[model.strip()] = max(1, int(limit))
+        except ValueError:
+            log_warning(f"Ignoring invalid AI_MODEL_CONCURRENCY_MAP entry: {item}")
+    return limits
+
+
+class ModelGate:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self.waiters = []  # heap of (priority, seq, future)
+
+
+class AdmissionController:
+    def __init__(self, default_limit: int = 8, limits: dict = None, max_depth: int = 100, max_wait: dict = None):
+        self.default_limit = default_limit
+        self.limits = limits or {}
+        self.max_depth = max_depth
+        self.max_wait = max_wait or {PRIORITY_INTERACTIVE: 5.0, PRIORITY_BACKGROUND: 60.0}
+        self.gates = {}
+        self.seq = 0
+        self.depth = 0
+        self.max_depth_seen = 0
+        self.admitted = 0
+        self.shed = 0
+        self.total_wait = 0.0
+        self.max_wait_seen = 0.0
+
+    def _gate(self, model: str) -> ModelGate:
+        gate = self.gates.get(model)
+        if gate is None:
+            gate = ModelGate(self.limits.get(model, self.default_limit))
+            self.gates[model] = gate
+        return gate
+
+    def _record_admit(self, waited: float):
+        self.admitted += 1
+        self.total_wait += waited
+        self.max_wait_seen = max(self.max_wait_seen, waited)
+
+    async def acquire(self, model: str, priority: int = PRIORITY_INTERACTIVE):
+        gate = self._gate(model)
+        if gate.active < gate.limit and not gate.waiters:
+            gate.active += 1
+            self._record_admit(0.0)
+            return
+
+        if self.depth >= self.max_depth:
+            self.shed += 1
+            log_warning(f"Shedding request for {model}: wait queue full ({self.depth}).")
+            raise AdmissionRejected(BUSY_MESSAGE)
+
+        future = asyncio.get_running_loop().create_future()
+        self.seq += 1
+        heapq.heappush(gate.waiters, (priority, self.seq, future))
+        self.depth += 1
+        self.max_depth_seen = max(self.max_depth_seen, self.depth)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(future, self.max_wait.get(priority, 5.0))
+        except asyncio.TimeoutError:
+            self.depth -= 1
+            self.shed += 1
+            log_warning(f"Shedding request for {model}: waited longer than {self.max_wait.get(priority)}s.")
+            raise AdmissionRejected(BUSY_MESSAGE)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as the caller went away
+                self.release(model)
+            else:
+                self.depth -= 1
+            raise
+        self._record_admit(time.monotonic() - started)
+
+    def release(self, model: str):
+        gate = self._gate(model)
+        while gate.waiters:
+            _, _, future = heapq.heappop(gate.waiters)
+            if future.done():
+                continue  # timed out or cancelled waiter
+            # Hand the slot straight to the next waiter; `active` stays the same
+            self.depth -= 1
+            future.set_result(True)
+            return
+        gate.active = max(0, gate.active - 1)
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.depth,
+            "max_queue_depth_seen": self.max_depth_seen,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "avg_wait_ms": round(self.total_wait / self.admitted * 1000, 2) if self.admitted else 0.0,
+            "max_wait_ms": round(self.max_wait_seen * 1000, 2),
+            "models": {
+                model: {"active": gate.active, "limit": gate.limit, "waiting": sum(1 for w in gate.waiters if not w[2].done())}
+                for model, gate in self.gates.items()
+            },
+        }
+
+
+class AdmittedStream:
+    """Wraps an upstream stream and releases its admission slot exactly once when it ends."""
+
+    def __init__(self, upstream, controller: AdmissionController, model: str):
+        self.upstream = upstream
+        self.iterator = upstream.__aiter__()
+        self.controller = controller
+        self.model = model
+        self.released = False
+
+    def _release(self):
+        if not self.released:
+            self.released = True
+            self.controller.release(self.model)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self.iterator.__anext__()
+        except BaseException:
+            # StopAsyncIteration, upstream errors and cancellation all end the stream
+            self._release()
+            raise
+
+    async def close(self):
+        self._release()
+        close = getattr(self.upstream, "close", None)
+        if close is not None:
+            await close()
+
+
+def create_admission_controller():
+    return AdmissionController(
+        default_limit=max(1, _env_int("AI_MODEL_CONCURRENCY", 8)),
+        limits=parse_concurrency_map(os.getenv("AI_MODEL_CONCURRENCY_MAP", "")),
+        max_depth=max(0, _env_int("AI_QUEUE_MAX_DEPTH", 100)),
+        max_wait={
+            PRIORITY_INTERACTIVE: _env_float("AI_QUEUE_MAX_WAIT", 5.0),
+            PRIORITY_BACKGROUND: _env_float("AI_QUEUE_BACKGROUND_MAX_WAIT", 60.0),
+        },
+    )
+
+
+# Initialize a global instance
+admission = create_admission_controller()
@@ -0,0 +1,199 @@
+"""
+AI Response Cache Module
+
+This module provides the cache layer that sits in front of `AIHandler`. Many
+students send the same question (e.g. a homework prompt shared by a class), so
+identical requests are answered from the cache instead of paying for a fresh
+upstream generation.
+
+Key Features:
+1. Cache Key: A SHA-256 digest of the normalized user message (lowercased,
+   whitespace collapsed), hashes of the system instruction and of any prior
+   conversation turns, and the model list.
+2. Eviction: Entries expire after AI_CACHE_TTL seconds and the least recently
+   used entries are evicted once AI_CACHE_MAX_ENTRIES or AI_CACHE_MAX_BYTES is
+   exceeded.
+3. Streaming Replay: A cached completion is replayed as an async iterator of
+   chunk objects shaped like OpenAI stream chunks, so the chat controllers emit
+   the usual `data: {"text": ...}` SSE frames on a hit.
+4. Pluggable Backends: `CacheBackend` defines the async interface; the
+   in-memory backend is used today and a shared backend (e.g. MongoDB/Redis)
+   can be dropped in later without touching `AIHandler`.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from types import SimpleNamespace
+from Config.logger import log_info
+
+# Characters per replayed chunk when streaming a cached completion
+REPLAY_CHUNK_SIZE = 24
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def normalize_message(message: str) -> str:
+    return re.sub(r"\s+", " ", message or "").strip().lower()
+
+
+def make_cache_key(message: str, system_instruction: str, models: list, history: list = None) -> str:
+    system_hash = hashlib.sha256((system_instruction or "").encode("utf-8")).hexdigest()
+    # Prior turns change the answer, so conversations only share entries with identical history
+    history_hash = hashlib.sha256(json.dumps(history or [], sort_keys=True).encode("utf-8")).hexdigest()
+    raw = "\x1f".join([normalize_message(message), system_hash, history_hash, ",".join(models)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def make_chunk(text: str):
+    """Builds an object shaped like an OpenAI stream chunk (chunk.choices[0].delta.content)."""
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class CachedStream:
+    """Replays a cached completion as a stream of chunks."""
+
+    def __init__(self, text: str, chunk_size: int = REPLAY_CHUNK_SIZE):
+        self.pieces = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+        self.index = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.index >= len(self.pieces):
+            raise StopAsyncIteration
+        piece = self.pieces[self.index]
+        self.index += 1
+        return make_chunk(piece)
+
+    async def close(self):
+        self.index = len(self.pieces)
+
+
+class RecordingStream:
+    """
+    Wraps an upstream stream, passing chunks through unchanged while recording
+    the text. The completion is stored only if the stream ends normally, so
+    aborted or failed answers are never cached.
+    """
+
+    def __init__(self, upstream, cache, key: str):
+        self.upstream = upstream
+        self.iterator = upstream.__aiter__()
+        self.cache = cache
+        self.key = key
+        self.parts = []
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            chunk = await self.iterator.__anext__()
+        except StopAsyncIteration:
+            if self.parts:
+                await self.cache.set(self.key, "".join(self.parts))
+            raise
+        content = chunk.choices[0].delta.content if chunk.choices else None
+        if content:
+            self.parts.append(content)
+        return chunk
+
+    async def close(self):
+        close = getattr(self.upstream, "close", None)
+        if close is not None:
+            await close()
+
+
+class CacheBackend:
+    """Async interface every response cache backend implements."""
+
+    async def get(self, key: str):
+        raise NotImplementedError
+
+    async def set(self, key: str, value: str):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        raise NotImplementedError
+
+
+class InMemoryCache(CacheBackend):
+    """Per-process LRU cache with TTL expiry and an entry/byte memory cap."""
+
+    def __init__(self, ttl: int = 3600, max_entries: int = 1000, max_bytes: int = 16 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (expires_at, value, size)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, key: str):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value, size = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str):
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = (time.monotonic() + self.ttl, value, size)
+        self.bytes += size
+        while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+            oldest = next(iter(self.entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        _, _, size = self.entries.pop(key)
+        self.bytes -= size
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "evictions": self.evictions,
+        }
+
+
+def create_cache():
+    if os.getenv("AI_CACHE_ENABLED", "True").lower() != "true":
+        log_info("AI response cache disabled.")
+        return None
+    return InMemoryCache(
+        ttl=_env_int("AI_CACHE_TTL", 3600),
+        max_entries=_env_int("AI_CACHE_MAX_ENTRIES", 1000),
+        max_bytes=_env_int("AI_CACHE_MAX_BYTES", 16 * 1024 * 1024),
+    )
+
+
+# Initialize a global instance (None when caching is disabled)
+response_cache = create_cache()
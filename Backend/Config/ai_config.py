@@ -14,17 +14,59 @@ with resilience in mind, featuring:
    real-time streaming for interactive user experiences.
 4. Environment-Based Config: Utilizes environment variables for API keys, 
    retry counts, and model prioritization.
+5. Non-Blocking I/O: Built on the AsyncOpenAI client with asyncio-based backoff, 
+   so a slow upstream model never stalls other requests on the event loop.
+6. Response Cache: Identical prompts are served from a pluggable cache 
+   (see Config/ai_cache.py); cached streams are replayed chunk by chunk.
+7. Single-Flight: Identical requests already in flight share one upstream call 
+   instead of each opening their own.
+8. Admission Control: Every upstream call takes a per-model slot from the global 
+   admission controller (see Config/ai_admission.py); interactive chat is admitted 
+   before background work and overflow is shed with AdmissionRejected.
+9. Adaptive Routing: Fallback order follows live per-model health, and circuit 
+   breakers push failing models to the back (see Config/ai_router.py).
+10. Hedged Streams: Optionally races a second model when the first one is slow 
+   to produce its first token (see Config/ai_hedging.py).
+11. Conversation History: Prior turns (`history`) are sent between the system 
+   instruction and the new user message.
+12. Token Budgets: Models whose token budget is spent are skipped, and every 
+   upstream call is charged to its model's budget (see Config/token_budget.py).
+13. Mid-Stream Failover: A stream that fails after it started is continued on 
+   the next model from the partial answer (see Config/ai_failover.py).
+14. Tracing: Connect/generate latency, time-to-first-token and token throughput 
+   are recorded per model (see Config/tracing.py).
 """
 import os
 import time
-from openai import OpenAI
+import asyncio
+from openai import AsyncOpenAI
 from Config.logger import log_info, log_error, log_warning, log_success
+from Config.ai_cache import response_cache, make_cache_key, CachedStream, RecordingStream
+from Config.ai_singleflight import single_flight
+from Config.ai_admission import admission, AdmittedStream, PRIORITY_INTERACTIVE
+from Config.ai_router import model_router, RoutedStream
+from Config.ai_hedging import hedge_policy
+from Config.token_budget import token_budget, MeteredStream, estimate_message_tokens, estimate_tokens
+from Config.ai_failover import failover_policy, continuation_messages
+from Config.tracing import TracedStream, observe_connect, observe_generate
 
 # Safely load retry count with a default value to prevent crash if ENV is missing
 AI_RETRIES = os.getenv("AI_RETRIES", "2")
 
+# Returned by generate_content when every model in the fallback list failed
+AI_EXHAUSTED_MESSAGE = "Thinking process failed after exhaustion of all available models. Please try again later."
+
 class AIHandler:
-    def __init__(self):
+    def __init__(self, cache=response_cache, coalescer=single_flight, admission_controller=admission, router=model_router, hedging=hedge_policy, budget=token_budget, failover=failover_policy):
+        self.cache = cache
+        self.single_flight = coalescer
+        self.admission = admission_controller
+        self.router = router
+        self.hedging = hedging
+        self.budget = budget
+        self.failover = failover
+        self._model_env = None
+        self._models = []
         self.api_key = os.getenv("OPENROUTER_API_KEY")
         try:
             self.max_retries = int(AI_RETRIES)
@@ -35,69 +77,182 @@ class AIHandler:
             log_error("OPENROUTER_API_KEY not found in environment variables.")
             raise ValueError("OPENROUTER_API_KEY is required.")
             
-        self.client = OpenAI(
+        self.client = AsyncOpenAI(
             base_url="https://openrouter.ai/api/v1",
             api_key=self.api_key,
         )
 
     def _get_model_list(self, override_model: str = None):
-        """Helper to get prioritized models from environment."""
+        """Helper to get the configured model list (parsed once per AI_MODEL_LIST value)."""
         if override_model:
             return [override_model]
         
         env_list = os.getenv("AI_MODEL_LIST", "google/gemini-2.0-flash-001")
-        return [m.strip() for m in env_list.split(",") if m.strip()]
+        if env_list != self._model_env:
+            self._model_env = env_list
+            self._models = [m.strip() for m in env_list.split(",") if m.strip()]
+        return list(self._models)
+
+    def _build_messages(self, prompt: str, system_instruction: str, history: list = None):
+        """[system, *prior turns, user]; `history` holds {"role", "content"} dicts, oldest first."""
+        return [
+            {"role": "system", "content": system_instruction},
+            *(history or []),
+            {"role": "user", "content": prompt},
+        ]
 
-    def generate_content(self, prompt: str, model: str = None, system_instruction: str = "You are an educational AI tutor."):
+    async def _within_budget(self, model: str) -> bool:
+        if self.budget is None or await self.budget.model_available(model):
+            return True
+        log_warning(f"Token budget spent for {model}; skipping to next fallback.")
+        return False
+
+    async def generate_content(self, prompt: str, model: str = None, system_instruction: str = "You are an educational AI tutor.", priority: int = PRIORITY_INTERACTIVE, history: list = None):
         """
         Robust content generation with multi-model fallback routing.
         """
         models = self._get_model_list(model)
-        
-        for target_model in models:
+        messages = self._build_messages(prompt, system_instruction, history)
+        cache_key = make_cache_key(prompt, system_instruction, models, history)
+        if self.cache is not None:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                log_success("AI response served from cache.", sample="ai.cache_hit")
+                return cached
+
+        async def generate():
+            content = await self._generate_upstream(messages, models, priority)
+            if self.cache is not None and content and content != AI_EXHAUSTED_MESSAGE:
+                await self.cache.set(cache_key, content)
+            return content
+
+        if self.single_flight is not None:
+            return await self.single_flight.call(cache_key, generate)
+        return await generate()
+
+    async def _generate_upstream(self, messages: list, models: list, priority: int):
+        for target_model in self.router.order(models):
+            if not await self._within_budget(target_model):
+                continue
             for attempt in range(self.max_retries):
+                if attempt > 0 and not self.router.available(target_model):
+                    log_warning(f"Circuit open for {target_model}; skipping remaining retries.")
+                    break
+                # Shed requests propagate instead of falling back, so overload is not multiplied
+                await self.admission.acquire(target_model, priority)
+                self.router.before_call(target_model)
+                started = time.monotonic()
+                outcome_recorded = False
                 try:
-                    log_info(f"AI Attempt ({attempt + 1}/{self.max_retries}) using: {target_model}")
-                    response = self.client.chat.completions.create(
+                    log_info(f"AI Attempt ({attempt + 1}/{self.max_retries}) using: {target_model}", sample="ai.attempt", model=target_model)
+                    response = await self.client.chat.completions.create(
                         model=target_model,
-                        messages=[
-                            {"role": "system", "content": system_instruction},
-                            {"role": "user", "content": prompt},
-                        ],
+                        messages=messages,
                     )
-                    log_success(f"Success with model: {target_model}")
-                    return response.choices[0].message.content
+                    self.router.record_success(target_model, time.monotonic() - started)
+                    observe_generate(target_model, time.monotonic() - started)
+                    outcome_recorded = True
+                    log_success(f"Success with model: {target_model}", sample="ai.success", model=target_model)
+                    content = response.choices[0].message.content
+                    if self.budget is not None:
+                        await self.budget.charge_model(target_model, estimate_message_tokens(messages) + estimate_tokens(content))
+                    return content
                 except Exception as e:
-                    log_warning(f"Model {target_model} failed (Attempt {attempt + 1}): {e}")
-                    if attempt < self.max_retries - 1:
-                        time.sleep(1)
+                    self.router.record_failure(target_model)
+                    observe_generate(target_model, time.monotonic() - started, ok=False)
+                    outcome_recorded = True
+                    log_warning(f"Model {target_model} failed (Attempt {attempt + 1}): {e}", model=target_model)
+                finally:
+                    if not outcome_recorded:
+                        self.router.abandon(target_model)
+                    self.admission.release(target_model)
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(1)
             
             log_warning(f"Exhausted model {target_model}. Trying next fallback...")
             
         log_error("CRITICAL: All models in fallback list failed.")
-        return "Thinking process failed after exhaustion of all available models. Please try again later."
+        return AI_EXHAUSTED_MESSAGE
 
-    def stream_content(self, prompt: str, model: str = None, system_instruction: str = "You are an educational AI tutor."):
+    async def stream_content(self, prompt: str, model: str = None, system_instruction: str = "You are an educational AI tutor.", priority: int = PRIORITY_INTERACTIVE, history: list = None):
         """
         Streams content with multi-model fallback support.
+        Returns an async iterator of completion chunks (consume with `async for`).
+        Identical concurrent requests share one upstream stream (see Config/ai_singleflight.py).
         """
         models = self._get_model_list(model)
-        
-        for target_model in models:
+        messages = self._build_messages(prompt, system_instruction, history)
+        cache_key = make_cache_key(prompt, system_instruction, models, history)
+        if self.cache is not None:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                log_success("AI stream replayed from cache.", sample="ai.cache_hit")
+                return CachedStream(cached)
+
+        async def reopen(partial: str, failed_models: list):
+            remaining = [m for m in models if m not in failed_models]
+            if not remaining:
+                raise Exception("No fallback model left to continue the stream.")
+            return await self._open_stream_upstream(continuation_messages(messages, partial), remaining, priority)
+
+        async def open_stream():
+            if self.hedging is not None and self.hedging.enabled and len(models) > 1:
+                response = await self._open_hedged_stream(messages, models, priority)
+            else:
+                response = await self._open_stream_upstream(messages, models, priority)
+            if self.failover is not None:
+                response = self.failover.wrap(response, reopen)
+            if self.cache is not None:
+                # Stored only once the stream finishes without error or abort
+                return RecordingStream(response, self.cache, cache_key)
+            return response
+
+        if self.single_flight is not None:
+            return await self.single_flight.stream(cache_key, open_stream)
+        return await open_stream()
+
+    async def _open_hedged_stream(self, messages: list, models: list, priority: int):
+        async def open_primary():
+            return await self._open_stream_upstream(messages, models, priority)
+
+        async def open_secondary(primary):
+            # The other models in live routing order, skipping the one serving the primary
+            alternatives = [m for m in models if m != primary.model]
+            return await self._open_stream_upstream(messages, alternatives, priority)
+
+        return await self.hedging.open(open_primary, open_secondary)
+
+    async def _open_stream_upstream(self, messages: list, models: list, priority: int):
+        for target_model in self.router.order(models):
+            if not await self._within_budget(target_model):
+                continue
+            # The slot is held for the whole stream and released by AdmittedStream
+            await self.admission.acquire(target_model, priority)
+            self.router.before_call(target_model)
+            started = time.monotonic()
+            sent_at = time.perf_counter()
             try:
-                log_info(f"AI Stream Start: {target_model}")
-                response = self.client.chat.completions.create(
+                log_info(f"AI Stream Start: {target_model}", sample="ai.stream_attempt", model=target_model)
+                response = await self.client.chat.completions.create(
                     model=target_model,
-                    messages=[
-                        {"role": "system", "content": system_instruction},
-                        {"role": "user", "content": prompt},
-                    ],
+                    messages=messages,
                     stream=True,
                 )
-                log_success(f"Streaming established with: {target_model}")
-                return response
-            except Exception as e:
-                log_warning(f"Streaming failed for model {target_model}: {e}")
+                observe_connect(target_model, time.perf_counter() - sent_at)
+                log_success(f"Streaming established with: {target_model}", sample="ai.stream_success", model=target_model)
+                stream = RoutedStream(AdmittedStream(response, self.admission, target_model), self.router, target_model, started)
+                stream = TracedStream(stream, target_model, sent_at)
+                if self.budget is not None:
+                    stream = MeteredStream(stream, self.budget, target_model, estimate_message_tokens(messages))
+                return stream
+            except BaseException as e:
+                self.admission.release(target_model)
+                if not isinstance(e, Exception):
+                    self.router.abandon(target_model)
+                    raise
+                self.router.record_failure(target_model)
+                observe_connect(target_model, time.perf_counter() - sent_at, ok=False)
+                log_warning(f"Streaming failed for model {target_model}: {e}", model=target_model)
                 log_info("Attempting next fallback for stream...")
 
         log_error("CRITICAL: Streaming failed on all models.")
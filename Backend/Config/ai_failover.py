@@ -0,0 +1,173 @@
+"""
+AI Mid-Stream Failover Module
+
+`AIHandler` falls back to the next model only while a stream is being opened.
+If a model fails after it has started answering, the student used to get
+"AI connection lost mid-stream" and had to ask again, paying for the whole
+answer twice. `FailoverStream` continues the answer on the next model instead.
+
+Key Features:
+1. Continuation: On a mid-stream error the request is re-issued to the next
+   model in `AI_MODEL_LIST` (live routing order, skipping models that already
+   failed for this answer). The partial answer is sent as an assistant
+   message, so the model continues it instead of starting over.
+2. Seamless Stitching: Continuation chunks are relayed through the same
+   stream, so the SSE response, cache recording and history see one answer.
+   If a model ignores the prefix and restarts the answer, the repeated
+   beginning (at least ECHO_MIN_CHARS long) is dropped.
+3. Bounded: At most AI_STREAM_FAILOVERS continuations per answer. When no
+   model can continue, the original error is raised as before.
+4. Metrics: Failovers started, answers recovered and exhausted via `stats()`.
+"""
+
+import os
+from Config.logger import log_info, log_error, log_warning
+from Config.ai_cache import make_chunk
+
+# Shorter partial answers are not checked for being repeated (too likely by chance)
+ECHO_MIN_CHARS = 16
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+async def close_stream(stream):
+    close = getattr(stream, "close", None)
+    if close is None:
+        return
+    try:
+        await close()
+    except Exception as e:
+        log_error(f"Error closing failed stream: {e}")
+
+
+def continuation_messages(messages: list, partial: str) -> list:
+    """The original messages plus the partial answer as an assistant prefix to continue."""
+    if not partial:
+        return messages
+    return [*messages, {"role": "assistant", "content": partial}]
+
+
+class FailoverStream:
+    """
+    Stream of chunks that survives upstream errors. `reopen(partial, failed_models)`
+    must return a new stream continuing `partial`, or raise when no model is left.
+    """
+
+    def __init__(self, upstream, reopen, policy):
+        self.upstream = upstream
+        self.iterator = upstream.__aiter__()
+        self.reopen = reopen
+        self.policy = policy
+        self.model = getattr(upstream, "model", None)
+        self.parts = []
+        self.failed_models = []
+        self.failovers = 0
+        self.recovered = False
+        self.echo = None  # partial answer a restarted continuation may repeat
+        self.held = []  # continuation text matching `echo` so far
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            try:
+                chunk = await self.iterator.__anext__()
+            except StopAsyncIteration:
+                # Held text only ever repeated the partial answer; it is dropped
+                self.held = []
+                if self.failovers and not self.recovered:
+                    self.recovered = True
+                    self.policy.recovered += 1
+                raise
+            except Exception as e:
+                await self._fail_over(e)
+                continue
+
+            content = chunk.choices[0].delta.content if chunk.choices else None
+            if content and self.echo is not None:
+                chunk = self._strip_echo(content)
+                if chunk is None:
+                    continue
+                content = chunk.choices[0].delta.content
+            if content:
+                self.parts.append(content)
+            return chunk
+
+    async def _fail_over(self, error: Exception):
+        if self.model is not None:
+            self.failed_models.append(self.model)
+        await close_stream(self.upstream)
+        if self.failovers >= self.policy.max_failovers:
+            self.policy.exhausted += 1
+            raise error
+        partial = "".join(self.parts)  # held text only repeats it
+        self.failovers += 1
+        self.policy.failovers += 1
+        log_warning(f"Stream from {self.model} failed after {len(partial)} chars ({error}); continuing on next model.")
+        try:
+            self.upstream = await self.reopen(partial, list(self.failed_models))
+        except Exception as reopen_error:
+            log_warning(f"No model could continue the stream: {reopen_error}")
+            self.policy.exhausted += 1
+            raise error
+        self.iterator = self.upstream.__aiter__()
+        self.model = getattr(self.upstream, "model", None)
+        self.parts = [partial] if partial else []
+        self.held = []
+        self.echo = partial if len(partial) >= ECHO_MIN_CHARS else None
+        log_info(f"Stream continuing on {self.model}.")
+
+    def _strip_echo(self, content: str):
+        """Holds continuation text while it repeats the partial answer; returns the chunk to emit or None."""
+        seen = "".join(self.held) + content
+        echo = self.echo
+        if echo.startswith(seen):
+            if len(seen) < len(echo):
+                self.held.append(content)
+                return None
+            # Exactly the whole partial answer again; drop it
+            self.held, self.echo = [], None
+            self.policy.echoes_dropped += 1
+            return None
+        self.held, self.echo = [], None
+        if seen.startswith(echo):
+            # Restarted answer: drop the repeated beginning, keep what is new
+            self.policy.echoes_dropped += 1
+            return make_chunk(seen[len(echo):])
+        return make_chunk(seen)
+
+    async def close(self):
+        await close_stream(self.upstream)
+
+
+class FailoverPolicy:
+    def __init__(self, max_failovers: int = 2):
+        self.max_failovers = max_failovers
+        self.failovers = 0
+        self.recovered = 0
+        self.exhausted = 0
+        self.echoes_dropped = 0
+
+    def wrap(self, stream, reopen):
+        if self.max_failovers <= 0:
+            return stream
+        return FailoverStream(stream, reopen, self)
+
+    def stats(self) -> dict:
+        return {
+            "max_failovers": self.max_failovers,
+            "failovers": self.failovers,
+            "recovered": self.recovered,
+            "exhausted": self.exhausted,
+            "echoes_dropped": self.echoes_dropped,
+        }
+
+
+# Initialize a global instance
+failover_policy = FailoverPolicy(max_failovers=max(0, _env_int("AI_STREAM_FAILOVERS", 2)))
@@ -0,0 +1,198 @@
+"""
+AI Request Hedging Module
+
+This module cuts tail time-to-first-token (TTFT) on chat streams. When hedging
+is enabled and the primary model has not produced its first token within
+AI_HEDGE_DELAY seconds, a second stream is started on the next model. The
+stream that produces a token first wins; the other one is cancelled and its
+upstream connection closed.
+
+Key Features:
+1. Opt-In: Disabled unless AI_HEDGE_ENABLED=true.
+2. Budget: Hedges never exceed AI_HEDGE_MAX_FRACTION of all streams, so a slow
+   upstream cannot double the traffic we send to OpenRouter.
+3. Fallback: A primary that fails before its first token (inside the hedge
+   window, or while no hedge is allowed) is replaced by the secondary right
+   away, which falls through the remaining models; a fallback is not a
+   duplicate request, so it does not count against the hedge budget.
+4. Metrics: Hedges started, budget denials, fallbacks and primary/hedge win
+   counts are exposed via `stats()`.
+"""
+
+import os
+import asyncio
+from Config.logger import log_info, log_error, log_warning
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+async def close_stream(stream):
+    close = getattr(stream, "close", None)
+    if close is None:
+        return
+    try:
+        await close()
+    except Exception as e:
+        log_error(f"Error closing hedged stream: {e}")
+
+
+async def peek_first_content(stream) -> list:
+    """Reads chunks until the first one carrying content (or the end) and returns them."""
+    buffered = []
+    async for chunk in stream:
+        buffered.append(chunk)
+        if chunk.choices and chunk.choices[0].delta.content:
+            break
+    return buffered
+
+
+class PrefetchedStream:
+    """Replays chunks already read while racing, then continues with the live stream."""
+
+    def __init__(self, upstream, buffered: list):
+        self.upstream = upstream
+        self.iterator = upstream.__aiter__()
+        self.buffered = buffered
+        self.model = getattr(upstream, "model", None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.buffered:
+            return self.buffered.pop(0)
+        return await self.iterator.__anext__()
+
+    async def close(self):
+        self.buffered = []
+        await close_stream(self.upstream)
+
+
+class HedgePolicy:
+    def __init__(self, enabled: bool = False, delay: float = 1.5, max_fraction: float = 0.1):
+        self.enabled = enabled
+        self.delay = delay
+        self.max_fraction = max_fraction
+        self.streams = 0
+        self.hedges = 0
+        self.budget_denied = 0
+        self.primary_wins = 0
+        self.hedge_wins = 0
+        self.fallbacks = 0
+
+    def allow_hedge(self) -> bool:
+        if self.hedges + 1 > self.max_fraction * self.streams:
+            self.budget_denied += 1
+            return False
+        return True
+
+    async def open(self, open_primary, open_secondary=None):
+        """
+        Opens the primary stream and, if it stays silent past `delay`, races it
+        against `open_secondary(primary)`. Returns a stream positioned at the start.
+        """
+        primary = await open_primary()
+        self.streams += 1
+        primary_task = asyncio.create_task(peek_first_content(primary))
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=self.delay)
+        except BaseException:
+            primary_task.cancel()
+            await close_stream(primary)
+            raise
+
+        if done or open_secondary is None or not self.allow_hedge():
+            try:
+                buffered = await primary_task
+            except Exception as e:
+                await close_stream(primary)
+                if open_secondary is None:
+                    raise
+                return await self._fall_back(open_secondary, primary, e)
+            except BaseException:
+                await close_stream(primary)
+                raise
+            return PrefetchedStream(primary, buffered)
+
+        self.hedges += 1
+        log_info(f"No first token after {self.delay}s; hedging to a second model.")
+
+        async def race_secondary():
+            secondary = await open_secondary(primary)
+            try:
+                return secondary, await peek_first_content(secondary)
+            except BaseException:
+                await close_stream(secondary)
+                raise
+
+        secondary_task = asyncio.create_task(race_secondary())
+        pending = {primary_task, secondary_task}
+        winner = None
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.cancelled() and task.exception() is None:
+                        winner = task
+                        break
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            if winner is not primary_task:
+                await close_stream(primary)
+            if winner is primary_task and secondary_task.done() and not secondary_task.cancelled() \
+                    and secondary_task.exception() is None:
+                # Both produced a token in the same tick; drop the hedge
+                await close_stream(secondary_task.result()[0])
+
+        if winner is primary_task:
+            self.primary_wins += 1
+            return PrefetchedStream(primary, primary_task.result())
+        if winner is secondary_task:
+            self.hedge_wins += 1
+            secondary, buffered = secondary_task.result()
+            return PrefetchedStream(secondary, buffered)
+
+        # Both streams failed: surface the primary's error
+        raise primary_task.exception() or secondary_task.exception()
+
+    async def _fall_back(self, open_secondary, primary, error: Exception):
+        self.fallbacks += 1
+        log_warning(f"Primary stream failed before its first token ({error}); falling back to the next model.")
+        secondary = await open_secondary(primary)
+        try:
+            return PrefetchedStream(secondary, await peek_first_content(secondary))
+        except BaseException:
+            await close_stream(secondary)
+            raise
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "delay_s": self.delay,
+            "max_fraction": self.max_fraction,
+            "streams": self.streams,
+            "hedges": self.hedges,
+            "budget_denied": self.budget_denied,
+            "primary_wins": self.primary_wins,
+            "hedge_wins": self.hedge_wins,
+            "fallbacks": self.fallbacks,
+        }
+
+
+def create_hedge_policy():
+    return HedgePolicy(
+        enabled=os.getenv("AI_HEDGE_ENABLED", "False").lower() == "true",
+        delay=max(0.0, _env_float("AI_HEDGE_DELAY", 1.5)),
+        max_fraction=min(1.0, max(0.0, _env_float("AI_HEDGE_MAX_FRACTION", 0.1))),
+    )
+
+
+# Initialize a global instance
+hedge_policy = create_hedge_policy()
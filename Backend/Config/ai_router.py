@@ -0,0 +1,212 @@
+"""
+Adaptive AI Model Router Module
+
+This module decides the order in which `AIHandler` tries the models from
+AI_MODEL_LIST. Instead of a fixed order, it uses live per-model health so a
+dead or slow primary model does not cost every request `max_retries` failures.
+
+Key Features:
+1. Rolling Stats: The last AI_ROUTER_WINDOW calls per model are kept with
+   their outcome, total latency and (for streams) time-to-first-token.
+2. Circuit Breakers: After AI_BREAKER_FAILURES consecutive failures a model's
+   circuit opens for AI_BREAKER_COOLDOWN seconds. It then goes half-open and a
+   single probe request decides whether it closes again or re-opens.
+3. Live Ordering: A half-open model's probe goes first; models with closed
+   circuits follow, ranked by success rate and latency bucket
+   (AI_ROUTER_LATENCY_BUCKET seconds), with the configured order as tiebreaker.
+   Open circuits go last, so they are only tried when everything else failed.
+4. Status: `status()` reports each model's health for the /models/health endpoint.
+"""
+
+import os
+import time
+from collections import deque
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class ModelHealth:
+    def __init__(self, window: int):
+        self.samples = deque(maxlen=window)  # (ok, latency, ttft)
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+    def success_rate(self) -> float:
+        if not self.samples:
+            return 1.0
+        return sum(1 for ok, _, _ in self.samples if ok) / len(self.samples)
+
+    def avg_latency(self):
+        values = [latency for ok, latency, _ in self.samples if ok]
+        return sum(values) / len(values) if values else None
+
+    def avg_ttft(self):
+        values = [ttft for ok, _, ttft in self.samples if ok and ttft is not None]
+        return sum(values) / len(values) if values else None
+
+
+class ModelRouter:
+    def __init__(self, window: int = 50, failure_threshold: int = 3, cooldown: float = 30.0, latency_bucket: float = 1.0):
+        self.window = window
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.latency_bucket = latency_bucket
+        self.models = {}
+
+    def _health(self, model: str) -> ModelHealth:
+        health = self.models.get(model)
+        if health is None:
+            health = ModelHealth(self.window)
+            self.models[model] = health
+        return health
+
+    def _refresh_state(self, health: ModelHealth):
+        if health.state == STATE_OPEN and time.monotonic() - health.opened_at >= self.cooldown:
+            health.state = STATE_HALF_OPEN
+            health.probing = False
+
+    def available(self, model: str) -> bool:
+        health = self._health(model)
+        self._refresh_state(health)
+        if health.state == STATE_CLOSED:
+            return True
+        return health.state == STATE_HALF_OPEN and not health.probing
+
+    def order(self, models: list) -> list:
+        """Returns `models` sorted by live health; unavailable circuits are moved to the end."""
+        if len(models) <= 1:
+            return list(models)
+
+        def rank(item):
+            index, model = item
+            health = self._health(model)
+            if not self.available(model):
+                return (1, 0, 0, index)
+            if health.state == STATE_HALF_OPEN:
+                return (0, -1, 0, index)  # send the single probe first
+            latency = health.avg_ttft() or health.avg_latency() or 0.0
+            failure_bucket = round((1 - health.success_rate()) * 10)
+            return (0, failure_bucket, int(latency / self.latency_bucket), index)
+
+        return [model for _, model in sorted(enumerate(models), key=rank)]
+
+    def before_call(self, model: str):
+        """Marks a half-open model as probing so only one probe runs at a time."""
+        health = self._health(model)
+        self._refresh_state(health)
+        if health.state == STATE_HALF_OPEN:
+            health.probing = True
+
+    def record_success(self, model: str, latency: float, ttft: float = None):
+        health = self._health(model)
+        if health.state != STATE_CLOSED:
+            # A recovered model starts with a clean window so old failures don't bury it
+            health.samples.clear()
+        health.samples.append((True, latency, ttft))
+        health.consecutive_failures = 0
+        health.state = STATE_CLOSED
+        health.probing = False
+
+    def record_failure(self, model: str):
+        health = self._health(model)
+        health.samples.append((False, None, None))
+        health.consecutive_failures += 1
+        if health.state == STATE_HALF_OPEN or health.consecutive_failures >= self.failure_threshold:
+            health.state = STATE_OPEN
+            health.opened_at = time.monotonic()
+        health.probing = False
+
+    def abandon(self, model: str):
+        """Frees a half-open probe slot when a call ends without an outcome (e.g. client abort)."""
+        self._health(model).probing = False
+
+    def status(self, models: list = None) -> dict:
+        names = list(dict.fromkeys([*(models or []), *self.models]))
+        report = {}
+        for model in names:
+            health = self._health(model)
+            self._refresh_state(health)
+            latency = health.avg_latency()
+            ttft = health.avg_ttft()
+            report[model] = {
+                "state": health.state,
+                "samples": len(health.samples),
+                "success_rate": round(health.success_rate(), 4),
+                "consecutive_failures": health.consecutive_failures,
+                "avg_latency_ms": round(latency * 1000, 2) if latency is not None else None,
+                "avg_ttft_ms": round(ttft * 1000, 2) if ttft is not None else None,
+                "retry_in_s": round(max(0.0, self.cooldown - (time.monotonic() - health.opened_at)), 2) if health.state == STATE_OPEN else None,
+            }
+        return report
+
+
+class RoutedStream:
+    """Wraps an upstream stream and reports its TTFT, total latency and outcome to the router."""
+
+    def __init__(self, upstream, router: ModelRouter, model: str, started: float):
+        self.upstream = upstream
+        self.iterator = upstream.__aiter__()
+        self.router = router
+        self.model = model
+        self.started = started
+        self.ttft = None
+        self.recorded = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            chunk = await self.iterator.__anext__()
+        except StopAsyncIteration:
+            if not self.recorded:
+                self.recorded = True
+                self.router.record_success(self.model, time.monotonic() - self.started, self.ttft)
+            raise
+        except Exception:
+            if not self.recorded:
+                self.recorded = True
+                self.router.record_failure(self.model)
+            raise
+        if self.ttft is None and chunk.choices and chunk.choices[0].delta.content:
+            self.ttft = time.monotonic() - self.started
+        return chunk
+
+    async def close(self):
+        if not self.recorded:
+            self.recorded = True
+            self.router.abandon(self.model)
+        close = getattr(self.upstream, "close", None)
+        if close is not None:
+            await close()
+
+
+def create_model_router():
+    return ModelRouter(
+        window=max(1, _env_int("AI_ROUTER_WINDOW", 50)),
+        failure_threshold=max(1, _env_int("AI_BREAKER_FAILURES", 3)),
+        cooldown=max(0.0, _env_float("AI_BREAKER_COOLDOWN", 30.0)),
+        latency_bucket=max(0.001, _env_float("AI_ROUTER_LATENCY_BUCKET", 1.0)),
+    )
+
+
+# Initialize a global instance
+model_router = create_model_router()
@@ -0,0 +1,190 @@
+"""
+AI Single-Flight Coalescing Module
+
+This module deduplicates identical AI requests that are in flight at the same
+time. When a whole class sends the same prompt at once, the response cache is
+still empty, so without coalescing every request would open its own upstream
+completion. With single-flight, K concurrent duplicates cost one upstream call.
+
+Key Features:
+1. Streams: The first request becomes the producer. A `StreamBroadcaster` pumps
+   the upstream stream in a background task and fans every chunk out to all
+   subscribers. Late joiners replay the chunks already received, then follow
+   the live stream.
+2. Cancellation: The upstream stream is closed only when the last subscriber
+   leaves, so one student closing the tab does not cut off the others. A
+   cancelled stream is unregistered right away, so an identical request
+   arriving while it shuts down opens a fresh upstream instead of joining it.
+3. Generation: `generate_content` callers share one upstream task per key;
+   followers await it through `asyncio.shield` so a cancelled caller never
+   cancels the shared call.
+4. Metrics: Leader/follower counts show how many upstream calls were saved.
+
+Keys are the same as the response cache keys (see Config/ai_cache.py).
+"""
+
+import os
+import asyncio
+from Config.logger import log_info, log_error
+
+
+class StreamBroadcaster:
+    def __init__(self, key: str, open_stream, on_finish):
+        self.key = key
+        self.chunks = []
+        self.done = False
+        self.cancelling = False  # last subscriber left; no longer joinable
+        self.error = None
+        self.subscribers = 0
+        self.upstream = None
+        self.on_finish = on_finish
+        self.started = asyncio.get_running_loop().create_future()
+        self.changed = asyncio.Event()
+        self.task = asyncio.create_task(self._pump(open_stream))
+
+    def _notify(self):
+        # Wake everyone waiting on the current event, then arm a fresh one
+        event, self.changed = self.changed, asyncio.Event()
+        event.set()
+
+    async def _pump(self, open_stream):
+        completed = False
+        try:
+            self.upstream = await open_stream()
+            self.started.set_result(True)
+            async for chunk in self.upstream:
+                self.chunks.append(chunk)
+                self._notify()
+            completed = True
+        except asyncio.CancelledError:
+            self.error = Exception("Upstream stream cancelled.")
+            if not self.started.done():
+                self.started.set_exception(self.error)
+        except Exception as e:
+            self.error = e
+            if not self.started.done():
+                self.started.set_exception(e)
+        finally:
+            self.done = True
+            self.on_finish(self)
+            self._notify()
+            if not completed and self.upstream is not None:
+                close = getattr(self.upstream, "close", None)
+                if close is not None:
+                    try:
+                        await close()
+                    except Exception as e:
+                        log_error(f"Error closing shared upstream stream: {e}")
+
+    def subscribe(self):
+        return BroadcastSubscriber(self)
+
+    def unsubscribe(self):
+        self.subscribers -= 1
+        if self.subscribers <= 0 and not self.done and not self.cancelling:
+            log_info("Last subscriber left; cancelling shared upstream stream.")
+            self.cancelling = True
+            self.on_finish(self)
+            self.task.cancel()
+
+
+class BroadcastSubscriber:
+    """One consumer's view of a shared stream (async iterator of chunks)."""
+
+    def __init__(self, broadcaster: StreamBroadcaster):
+        self.broadcaster = broadcaster
+        self.index = 0
+        self.closed = False
+        broadcaster.subscribers += 1
+
+    async def wait_started(self):
+        # Raises the upstream open error (e.g. all models failed) to every subscriber
+        await asyncio.shield(self.broadcaster.started)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        broadcaster = self.broadcaster
+        while True:
+            if self.index < len(broadcaster.chunks):
+                chunk = broadcaster.chunks[self.index]
+                self.index += 1
+                return chunk
+            if broadcaster.done:
+                await self.close()
+                if broadcaster.error is not None:
+                    raise broadcaster.error
+                raise StopAsyncIteration
+            await broadcaster.changed.wait()
+
+    async def close(self):
+        if not self.closed:
+            self.closed = True
+            self.broadcaster.unsubscribe()
+
+
+class SingleFlight:
+    def __init__(self):
+        self.streams = {}
+        self.calls = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def stream(self, key: str, open_stream):
+        """
+        Returns a subscriber for the shared stream of `key`, opening the upstream
+        via `open_stream()` only if no identical stream is already in flight.
+        """
+        broadcaster = self.streams.get(key)
+        if broadcaster is None or broadcaster.cancelling:
+            self.leaders += 1
+            broadcaster = StreamBroadcaster(key, open_stream, self._stream_finished)
+            self.streams[key] = broadcaster
+        else:
+            self.followers += 1
+            log_info("Joined in-flight identical AI stream.", sample="ai.joined")
+
+        subscriber = broadcaster.subscribe()
+        try:
+            await subscriber.wait_started()
+        except BaseException:
+            await subscriber.close()
+            raise
+        return subscriber
+
+    def _stream_finished(self, broadcaster: StreamBroadcaster):
+        if self.streams.get(broadcaster.key) is broadcaster:
+            del self.streams[broadcaster.key]
+
+    async def call(self, key: str, fn):
+        """Runs `fn()` once per key among concurrent callers and shares its result."""
+        task = self.calls.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.create_task(fn())
+            self.calls[key] = task
+            task.add_done_callback(lambda t: self.calls.pop(key, None) if self.calls.get(key) is t else None)
+        else:
+            self.followers += 1
+            log_info("Joined in-flight identical AI request.", sample="ai.joined")
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "in_flight_streams": len(self.streams),
+            "in_flight_calls": len(self.calls),
+        }
+
+
+def create_single_flight():
+    if os.getenv("AI_SINGLEFLIGHT_ENABLED", "True").lower() != "true":
+        log_info("AI single-flight coalescing disabled.")
+        return None
+    return SingleFlight()
+
+
+# Initialize a global instance (None when coalescing is disabled)
+single_flight = create_single_flight()
@@ -0,0 +1,172 @@
+"""
+Chat Conversation History Module
+
+This module gives the chat endpoints real conversation memory. The system
+prompts ask the model to "maintain full memory of this conversation", so each
+chat session is persisted in the MongoDB `chat_sessions` collection and prior
+turns are sent back to the model on every message.
+
+Key Features:
+1. Sessions: One document per (session_id, ticket_id). Global chat uses
+   ticket_id = None; ticket chat stores one thread per ticket and session.
+2. Token Budget: `load_context` assembles the rolling summary plus the most
+   recent turns that fit in CHAT_HISTORY_TOKEN_BUDGET (estimated at ~4
+   characters per token), so prompt size stays bounded.
+3. Rolling Summary: Once the stored turns exceed the budget, the oldest turns
+   are folded into a short summary in the background (background AI priority)
+   and removed from the document.
+4. Expiry: Idle sessions are dropped by a TTL index after CHAT_SESSION_TTL_DAYS.
+"""
+
+import os
+import asyncio
+import datetime
+from bson import ObjectId
+from pymongo import ReturnDocument
+from Config.db import get_db
+from Config.ai_config import ai_handler, AI_EXHAUSTED_MESSAGE
+from Config.ai_admission import PRIORITY_BACKGROUND
+from Config.logger import log_error, log_success
+from Config.token_budget import estimate_tokens
+
+SUMMARY_SYSTEM_INSTRUCTION = (
+    "You maintain a compact running summary of a tutoring conversation. "
+    "Keep facts the student shared, their goals, and what was already explained. "
+    "Write plain sentences, no more than 150 words."
+)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class ConversationStore:
+    def __init__(self, token_budget: int = 2000, keep_recent_turns: int = 6):
+        self.token_budget = token_budget
+        self.keep_recent_turns = keep_recent_turns
+        self.compacting = {}
+
+    @staticmethod
+    def _filter(session_id: str, ticket_id: str = None) -> dict:
+        return {"session_id": session_id, "ticket_id": ticket_id}
+
+    async def load_context(self, session_id: str, ticket_id: str = None) -> list:
+        """Returns prior turns as chat messages (oldest first) within the token budget."""
+        db = get_db()
+        if db is None or not session_id:
+            return []
+        try:
+            session = await db.chat_sessions.find_one(
+                self._filter(session_id, ticket_id), {"summary": 1, "turns": 1}
+            )
+        except Exception as e:
+            log_error(f"Failed to load chat history for session {session_id}: {e}")
+            return []
+        if not session:
+            return []
+
+        messages = []
+        budget = self.token_budget
+        summary = session.get("summary")
+        if summary:
+            summary_message = {"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"}
+            budget -= estimate_tokens(summary_message["content"])
+
+        recent = []
+        for turn in reversed(session.get("turns", [])):
+            cost = estimate_tokens(turn["content"])
+            if cost > budget:
+                break
+            budget -= cost
+            recent.append({"role": turn["role"], "content": turn["content"]})
+
+        if summary:
+            messages.append(summary_message)
+        messages.extend(reversed(recent))
+        return messages
+
+    async def append_exchange(self, session_id: str, ticket_id: str, user_text: str, assistant_text: str):
+        """Stores one user/assistant exchange and schedules compaction if the thread outgrew the budget."""
+        db = get_db()
+        if db is None or not session_id:
+            return
+        now = datetime.datetime.utcnow()
+        turns = [
+            {"id": ObjectId(), "role": "user", "content": user_text, "at": now},
+            {"id": ObjectId(), "role": "assistant", "content": assistant_text, "at": now},
+        ]
+        try:
+            session = await db.chat_sessions.find_one_and_update(
+                self._filter(session_id, ticket_id),
+                {
+                    "$push": {"turns": {"$each": turns}},
+                    "$set": {"updated_at": now},
+                    "$setOnInsert": {"created_at": now, "summary": None},
+                },
+                upsert=True,
+                projection={"turns.content": 1},
+                return_document=ReturnDocument.AFTER,
+            )
+        except Exception as e:
+            log_error(f"Failed to store chat history for session {session_id}: {e}")
+            return
+
+        stored_tokens = sum(estimate_tokens(t.get("content")) for t in (session or {}).get("turns", []))
+        if stored_tokens > self.token_budget:
+            self._schedule_compaction(session_id, ticket_id)
+
+    def _schedule_compaction(self, session_id: str, ticket_id: str = None):
+        key = (session_id, ticket_id)
+        if key in self.compacting:
+            return
+        task = asyncio.create_task(self._compact(session_id, ticket_id))
+        self.compacting[key] = task
+        task.add_done_callback(lambda _: self.compacting.pop(key, None))
+
+    async def _compact(self, session_id: str, ticket_id: str = None):
+        db = get_db()
+        if db is None:
+            return
+        try:
+            session = await db.chat_sessions.find_one(self._filter(session_id, ticket_id), {"summary": 1, "turns": 1})
+            turns = (session or {}).get("turns", [])
+            folded = turns[:max(0, len(turns) - self.keep_recent_turns)]
+            if not folded:
+                return
+
+            transcript = "\n".join(f"{t['role'].upper()}: {t['content']}" for t in folded)
+            prompt = (
+                f"Current summary:\n{session.get('summary') or '(none)'}\n\n"
+                f"New conversation turns to merge into the summary:\n{transcript}"
+            )
+            summary = await ai_handler.generate_content(
+                prompt, system_instruction=SUMMARY_SYSTEM_INSTRUCTION, priority=PRIORITY_BACKGROUND
+            )
+            if not summary or summary == AI_EXHAUSTED_MESSAGE:
+                log_error(f"Skipped chat history compaction for session {session_id}: summary failed.")
+                return
+
+            await db.chat_sessions.update_one(
+                self._filter(session_id, ticket_id),
+                {
+                    "$set": {"summary": summary.strip()},
+                    "$pull": {"turns": {"id": {"$in": [t["id"] for t in folded]}}},
+                },
+            )
+            log_success(f"Compacted {len(folded)} turns of session {session_id} into its summary.")
+        except Exception as e:
+            log_error(f"Chat history compaction failed for session {session_id}: {e}")
+
+
+def create_conversation_store():
+    return ConversationStore(
+        token_budget=max(100, _env_int("CHAT_HISTORY_TOKEN_BUDGET", 2000)),
+        keep_recent_turns=max(0, _env_int("CHAT_HISTORY_KEEP_TURNS", 6)),
+    )
+
+
+# Initialize a global instance
+conversation_store = create_conversation_store()
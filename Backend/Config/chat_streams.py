@@ -0,0 +1,303 @@
+"""
+Resumable Chat Streams Module
+
+Without this module a dropped connection mid-answer ends the generation, and
+asking again pays for the whole answer a second time. Here every chat answer
+is generated by a background producer that writes its SSE frames into a
+replay buffer; HTTP responses only follow that buffer, so a client can
+reconnect and pick up where it left off.
+
+Key Features:
+1. Stream IDs: Each answer gets a random stream ID, sent in `X-Stream-Id`.
+   Its frames carry event IDs of the form "<stream_id>-<seq>", so the
+   `Last-Event-ID` of a reconnect names both the stream and the position.
+2. Replay Then Attach: A reconnect replays the frames after its
+   `Last-Event-ID`, then follows the still-running generation live.
+   Only the client that started a stream, asking the same question, may resume it.
+3. Bounded Buffers: Each stream keeps at most CHAT_STREAM_BUFFER_BYTES of
+   frames (oldest dropped first), and all streams together at most
+   CHAT_STREAM_MEMORY_MAX. Over the global cap, finished streams are evicted
+   first, then the oldest frames of the largest running streams.
+4. Short Lifetime: Finished streams stay resumable for CHAT_STREAM_LINGER
+   seconds. A running stream nobody follows is cancelled (closing the
+   upstream) after CHAT_STREAM_DETACH_GRACE seconds (default 5). This is the
+   tradeoff between resuming and cost: a closed tab still generates (and is
+   charged) for up to the grace period, while a reconnect that takes longer
+   than it finds the answer stopped and has to ask again. The default covers
+   a page reload or a brief network drop without letting abandoned answers
+   run on.
+"""
+
+import os
+import time
+import asyncio
+from collections import deque
+from Config.logger import log_info, log_error, log_warning
+from Config.fast_json import error_frame, with_event_id, HEARTBEAT_FRAME
+
+RESUME_GAP_MESSAGE = "Part of this answer is no longer available. Please ask again."
+STOPPED_MESSAGE = "This answer was stopped because nobody was following it. Please ask again."
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def stream_event_id(stream_id: str, seq: int) -> str:
+    return f"{stream_id}-{seq}"
+
+
+def parse_event_id(last_event_id: str):
+    """(stream_id, seq) of a chat event ID, or (None, None) when malformed."""
+    stream_id, _, seq = (last_event_id or "").rpartition("-")
+    try:
+        seq = int(seq)
+    except ValueError:
+        return None, None
+    if not stream_id or seq < 0:
+        return None, None
+    return stream_id, seq
+
+
+class ChatStream:
+    """
+    One answer being generated. `frames` holds (seq, frame) for every frame
+    with an event ID; heartbeats are not buffered, only counted.
+    """
+
+    def __init__(self, registry, stream_id: str, client: str, key: tuple, session_id: str = None):
+        self.registry = registry
+        self.stream_id = stream_id
+        self.client = client
+        self.key = key
+        self.session_id = session_id
+        self.frames = deque()
+        self.bytes = 0
+        self.seq = 0
+        self.heartbeats = 0
+        self.done = False
+        self.finished_at = None
+        self.subscribers = 0
+        self.task = None
+        self.timer = None  # detach-grace or linger timer
+        self.changed = asyncio.Event()
+
+    def _notify(self):
+        # Wake everyone waiting on the current event, then arm a fresh one
+        event, self.changed = self.changed, asyncio.Event()
+        event.set()
+
+    def _append(self, frame: bytes):
+        self.seq += 1
+        self.frames.append((self.seq, frame))
+        self.bytes += len(frame)
+        self.registry._added(self, len(frame))
+
+    async def _pump(self, source):
+        try:
+            async for frame in source:
+                if frame == HEARTBEAT_FRAME:
+                    self.heartbeats += 1
+                else:
+                    self._append(frame)
+                self._notify()
+        except asyncio.CancelledError:
+            # Abandoned (or shutting down): late reconnects learn why the answer ends here
+            self._append(with_event_id(stream_event_id(self.stream_id, self.seq + 1), error_frame(STOPPED_MESSAGE)))
+        except Exception as e:
+            log_error(f"Chat stream {self.stream_id} producer failed: {e}")
+            self._append(with_event_id(stream_event_id(self.stream_id, self.seq + 1), error_frame(str(e))))
+        finally:
+            await source.aclose()
+            self.done = True
+            self.finished_at = time.monotonic()
+            self._notify()
+            self.registry._finished(self)
+
+    def trim(self, target_bytes: int) -> int:
+        """Drops the oldest frames until the buffer fits `target_bytes`; returns bytes freed."""
+        freed = 0
+        while self.frames and self.bytes > target_bytes:
+            _, frame = self.frames.popleft()
+            self.bytes -= len(frame)
+            freed += len(frame)
+        return freed
+
+    def can_replay_after(self, seq: int) -> bool:
+        oldest = self.frames[0][0] if self.frames else self.seq + 1
+        return oldest - 1 <= seq <= self.seq
+
+    async def follow(self, after: int = 0, request=None):
+        """Yields the frames after event `after`, then follows the live stream until it ends."""
+        self.subscribers += 1
+        if not self.done:
+            # Stops the detach grace; a finished stream keeps its linger timer
+            self._cancel_timer()
+        position = after
+        heartbeats = self.heartbeats
+        try:
+            while True:
+                if not self.can_replay_after(position):
+                    # Frames this subscriber still needed were evicted
+                    yield error_frame(RESUME_GAP_MESSAGE)
+                    return
+                if position < self.seq:
+                    seq, frame = self.frames[position + 1 - self.frames[0][0]]
+                    position = seq
+                    yield frame
+                elif self.done:
+                    return
+                elif self.heartbeats != heartbeats:
+                    heartbeats = self.heartbeats
+                    yield HEARTBEAT_FRAME
+                else:
+                    await self.changed.wait()
+                    continue
+                if request is not None and await request.is_disconnected():
+                    return
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.done:
+                self.registry._detached(self)
+
+    def _cancel_timer(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+
+class ChatStreamRegistry:
+    def __init__(self, stream_bytes: int = 256 * 1024, max_bytes: int = 16 * 1024 * 1024,
+                 linger: float = 60.0, detach_grace: float = 5.0):
+        self.stream_bytes = stream_bytes
+        self.max_bytes = max_bytes
+        self.linger = linger
+        self.detach_grace = detach_grace
+        self.streams = {}  # stream_id -> ChatStream
+        self.bytes = 0
+        self.started = 0
+        self.resumed = 0
+        self.resume_misses = 0
+        self.abandoned = 0
+        self.evicted_streams = 0
+        self.evicted_bytes = 0
+
+    def start(self, stream_id: str, client: str, key: tuple, source, session_id: str = None) -> ChatStream:
+        """Runs the frame generator `source` in a background producer and registers its stream."""
+        stream = ChatStream(self, stream_id, client, key, session_id)
+        self.streams[stream_id] = stream
+        self.started += 1
+        stream.task = asyncio.create_task(stream._pump(source))
+        self._detached(stream)  # until the first follower attaches
+        return stream
+
+    def resume(self, last_event_id: str, client: str, key: tuple):
+        """
+        (stream, seq) for a reconnect's `Last-Event-ID`, or (None, None) when that
+        stream is unknown, expired, owned by someone else or no longer replayable.
+        """
+        stream_id, seq = parse_event_id(last_event_id)
+        stream = self.streams.get(stream_id) if stream_id else None
+        if stream is None or stream.client != client or stream.key != key or not stream.can_replay_after(seq):
+            self.resume_misses += 1
+            return None, None
+        self.resumed += 1
+        log_info(f"Resuming chat stream {stream_id} after event {seq}.")
+        return stream, seq
+
+    # ── Bookkeeping (called by ChatStream) ───────────────────────────────────
+    def _added(self, stream: ChatStream, size: int):
+        self.bytes += size
+        if stream.bytes > self.stream_bytes:
+            self._free(stream.trim(self.stream_bytes))
+        if self.bytes > self.max_bytes:
+            self._evict()
+
+    def _free(self, size: int):
+        self.bytes -= size
+        self.evicted_bytes += size
+
+    def _evict(self):
+        # Finished streams go first, oldest first; they only serve late reconnects
+        for stream in sorted((s for s in self.streams.values() if s.done), key=lambda s: s.finished_at):
+            if self.bytes <= self.max_bytes:
+                return
+            self._remove(stream)
+            self._free(stream.trim(0))
+            self.evicted_streams += 1
+        # Then halve the largest running buffers, dropping their oldest frames
+        while self.bytes > self.max_bytes:
+            largest = max(self.streams.values(), key=lambda s: s.bytes, default=None)
+            if largest is None or not largest.bytes:
+                return
+            self._free(largest.trim(largest.bytes // 2))
+
+    def _remove(self, stream: ChatStream):
+        stream._cancel_timer()
+        if self.streams.get(stream.stream_id) is stream:
+            del self.streams[stream.stream_id]
+
+    def _expire(self, stream: ChatStream):
+        stream.timer = None
+        self._remove(stream)
+        self.bytes -= stream.trim(0)
+
+    def _finished(self, stream: ChatStream):
+        stream._cancel_timer()
+        if self.streams.get(stream.stream_id) is stream:
+            stream.timer = asyncio.get_running_loop().call_later(self.linger, self._expire, stream)
+
+    def _detached(self, stream: ChatStream):
+        stream._cancel_timer()
+        stream.timer = asyncio.get_running_loop().call_later(self.detach_grace, self._abandon, stream)
+
+    def _abandon(self, stream: ChatStream):
+        stream.timer = None
+        if stream.subscribers == 0 and not stream.done:
+            log_warning(f"Nobody reconnected to chat stream {stream.stream_id}; cancelling its generation.")
+            self.abandoned += 1
+            stream.task.cancel()
+
+    async def stop(self):
+        tasks = []
+        for stream in list(self.streams.values()):
+            stream._cancel_timer()
+            if stream.task is not None and not stream.task.done():
+                stream.task.cancel()
+                tasks.append(stream.task)
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.streams.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        running = sum(1 for stream in self.streams.values() if not stream.done)
+        return {
+            "running": running,
+            "finished": len(self.streams) - running,
+            "bytes": self.bytes,
+            "started": self.started,
+            "resumed": self.resumed,
+            "resume_misses": self.resume_misses,
+            "abandoned": self.abandoned,
+            "evicted_streams": self.evicted_streams,
+            "evicted_bytes": self.evicted_bytes,
+        }
+
+
+# Initialize a global instance
+chat_streams = ChatStreamRegistry(
+    stream_bytes=max(1024, _env_int("CHAT_STREAM_BUFFER_BYTES", 256 * 1024)),
+    max_bytes=max(1024, _env_int("CHAT_STREAM_MEMORY_MAX", 16 * 1024 * 1024)),
+    linger=max(0.0, _env_float("CHAT_STREAM_LINGER", 60.0)),
+    detach_grace=max(0.0, _env_float("CHAT_STREAM_DETACH_GRACE", 5.0)),
+)
@@ -8,17 +8,23 @@ verify connectivity via administrative pings, and gracefully close connections.
 Functions:
     ConnectToDB: Initializes the MongoClient and selects the target database.
     DisconnectFromDB: Closes the active MongoDB client connection.
+    CreateIndexes: Ensures the indexes used by the ticket read and search paths exist.
     get_db: Returns the current database instance for use in other modules.
 """
 
 import os
 from Config.logger import log_success, log_error
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, TEXT
 from dotenv import load_dotenv
 
 load_dotenv()
 
 MONGODB_URI = os.getenv("MONGODB_URI")
+try:
+    CHAT_SESSION_TTL_DAYS = int(os.getenv("CHAT_SESSION_TTL_DAYS", 30))
+except ValueError:
+    CHAT_SESSION_TTL_DAYS = 30
 client = None
 db = None
 
@@ -46,5 +52,59 @@ async def DisconnectFromDB():
     except Exception as error:
         log_error(f"Failed to disconnect MongoDB: {error}")
 
+# indexes used by the ticket list, search, feed and chat queries: (collection, keys, options)
+INDEXES = [
+    # Keyset pagination walks (created_at, _id) newest-first
+    ("tickets", [("created_at", DESCENDING), ("_id", DESCENDING)], {"name": "created_at_id_desc"}),
+    # Restart re-scan of tickets still waiting for an AI summary
+    ("tickets", "summary_status", {
+        "name": "summary_status_pending",
+        "partialFilterExpression": {"summary_status": "pending"},
+    }),
+    # Ticket search: one weighted text index plus filter indexes that keep
+    # the (created_at, _id) sort of the cursor pagination
+    ("tickets", [("title", TEXT), ("tags", TEXT), ("ai_summary", TEXT), ("description", TEXT)], {
+        "name": "ticket_text_search",
+        "weights": {"title": 10, "tags": 5, "ai_summary": 2, "description": 1},
+        "default_language": "english",
+    }),
+    ("tickets", [("category", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], {"name": "category_created_at"}),
+    ("tickets", [("tags", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], {"name": "tags_created_at"}),
+    # Polling fallback of the real-time ticket feed walks (updated_at, _id);
+    # also serves the ticket list's newest-updated_at version query
+    ("tickets", [("updated_at", ASCENDING), ("_id", ASCENDING)], {"name": "updated_at_id"}),
+    # One chat thread per (session, ticket); idle threads expire automatically
+    ("chat_sessions", [("session_id", ASCENDING), ("ticket_id", ASCENDING)], {
+        "name": "session_ticket_unique",
+        "unique": True,
+    }),
+    ("chat_sessions", "updated_at", {
+        "name": "chat_session_ttl",
+        "expireAfterSeconds": CHAT_SESSION_TTL_DAYS * 24 * 3600,
+    }),
+]
+
+async def CreateIndexes():
+    """
+    Ensures every index exists. Each index is created on its own, so one conflict
+    (e.g. an existing index with other options) does not skip the rest. Returns
+    the names of the indexes that could not be created.
+    """
+    if db is None:
+        log_error("Skipping index creation: database not connected.")
+        return []
+    failed = []
+    for collection, keys, options in INDEXES:
+        try:
+            await db[collection].create_index(keys, **options)
+        except Exception as error:
+            failed.append(options["name"])
+            log_error(f"Failed to create MongoDB index {collection}.{options['name']}: {error}")
+    if failed:
+        log_error(f"{len(failed)} MongoDB index(es) missing: {', '.join(failed)}.")
+    else:
+        log_success("MongoDB indexes ensured.")
+    return failed
+
 def get_db():
     return db
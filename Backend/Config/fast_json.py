@@ -0,0 +1,58 @@
+"""
+Fast JSON Encoding Module
+
+This module is the single place the API encodes JSON on its hot paths: ticket
+list/search responses and SSE frames. It uses `orjson`, which writes UTF-8
+bytes directly and is several times faster than `json.dumps`.
+
+Key Features:
+1. `dumps()`: orjson with the types our documents contain (naive datetimes are
+   written like Pydantic writes them; ObjectIds and other values become strings).
+2. `FastJSONResponse`: Response class for trusted, already-serialized data.
+   Returning it directly from a route skips FastAPI's `response_model`
+   validation and encoding; the model still documents the route in OpenAPI.
+3. Pre-encoded SSE Frames: Chat text frames are built from fixed byte
+   templates around the encoded text, and constant frames are encoded once.
+   `with_event_id` prefixes a frame with its `id:` line.
+"""
+
+import orjson
+from starlette.responses import JSONResponse
+
+
+def _default(value):
+    return str(value)
+
+
+def dumps(value) -> bytes:
+    return orjson.dumps(value, default=_default)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson; the content is not validated."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+# ── SSE frames ───────────────────────────────────────────────────────────────
+_TEXT_FRAME_START = b'data: {"text":'
+_ERROR_FRAME_START = b'data: {"error":'
+_FRAME_END = b"}\n\n"
+
+DONE_FRAME = b"data: [DONE]\n\n"
+HEARTBEAT_FRAME = b": keep-alive\n\n"
+
+
+def text_frame(text: str) -> bytes:
+    """`data: {"text": ...}` frame for one chunk of a chat answer."""
+    return _TEXT_FRAME_START + orjson.dumps(text) + _FRAME_END
+
+
+def error_frame(message: str) -> bytes:
+    """`data: {"error": ...}` frame shown to the user in the chat."""
+    return _ERROR_FRAME_START + orjson.dumps(message) + _FRAME_END
+
+
+def with_event_id(event_id, frame: bytes) -> bytes:
+    return b"id: " + str(event_id).encode("ascii") + b"\n" + frame
@@ -0,0 +1,301 @@
+"""
+Ticket Image Store Module
+
+Ticket images used to live inline in each ticket document as base64 data URIs,
+so every ticket list response copied the full image bytes. This module keeps
+image bytes out of the `tickets` collection; tickets only hold an `image_id`.
+
+Key Features:
+1. Content Addressing: An image's ID is the SHA-256 of its bytes. Identical
+   uploads are stored once, and the ID doubles as a strong ETag, so responses
+   can be cached forever (`immutable`).
+2. Pluggable Backends: IMAGE_STORE=gridfs (default) keeps images in the
+   `ticket_images` GridFS bucket; IMAGE_STORE=local keeps them as files under
+   IMAGE_STORE_DIR, for single-node setups.
+3. Ranged Reads: `open()` returns a `StoredImage` whose `iter_range()` reads
+   any byte range in IMAGE_READ_CHUNK pieces, without loading the whole image.
+   The local backend does all file system calls in worker threads, so a slow
+   disk never stalls the event loop.
+4. Validation: Only raster types in IMAGE_CONTENT_TYPES up to IMAGE_MAX_BYTES
+   are accepted (no SVG, which could carry scripts).
+5. Migration: At startup, tickets still holding an inline data URI are moved
+   to the store in the background.
+"""
+
+import os
+import re
+import base64
+import asyncio
+import hashlib
+import datetime
+from gridfs.errors import NoFile
+from pymongo.errors import DuplicateKeyError
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from Config.db import get_db
+from Config.logger import log_info, log_error, log_success
+from Config.ticket_list_cache import ticket_list_cache
+
+IMAGE_CONTENT_TYPES = {"image/png", "image/jpeg", "image/gif", "image/webp", "image/avif"}
+IMAGE_READ_CHUNK = 256 * 1024
+IMAGE_URL_PREFIX = "/api/tickets/images/"
+
+DATA_URI_PATTERN = re.compile(r"^data:([\w.+-]+/[\w.+-]+);base64,", re.IGNORECASE)
+IMAGE_ID_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+IMAGE_MAX_BYTES = _env_int("IMAGE_MAX_BYTES", 2 * 1024 * 1024)
+
+
+def image_url(image_id: str) -> str:
+    return f"{IMAGE_URL_PREFIX}{image_id}"
+
+
+def image_id_from_url(value: str):
+    """The image ID of one of our own image URLs, else None."""
+    if value and value.startswith(IMAGE_URL_PREFIX):
+        image_id = value[len(IMAGE_URL_PREFIX):]
+        if IMAGE_ID_PATTERN.match(image_id):
+            return image_id
+    return None
+
+
+def is_data_uri(value: str) -> bool:
+    return bool(value) and value[:5].lower() == "data:"
+
+
+def check_image(content_type: str, size: int):
+    """Raises ValueError when an image of this type/size is not accepted."""
+    if content_type not in IMAGE_CONTENT_TYPES:
+        raise ValueError(f"Unsupported image type '{content_type}'. Allowed: {', '.join(sorted(IMAGE_CONTENT_TYPES))}")
+    if size > IMAGE_MAX_BYTES:
+        raise ValueError(f"Image must be at most {IMAGE_MAX_BYTES // 1024} KiB.")
+
+
+def check_data_uri(value: str) -> str:
+    """Validates a data URI without decoding it; returns its content type."""
+    match = DATA_URI_PATTERN.match(value)
+    if not match:
+        raise ValueError("Image must be a base64 data URI.")
+    content_type = match.group(1).lower()
+    check_image(content_type, (len(value) - match.end()) * 3 // 4)
+    return content_type
+
+
+def decode_data_uri(value: str):
+    """Returns (content_type, bytes) of a base64 data URI; raises ValueError."""
+    content_type = check_data_uri(value)
+    try:
+        data = base64.b64decode(value[DATA_URI_PATTERN.match(value).end():], validate=True)
+    except ValueError:
+        raise ValueError("Image data is not valid base64.")
+    check_image(content_type, len(data))
+    return content_type, data
+
+
+class StoredImage:
+    """Metadata of a stored image plus a reader for byte ranges."""
+
+    def __init__(self, image_id: str, content_type: str, length: int, read_range):
+        self.image_id = image_id
+        self.content_type = content_type
+        self.length = length
+        self.etag = f'"{image_id}"'
+        self._read_range = read_range
+
+    def iter_range(self, start: int = 0, end: int = None):
+        """Async iterator over bytes [start, end] (inclusive), in IMAGE_READ_CHUNK pieces."""
+        end = self.length - 1 if end is None else end
+        return self._read_range(start, end)
+
+
+class ImageStore:
+    """Async interface every image store backend implements."""
+
+    async def put(self, data: bytes, content_type: str) -> str:
+        raise NotImplementedError
+
+    async def open(self, image_id: str):
+        """Returns a StoredImage, or None when the image does not exist."""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        raise NotImplementedError
+
+
+class GridFSImageStore(ImageStore):
+    def __init__(self, bucket_name: str = "ticket_images"):
+        self.bucket_name = bucket_name
+        self.bucket = None
+        self.bucket_db = None
+        self.stored = 0
+        self.deduplicated = 0
+
+    def _get_bucket(self):
+        db = get_db()
+        if db is None:
+            raise Exception("Database not connected")
+        if self.bucket is None or self.bucket_db is not db:
+            self.bucket = AsyncIOMotorGridFSBucket(db, bucket_name=self.bucket_name, chunk_size_bytes=IMAGE_READ_CHUNK)
+            self.bucket_db = db
+        return self.bucket
+
+    async def put(self, data: bytes, content_type: str) -> str:
+        image_id = hashlib.sha256(data).hexdigest()
+        bucket = self._get_bucket()
+        if await get_db()[f"{self.bucket_name}.files"].count_documents({"_id": image_id}, limit=1):
+            self.deduplicated += 1
+            return image_id
+        try:
+            await bucket.upload_from_stream_with_id(image_id, image_id, data, metadata={"content_type": content_type})
+            self.stored += 1
+        except DuplicateKeyError:
+            self.deduplicated += 1  # stored concurrently by another request
+        return image_id
+
+    async def open(self, image_id: str):
+        try:
+            grid_out = await self._get_bucket().open_download_stream(image_id)
+        except NoFile:
+            return None
+
+        async def read_range(start: int, end: int):
+            grid_out.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                data = await grid_out.read(min(IMAGE_READ_CHUNK, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                yield data
+
+        return StoredImage(image_id, (grid_out.metadata or {}).get("content_type", "application/octet-stream"),
+                           grid_out.length, read_range)
+
+    def stats(self) -> dict:
+        return {"backend": "gridfs", "stored": self.stored, "deduplicated": self.deduplicated}
+
+
+class LocalImageStore(ImageStore):
+    """Images as files under `root/<id[:2]>/<id>`, with the content type in `<id>.type`."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.stored = 0
+        self.deduplicated = 0
+
+    def _path(self, image_id: str) -> str:
+        return os.path.join(self.root, image_id[:2], image_id)
+
+    def _write(self, path: str, data: bytes, content_type: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        for target, payload in ((f"{path}.type", content_type.encode("ascii")), (path, data)):
+            temp = f"{target}.{os.getpid()}.tmp"
+            with open(temp, "wb") as f:
+                f.write(payload)
+            os.replace(temp, target)  # readers never see a partial file
+
+    @staticmethod
+    def _stat(path: str):
+        """(length, content type) of a stored image; raises OSError when it is missing."""
+        length = os.path.getsize(path)
+        with open(f"{path}.type", "r", encoding="ascii") as f:
+            return length, f.read().strip()
+
+    async def put(self, data: bytes, content_type: str) -> str:
+        image_id = hashlib.sha256(data).hexdigest()
+        path = self._path(image_id)
+        if await asyncio.to_thread(os.path.exists, path):
+            self.deduplicated += 1
+            return image_id
+        await asyncio.to_thread(self._write, path, data, content_type)
+        self.stored += 1
+        return image_id
+
+    async def open(self, image_id: str):
+        path = self._path(image_id)
+        try:
+            length, content_type = await asyncio.to_thread(self._stat, path)
+        except OSError:
+            return None
+
+        def read(start: int, size: int) -> bytes:
+            with open(path, "rb") as f:
+                f.seek(start)
+                return f.read(size)
+
+        async def read_range(start: int, end: int):
+            position = start
+            while position <= end:
+                data = await asyncio.to_thread(read, position, min(IMAGE_READ_CHUNK, end - position + 1))
+                if not data:
+                    break
+                position += len(data)
+                yield data
+
+        return StoredImage(image_id, content_type, length, read_range)
+
+    def stats(self) -> dict:
+        return {"backend": "local", "stored": self.stored, "deduplicated": self.deduplicated}
+
+
+class InlineImageMigration:
+    """Background task moving inline data-URI images of existing tickets into the store."""
+
+    def __init__(self, store: ImageStore):
+        self.store = store
+        self.task = None
+        self.migrated = 0
+
+    async def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    async def _run(self):
+        db = get_db()
+        if db is None:
+            log_error("Inline image migration skipped: database not connected.")
+            return
+        try:
+            async for ticket in db.tickets.find({"image": {"$regex": "^data:"}}, {"image": 1}):
+                try:
+                    content_type, data = decode_data_uri(ticket["image"])
+                except ValueError as e:
+                    log_error(f"Leaving inline image of ticket {ticket['_id']} in place: {e}")
+                    continue
+                image_id = await self.store.put(data, content_type)
+                await db.tickets.update_one(
+                    {"_id": ticket["_id"], "image": ticket["image"]},
+                    {"$set": {"image_id": image_id, "updated_at": datetime.datetime.utcnow()}, "$unset": {"image": ""}},
+                )
+                ticket_list_cache.invalidate()
+                self.migrated += 1
+            if self.migrated:
+                log_success(f"Moved {self.migrated} inline ticket images to the image store.")
+            else:
+                log_info("No inline ticket images to migrate.")
+        except Exception as e:
+            log_error(f"Inline image migration failed: {e}")
+
+
+def create_image_store() -> ImageStore:
+    if os.getenv("IMAGE_STORE", "gridfs").lower() == "local":
+        return LocalImageStore(os.getenv("IMAGE_STORE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "images")))
+    return GridFSImageStore()
+
+
+# Initialize a global instance
+image_store = create_image_store()
+image_migration = InlineImageMigration(image_store)
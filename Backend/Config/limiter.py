@@ -1,19 +1,96 @@
 """
 Rate Limiting Configuration
 
-This module initializes the `Limiter` instance using `slowapi`, a FastAPI port of 
-`Flask-Limiter`. It is used to protect the API endpoints from abuse, 
-brute-force attacks, and denial-of-service (DoS) attempts by restricting 
+This module initializes the `Limiter` instance using `slowapi`, a FastAPI port of
+`Flask-Limiter`. It is used to protect the API endpoints from abuse,
+brute-force attacks, and denial-of-service (DoS) attempts by restricting
 the number of requests a client can make within a specific timeframe.
 
-- `key_func`: Uses the client's remote IP address (`get_remote_address`) as the 
+- `key_func`: Uses the client's remote IP address (`get_remote_address`) as the
   unique identifier for rate-limiting logic.
-- `limiter`: The global instance to be imported and used as a dependency or 
+- `limiter`: The global instance to be imported and used as a dependency or
   decorator in FastAPI route handlers.
+- Storage: Counters live in the backend named by RATE_LIMIT_STORAGE. `memory`
+  (default) keeps them in this process, which is fine for a single worker.
+  `mongodb` keeps them in MongoDB (MONGODB_URI, `limits` database, TTL-indexed),
+  so every uvicorn worker and replica shares one count per client. Any other
+  `limits` storage URI can be set with RATE_LIMIT_STORAGE_URI.
+- Strategy: RATE_LIMIT_STRATEGY defaults to `sliding-window-counter`, which is
+  counted atomically in the storage backend and avoids the burst at fixed-window
+  boundaries.
+- Failure Mode: If the shared storage is unreachable, requests are counted in
+  memory until it recovers instead of failing.
+- Off the Event Loop: slowapi and `limits` talk to the storage synchronously
+  (slowapi has no async storage path). With a network storage, the route check
+  of async endpoints runs in a worker thread (`asyncio.to_thread`), so a slow
+  MongoDB round-trip never stalls other requests or SSE streams. This costs one
+  thread hop per limited request and shares the default thread pool; in-memory
+  counters are cheap and stay on the event loop.
+
+Token-cost budgets for the chat routes and models are handled separately in
+`Config/token_budget.py`, on the same storage.
 """
 
+import os
+import asyncio
+import functools
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+from starlette.requests import Request
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RATE_LIMIT_STRATEGY = os.getenv("RATE_LIMIT_STRATEGY", "sliding-window-counter")
+
+
+def rate_limit_storage_uri() -> str:
+    """`limits` storage URI selected by RATE_LIMIT_STORAGE_URI / RATE_LIMIT_STORAGE."""
+    uri = os.getenv("RATE_LIMIT_STORAGE_URI")
+    if uri:
+        return uri
+    if os.getenv("RATE_LIMIT_STORAGE", "memory").lower() == "mongodb" and os.getenv("MONGODB_URI"):
+        return os.getenv("MONGODB_URI")
+    return "memory://"
+
+
+class OffloadingLimiter(Limiter):
+    """Limiter whose route checks for async endpoints run in a worker thread when `offload` is set."""
+
+    def __init__(self, *args, offload: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.offload = offload
+
+    def limit(self, *args, **kwargs):
+        decorate = super().limit(*args, **kwargs)
+
+        def decorator(func):
+            wrapper = decorate(func)  # registers the limit; checks inline on the event loop
+            if not self.offload or not asyncio.iscoroutinefunction(func):
+                return wrapper
+
+            @functools.wraps(func)
+            async def offloaded(*args, **kwargs):
+                request = kwargs.get("request")
+                if self.enabled and self._auto_check and isinstance(request, Request) \
+                        and not getattr(request.state, "_rate_limiting_complete", False):
+                    # Same check slowapi would run inline; the flag makes its wrapper skip it
+                    await asyncio.to_thread(self._check_request_limit, request, func, False)
+                    request.state._rate_limiting_complete = True
+                return await wrapper(*args, **kwargs)
+
+            return offloaded
+
+        return decorator
+
+
+STORAGE_URI = rate_limit_storage_uri()
 
 # Initialize limiter with a global key (remote address)
-limiter = Limiter(key_func=get_remote_address)
+limiter = OffloadingLimiter(
+    key_func=get_remote_address,
+    storage_uri=STORAGE_URI,
+    strategy=RATE_LIMIT_STRATEGY,
+    in_memory_fallback_enabled=True,
+    offload=not STORAGE_URI.startswith("memory://"),
+)
@@ -1,40 +1,210 @@
 """
 Logger Configuration Module
 
-This module provides a centralized utility for conditional logging during development. 
-It utilizes environment variables to toggle log visibility and formats output with 
-distinctive emojis for improved readability in the console.
-
-Functionality:
-- Loads environment configuration via dotenv.
-- Provides specialized wrappers for different log levels (Info, Success, Error, Warning).
-- Ensures logs are only emitted when the 'DEVELOPMENT' environment variable is set to 'true'.
+This module provides the centralized logging used across the backend. Call sites
+keep the simple `log_info` / `log_success` / `log_warning` / `log_error` /
+`log_debug` helpers, while records are written as structured lines by a
+background thread, so logging never blocks the event loop.
+
+Key Features:
+1. Levels: LOG_LEVEL (debug, info, warning, error; default info) decides which
+   records are written, in development and production alike. Success messages
+   are info records marked `"success": true`.
+2. Structured Output: With LOG_FORMAT=json (default) every record is one JSON
+   line with time, level, message and the ID of the request that logged it
+   (the `X-Request-Id` from Config/tracing.py), plus any keyword fields passed
+   by the caller. LOG_FORMAT=text keeps the emoji console format for local runs;
+   the old `log_debug(emoji, message)` form is still accepted.
+3. Sampling: Hot-path messages pass a `sample` key; only the first and then
+   every LOG_SAMPLE_EVERY-th record per key is written, carrying `sampled`
+   (how many records it stands for). Warnings and errors are never sampled.
+4. Non-Blocking: Records go onto a bounded queue (LOG_QUEUE_SIZE) through a
+   `QueueHandler`; a `QueueListener` thread formats and writes them. When the
+   queue is full records are dropped and counted instead of waited on.
+   `start()` / `stop()` are idempotent and may alternate, so an app whose
+   lifespan runs more than once (tests, reloads) keeps a running writer.
 """
 
 import os
+import sys
+import queue
+import atexit
+import logging
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+import orjson
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-DEVELOPMENT = os.getenv("DEVELOPMENT", "False").lower() == "true"
+LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+}
+
+EMOJIS = {
+    "debug": "🔍",
+    "info": "ℹ️",
+    "success": "✅",
+    "warning": "⚠️",
+    "error": "❌",
+}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "message": record.getMessage(),
+        }
+        if record.kind == "success":
+            entry["success"] = True
+        if record.request_id:
+            entry["request_id"] = record.request_id
+        if record.sampled > 1:
+            entry["sampled"] = record.sampled
+        entry.update(record.fields)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        emoji = record.fields.get("emoji") or EMOJIS[record.kind]
+        line = f"------------->{emoji} {record.getMessage()}"
+        if record.request_id:
+            line += f" [{record.request_id}]"
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Enqueues without ever waiting; a full queue drops the record."""
+
+    def __init__(self, records: queue.Queue):
+        super().__init__(records)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the listener thread, not in the request
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StructuredLogger:
+    def __init__(self, level: str = "info", fmt: str = "json", sample_every: int = 20,
+                 queue_size: int = 10000, stream=None):
+        self.level = LEVELS.get(level.lower(), logging.INFO)
+        self.sample_every = max(1, sample_every)
+        self.samples = {}  # sample key -> records seen
+        self.sampled_out = 0
+        self.request_id_provider = None
+
+        writer = logging.StreamHandler(stream or sys.stdout)
+        writer.setFormatter(TextFormatter() if fmt.lower() == "text" else JsonFormatter())
+        self.handler = DroppingQueueHandler(queue.Queue(maxsize=max(1, queue_size)))
+        self.listener = QueueListener(self.handler.queue, writer)
+
+        self.logger = logging.getLogger("thinkback")
+        self.logger.setLevel(self.level)
+        self.logger.propagate = False
+        self.logger.handlers = [self.handler]
+        self.started = False
+
+    def start(self):
+        """Starts the writer thread; a no-op while it runs, and allowed again after `stop()`."""
+        if not self.started:
+            self.listener.start()
+            self.started = True
+
+    def stop(self):
+        """Writes out everything still queued and stops the writer thread."""
+        if self.started:
+            self.listener.stop()
+            self.started = False
+
+    def set_request_id_provider(self, provider):
+        """`provider()` returns the current request ID, or None outside a request."""
+        self.request_id_provider = provider
+
+    def log(self, level: int, kind: str, message: str, sample: str = None, exc_info=None, **fields):
+        if level < self.level:
+            return
+        sampled = 1
+        if sample is not None and level < logging.WARNING:
+            seen = self.samples.get(sample, 0) + 1
+            self.samples[sample] = seen
+            if seen != 1 and seen % self.sample_every:
+                self.sampled_out += 1
+                return
+            sampled = 1 if seen == 1 else self.sample_every
+        request_id = fields.pop("request_id", None)
+        if request_id is None and self.request_id_provider is not None:
+            request_id = self.request_id_provider()
+        record = self.logger.makeRecord(self.logger.name, level, "", 0, message, None, exc_info, extra={
+            "kind": kind,
+            "request_id": request_id,
+            "sampled": sampled,
+            "fields": fields,
+        })
+        if not self.started:
+            # Before start / after stop (e.g. interpreter exit): write directly
+            self.listener.handlers[0].handle(record)
+            return
+        self.handler.handle(record)
+
+    def stats(self) -> dict:
+        return {
+            "level": logging.getLevelName(self.level).lower(),
+            "queued": self.handler.queue.qsize(),
+            "dropped": self.handler.dropped,
+            "sampled_out": self.sampled_out,
+        }
+
+
+# Initialize a global instance
+logger = StructuredLogger(
+    level=os.getenv("LOG_LEVEL", "info"),
+    fmt=os.getenv("LOG_FORMAT", "json"),
+    sample_every=_env_int("LOG_SAMPLE_EVERY", 20),
+    queue_size=_env_int("LOG_QUEUE_SIZE", 10000),
+)
+logger.start()
+atexit.register(logger.stop)
+
 
-def log_debug(emoji: str, message: str):
-    """
-    Prints a log message in the pattern: ------------->emoji message
-    Only runs if DEVELOPMENT is True.
-    """
-    if DEVELOPMENT:
-        print(f"------------->{emoji} {message}")
+def log_debug(*args, **fields):
+    """log_debug(message, **fields); the older log_debug(emoji, message) form is still accepted."""
+    if len(args) == 2:
+        fields.setdefault("emoji", args[0])
+    logger.log(logging.DEBUG, "debug", args[-1], **fields)
 
-def log_info(message: str):
-    log_debug("ℹ️", message)
+def log_info(message: str, **fields):
+    logger.log(logging.INFO, "info", message, **fields)
 
-def log_success(message: str):
-    log_debug("✅", message)
+def log_success(message: str, **fields):
+    logger.log(logging.INFO, "success", message, **fields)
 
-def log_error(message: str):
-    log_debug("❌", message)
+def log_error(message: str, **fields):
+    logger.log(logging.ERROR, "error", message, **fields)
 
-def log_warning(message: str):
-    log_debug("⚠️", message)
+def log_warning(message: str, **fields):
+    logger.log(logging.WARNING, "warning", message, **fields)
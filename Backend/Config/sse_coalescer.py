@@ -0,0 +1,121 @@
+"""
+SSE Token Coalescing Module
+
+Upstream models often stream one token per delta, so relaying each delta as its
+own SSE frame means thousands of tiny writes per answer: syscalls, proxy
+buffering overhead and one client render per token. `TokenCoalescer` sits
+between `stream_content` and the SSE relay and groups deltas into frames.
+
+Key Features:
+1. No TTFT Cost: The first text is sent as soon as it arrives, and so is any
+   text that arrives after a quiet gap of at least SSE_COALESCE_DELAY. Only
+   deltas arriving in quick succession are grouped.
+2. Bounded Delay: Grouped text is flushed once it reaches SSE_COALESCE_CHARS,
+   or SSE_COALESCE_DELAY seconds after the previous frame, whichever is first.
+   The upstream read is never cancelled to meet the deadline.
+3. Heartbeats: When nothing has been sent for SSE_HEARTBEAT_INTERVAL seconds
+   (e.g. a reasoning model thinking before its first token), a heartbeat is
+   yielded so proxies keep the connection open.
+4. Metrics: `deltas` and `frames` count what was received and what was sent.
+"""
+
+import os
+import asyncio
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+SSE_COALESCE_CHARS = max(1, _env_int("SSE_COALESCE_CHARS", 256))
+SSE_COALESCE_DELAY = max(0.0, _env_float("SSE_COALESCE_DELAY", 0.02))
+SSE_HEARTBEAT_INTERVAL = max(1.0, _env_float("SSE_HEARTBEAT_INTERVAL", 15.0))
+
+
+class TokenCoalescer:
+    """
+    Async iterator over an upstream chat stream yielding grouped text, or None
+    for a heartbeat. Upstream errors are raised after any buffered text is yielded.
+    """
+
+    def __init__(self, upstream, max_chars: int = SSE_COALESCE_CHARS, max_delay: float = SSE_COALESCE_DELAY,
+                 heartbeat_interval: float = SSE_HEARTBEAT_INTERVAL):
+        self.upstream = upstream
+        self.max_chars = max_chars
+        self.max_delay = max_delay
+        self.heartbeat_interval = heartbeat_interval
+        self.deltas = 0
+        self.frames = 0
+
+    def __aiter__(self):
+        return self._run()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        iterator = self.upstream.__aiter__()
+        pending = None
+        buffer, buffered = [], 0
+        last_sent = loop.time()
+        failure = None
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(iterator.__anext__())
+                if buffer:
+                    timeout = last_sent + self.max_delay - loop.time()
+                else:
+                    timeout = last_sent + self.heartbeat_interval - loop.time()
+                done, _ = await asyncio.wait({pending}, timeout=max(0.0, timeout))
+
+                if not done:
+                    # Deadline passed while upstream is still producing: flush or keep alive
+                    text = "".join(buffer) if buffer else None
+                    buffer, buffered = [], 0
+                    last_sent = loop.time()
+                    if text is not None:
+                        self.frames += 1
+                    yield text
+                    continue
+
+                task, pending = pending, None
+                try:
+                    chunk = task.result()
+                except StopAsyncIteration:
+                    break
+                except Exception as e:
+                    failure = e
+                    break
+                content = chunk.choices[0].delta.content if chunk.choices else None
+                if not content:
+                    continue
+                self.deltas += 1
+                buffer.append(content)
+                buffered += len(content)
+                # Alone after a quiet gap (or the first text): send now, no added latency
+                if buffered >= self.max_chars or (len(buffer) == 1 and loop.time() - last_sent >= self.max_delay) \
+                        or self.deltas == 1:
+                    text = "".join(buffer)
+                    buffer, buffered = [], 0
+                    last_sent = loop.time()
+                    self.frames += 1
+                    yield text
+        finally:
+            if pending is not None:
+                pending.cancel()
+                await asyncio.gather(pending, return_exceptions=True)
+
+        if buffer:
+            self.frames += 1
+            yield "".join(buffer)
+        if failure is not None:
+            raise failure
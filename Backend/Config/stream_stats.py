@@ -0,0 +1,62 @@
+"""
+Chat Stream Statistics Module
+
+This module keeps in-process counters for the SSE chat streams relayed by
+`chat_controller`. It tracks how many streams ran to completion and how many
+were aborted because the client disconnected, so the upstream generation
+could be cancelled early.
+
+Token counts are approximated by upstream content deltas (OpenRouter usually
+sends one token per delta). The "tokens saved" figure is an estimate: for each
+aborted stream it assumes the answer would have reached the average length
+of completed streams.
+
+Frames and bytes written to clients are counted too, to show how many upstream
+deltas `TokenCoalescer` groups into each SSE frame.
+"""
+
+
+class StreamStats:
+    def __init__(self):
+        self.completed_streams = 0
+        self.completed_tokens = 0
+        self.aborted_streams = 0
+        self.aborted_tokens = 0
+        self.tokens_saved_estimate = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+
+    def average_completed_tokens(self) -> float:
+        if not self.completed_streams:
+            return 0.0
+        return self.completed_tokens / self.completed_streams
+
+    def record_completed(self, tokens: int):
+        self.completed_streams += 1
+        self.completed_tokens += tokens
+
+    def record_aborted(self, tokens: int):
+        self.aborted_streams += 1
+        self.aborted_tokens += tokens
+        self.tokens_saved_estimate += max(0, int(self.average_completed_tokens()) - tokens)
+
+    def record_frames(self, frames: int, sent_bytes: int):
+        self.frames_sent += frames
+        self.bytes_sent += sent_bytes
+
+    def snapshot(self) -> dict:
+        deltas = self.completed_tokens + self.aborted_tokens
+        return {
+            "completed_streams": self.completed_streams,
+            "completed_tokens": self.completed_tokens,
+            "aborted_streams": self.aborted_streams,
+            "aborted_tokens": self.aborted_tokens,
+            "tokens_saved_estimate": self.tokens_saved_estimate,
+            "frames_sent": self.frames_sent,
+            "bytes_sent": self.bytes_sent,
+            "deltas_per_frame": round(deltas / self.frames_sent, 2) if self.frames_sent else 0.0,
+        }
+
+
+# Initialize a global instance
+stream_stats = StreamStats()
@@ -0,0 +1,378 @@
+"""
+Background AI Summarization Worker Module
+
+This module moves AI summary generation off the ticket creation request path.
+`create_ticket` inserts the ticket immediately with `summary_status: "pending"`
+and hands its ID to the global `summary_worker`, which fills in `ai_summary`
+in the background.
+
+Key Features:
+1. Bounded Concurrency: A fixed pool of asyncio worker tasks (SUMMARY_WORKERS)
+   drains the queue, so a burst of new tickets never fans out into an unbounded
+   number of simultaneous LLM calls. Summaries are admitted upstream at
+   background priority, behind interactive chat.
+2. Retries: Failed items are re-queued with a growing delay until
+   SUMMARY_MAX_ATTEMPTS is reached, after which the ticket is marked "failed".
+   Items that crash (e.g. on a database error) are retried the same way; once
+   out of attempts they stay "pending" until their lease expires.
+3. Leases: Several uvicorn workers or replicas share the `tickets` collection,
+   so a ticket is claimed (`find_one_and_update`) with this process's
+   `summary_owner` and a `summary_lease_until` of SUMMARY_LEASE seconds before
+   it is summarized. Only one process generates (and pays for) each summary,
+   and its final write only applies while the ticket is still pending and
+   claimed by it, so a late "failed" never overwrites another's summary.
+4. Restart Safety: On startup, and every SUMMARY_LEASE seconds after, the
+   worker re-scans MongoDB for "pending" tickets whose lease is missing or
+   expired and queues them again, so nothing is lost on redeploys or crashes.
+5. Duplicate Reuse: A ticket linked to a near-duplicate (`duplicate_of`) copies
+   that ticket's summary once it is completed instead of calling the LLM.
+6. Batched Summaries: Bulk-imported and re-scanned tickets go through
+   `enqueue_batch`. Up to SUMMARY_BATCH_SIZE of them (collected for at most
+   SUMMARY_BATCH_WAIT seconds) are summarized by one LLM call that returns a
+   JSON array. Any ticket the reply does not cover falls back to the
+   per-ticket queue.
+
+Summary status lifecycle: pending -> completed | failed
+"""
+
+import os
+import json
+import uuid
+import socket
+import asyncio
+import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne, ReturnDocument
+from Config.db import get_db
+from Config.ai_config import ai_handler, AI_EXHAUSTED_MESSAGE
+from Config.ai_admission import PRIORITY_BACKGROUND
+from Config.ticket_context import ticket_context_cache
+from Config.ticket_list_cache import ticket_list_cache
+from Config.ticket_dedup import duplicate_index
+from Config.logger import log_info, log_error, log_warning, log_success
+
+SUMMARY_STATUS_PENDING = "pending"
+SUMMARY_STATUS_COMPLETED = "completed"
+SUMMARY_STATUS_FAILED = "failed"
+
+SUMMARY_FAILED_TEXT = "AI summary generation failed."
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def build_summary_prompt(title: str, description: str) -> str:
+    return f"Summarize this educational ticket title and description concisely for a helpdesk: \nTitle: {title}\nDescription: {description}"
+
+
+def build_batch_summary_prompt(tickets: list) -> str:
+    listing = "\n\n".join(
+        f"Ticket {i + 1}:\nTitle: {t.get('title', '')}\nDescription: {t.get('description', '')}"
+        for i, t in enumerate(tickets)
+    )
+    return (
+        f"Summarize each of these {len(tickets)} educational tickets concisely for a helpdesk. "
+        f"Reply with only a JSON array of {len(tickets)} strings, one summary per ticket, in the same order.\n\n"
+        f"{listing}"
+    )
+
+
+def parse_batch_summaries(text: str, count: int):
+    """Returns one summary (or None) per ticket, or None if the reply is not a JSON array of `count` items."""
+    start, end = (text or "").find("["), (text or "").rfind("]")
+    if start == -1 or end <= start:
+        return None
+    try:
+        summaries = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    if not isinstance(summaries, list) or len(summaries) != count:
+        return None
+    return [s.strip() if isinstance(s, str) and s.strip() else None for s in summaries]
+
+
+class SummaryWorker:
+    def __init__(self):
+        self.concurrency = max(1, _env_int("SUMMARY_WORKERS", 2))
+        self.max_attempts = max(1, _env_int("SUMMARY_MAX_ATTEMPTS", 3))
+        self.retry_delay = max(0, _env_int("SUMMARY_RETRY_DELAY", 5))
+        self.batch_size = max(1, _env_int("SUMMARY_BATCH_SIZE", 8))
+        self.batch_wait = max(0, _env_int("SUMMARY_BATCH_WAIT", 2))
+        self.lease = max(1, _env_int("SUMMARY_LEASE", 300))
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.queue = None
+        self.batch_queue = None
+        self.tasks = []
+        self.retry_tasks = set()
+        self.queued = set()
+
+    async def start(self):
+        """Spawn the worker pool and re-queue tickets left pending by a previous run."""
+        if self.tasks:
+            return
+        self.queue = asyncio.Queue()
+        self.batch_queue = asyncio.Queue()
+        self.tasks = [asyncio.create_task(self._worker(i)) for i in range(self.concurrency)]
+        self.tasks.append(asyncio.create_task(self._batch_worker()))
+        log_info(f"Summary worker started with {self.concurrency} workers.")
+        await self.rescan_pending()
+        self.tasks.append(asyncio.create_task(self._rescan_worker()))
+
+    async def stop(self):
+        for task in [*self.tasks, *self.retry_tasks]:
+            task.cancel()
+        await asyncio.gather(*self.tasks, *self.retry_tasks, return_exceptions=True)
+        self.tasks = []
+        self.retry_tasks.clear()
+        self.queued.clear()
+        log_info("Summary worker stopped.")
+
+    def enqueue(self, ticket_id: str, attempt: int = 1):
+        if self.queue is None:
+            log_warning(f"Summary worker not running; ticket {ticket_id} stays pending until next start.")
+            return
+        if attempt == 1 and ticket_id in self.queued:
+            return
+        self.queued.add(ticket_id)
+        self.queue.put_nowait((ticket_id, attempt))
+
+    def enqueue_batch(self, ticket_id: str):
+        """Queues a ticket for a batched summary call (used for bulk imports)."""
+        if self.batch_queue is None:
+            log_warning(f"Summary worker not running; ticket {ticket_id} stays pending until next start.")
+            return
+        if ticket_id in self.queued:
+            return
+        self.queued.add(ticket_id)
+        self.batch_queue.put_nowait(ticket_id)
+
+    def _fall_back(self, ticket_ids):
+        """Moves tickets from the batched path to the per-ticket queue."""
+        for ticket_id in ticket_ids:
+            self.queued.discard(ticket_id)
+            self.enqueue(ticket_id)
+
+    def _unclaimed(self, now: datetime.datetime) -> dict:
+        """Filter for pending tickets nobody holds a live lease on (or that this process holds)."""
+        return {
+            "summary_status": SUMMARY_STATUS_PENDING,
+            "$or": [
+                {"summary_lease_until": None},
+                {"summary_lease_until": {"$lt": now}},
+                {"summary_owner": self.owner},
+            ],
+        }
+
+    def _claimed(self, ticket_id: str) -> dict:
+        """Filter for a ticket still pending and claimed by this process; guards every final write."""
+        return {"_id": ObjectId(ticket_id), "summary_status": SUMMARY_STATUS_PENDING, "summary_owner": self.owner}
+
+    async def _claim(self, db, ticket_id: str, projection: dict):
+        """Leases a pending ticket to this process; returns it, or None when it is done or held elsewhere."""
+        now = datetime.datetime.utcnow()
+        return await db.tickets.find_one_and_update(
+            {"_id": ObjectId(ticket_id), **self._unclaimed(now)},
+            {"$set": {"summary_owner": self.owner, "summary_lease_until": now + datetime.timedelta(seconds=self.lease)}},
+            projection=projection,
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def rescan_pending(self):
+        db = get_db()
+        if db is None:
+            log_error("Summary worker cannot re-scan pending tickets: database not connected.")
+            return
+        try:
+            cursor = db.tickets.find(self._unclaimed(datetime.datetime.utcnow()), {"_id": 1})
+            count = 0
+            async for ticket in cursor:
+                self.enqueue_batch(str(ticket["_id"]))
+                count += 1
+            if count:
+                log_info(f"Re-queued {count} pending ticket summaries.")
+        except Exception as e:
+            log_error(f"Failed to re-scan pending summaries: {e}")
+
+    async def _rescan_worker(self):
+        # Picks up tickets whose claiming process crashed once their lease runs out
+        while True:
+            await asyncio.sleep(self.lease)
+            await self.rescan_pending()
+
+    async def _worker(self, index: int):
+        while True:
+            ticket_id, attempt = await self.queue.get()
+            try:
+                await self._process(ticket_id, attempt)
+            except asyncio.CancelledError:
+                raise
+            except InvalidId:
+                log_error(f"Summary worker {index} dropped invalid ticket ID {ticket_id!r}.")
+                self.queued.discard(ticket_id)
+            except Exception as e:
+                # e.g. a database error: release the ticket so it is not stuck as "queued"
+                self.queued.discard(ticket_id)
+                if attempt < self.max_attempts:
+                    delay = self.retry_delay * attempt
+                    log_error(f"Summary worker {index} crashed on ticket {ticket_id} (attempt {attempt}/{self.max_attempts}); retrying in {delay}s: {e}")
+                    self._retry_later(ticket_id, attempt + 1, delay)
+                else:
+                    log_error(f"Summary worker {index} gave up on ticket {ticket_id}; it stays pending until its lease expires: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def _batch_worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.batch_queue.get()]
+            deadline = loop.time() + self.batch_wait
+            while len(batch) < self.batch_size:
+                if not self.batch_queue.empty():
+                    batch.append(self.batch_queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.batch_queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._process_batch(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log_error(f"Batched summary of {len(batch)} tickets failed: {e}")
+                self._fall_back(batch)
+
+    async def _process_batch(self, ticket_ids: list):
+        db = get_db()
+        if db is None:
+            raise Exception("Database not connected")
+
+        tickets = []
+        for ticket_id in ticket_ids:
+            ticket = await self._claim(db, ticket_id, {"title": 1, "description": 1, "duplicate_of": 1})
+            if ticket is not None:
+                tickets.append(ticket)
+        pending = {str(t["_id"]) for t in tickets}
+        for ticket_id in ticket_ids:
+            if ticket_id not in pending:
+                self.queued.discard(ticket_id)
+        # Linked duplicates wait for their original on the per-ticket path
+        batchable = [t for t in tickets if not t.get("duplicate_of")]
+        self._fall_back(str(t["_id"]) for t in tickets if t.get("duplicate_of"))
+        if len(batchable) < 2:
+            self._fall_back(str(t["_id"]) for t in batchable)
+            return
+
+        reply = await ai_handler.generate_content(build_batch_summary_prompt(batchable), priority=PRIORITY_BACKGROUND)
+        summaries = None if reply == AI_EXHAUSTED_MESSAGE else parse_batch_summaries(reply, len(batchable))
+        if summaries is None:
+            log_warning(f"Batched summary reply unusable; summarizing {len(batchable)} tickets individually.")
+            self._fall_back(str(t["_id"]) for t in batchable)
+            return
+
+        now = datetime.datetime.utcnow()
+        updates, stored, missing = [], [], []
+        for ticket, summary in zip(batchable, summaries):
+            if summary is None:
+                missing.append(str(ticket["_id"]))
+                continue
+            updates.append(UpdateOne(
+                self._claimed(str(ticket["_id"])),
+                {
+                    "$set": {"ai_summary": summary, "summary_status": SUMMARY_STATUS_COMPLETED, "updated_at": now},
+                    "$unset": {"summary_owner": "", "summary_lease_until": ""},
+                },
+            ))
+            stored.append(str(ticket["_id"]))
+        if updates:
+            await db.tickets.bulk_write(updates, ordered=False)
+            ticket_list_cache.invalidate()
+        for ticket_id in stored:
+            ticket_context_cache.invalidate(ticket_id)
+            self.queued.discard(ticket_id)
+        self._fall_back(missing)
+        log_success(f"Stored {len(stored)} AI summaries from one batched request.")
+
+    async def _process(self, ticket_id: str, attempt: int):
+        db = get_db()
+        if db is None:
+            raise Exception("Database not connected")
+
+        ticket = await self._claim(db, ticket_id, {"title": 1, "description": 1, "duplicate_of": 1})
+        if ticket is None:
+            # Already summarized, deleted, or being summarized by another process
+            self.queued.discard(ticket_id)
+            return
+
+        summary = None
+        try:
+            original = None
+            if ticket.get("duplicate_of"):
+                original = await db.tickets.find_one(
+                    {"_id": ObjectId(ticket["duplicate_of"])}, {"ai_summary": 1, "summary_status": 1}
+                )
+            original_status = (original or {}).get("summary_status")
+            if original_status == SUMMARY_STATUS_COMPLETED:
+                summary = original["ai_summary"]
+                duplicate_index.record_reuse()
+            elif original_status == SUMMARY_STATUS_PENDING and attempt < self.max_attempts:
+                # The original is still being summarized; check back instead of paying twice
+                self._retry_later(ticket_id, attempt + 1, self.retry_delay)
+                return
+            else:
+                prompt = build_summary_prompt(ticket.get("title", ""), ticket.get("description", ""))
+                summary = await ai_handler.generate_content(prompt, priority=PRIORITY_BACKGROUND)
+        except Exception as e:
+            log_error(f"Error generating AI summary for ticket {ticket_id}: {e}")
+
+        if summary and summary != AI_EXHAUSTED_MESSAGE:
+            if await self._finish(db, ticket_id, summary.strip(), SUMMARY_STATUS_COMPLETED):
+                log_success(f"AI summary stored for ticket {ticket_id}.")
+            return
+
+        if attempt < self.max_attempts:
+            delay = self.retry_delay * attempt
+            log_warning(f"Summary attempt {attempt}/{self.max_attempts} failed for {ticket_id}; retrying in {delay}s.")
+            self._retry_later(ticket_id, attempt + 1, delay)
+            return
+
+        if await self._finish(db, ticket_id, SUMMARY_FAILED_TEXT, SUMMARY_STATUS_FAILED):
+            log_error(f"AI summary failed permanently for ticket {ticket_id}.")
+
+    async def _finish(self, db, ticket_id: str, summary: str, status: str) -> bool:
+        """Stores the outcome and releases the lease; False when the ticket left this process meanwhile."""
+        result = await db.tickets.update_one(
+            self._claimed(ticket_id),
+            {
+                "$set": {"ai_summary": summary, "summary_status": status, "updated_at": datetime.datetime.utcnow()},
+                "$unset": {"summary_owner": "", "summary_lease_until": ""},
+            },
+        )
+        self.queued.discard(ticket_id)
+        if not result.matched_count:
+            log_warning(f"Summary lease on ticket {ticket_id} was lost; keeping the other worker's result.")
+            return False
+        ticket_context_cache.invalidate(ticket_id)
+        ticket_list_cache.invalidate()
+        return True
+
+    def _retry_later(self, ticket_id: str, attempt: int, delay: int):
+        task = asyncio.create_task(self._requeue_later(ticket_id, attempt, delay))
+        self.retry_tasks.add(task)
+        task.add_done_callback(self.retry_tasks.discard)
+
+    async def _requeue_later(self, ticket_id: str, attempt: int, delay: int):
+        await asyncio.sleep(delay)
+        self.enqueue(ticket_id, attempt)
+
+
+# Initialize a global instance
+summary_worker = SummaryWorker()
@@ -0,0 +1,91 @@
+"""
+Ticket Context Cache Module
+
+This module caches the rendered system instruction used by ticket-scoped chat.
+Without it, every message in a long tutoring session re-reads the ticket from
+MongoDB and re-renders TICKET_SYSTEM_PROMPT plus the formatting rules.
+
+Key Features:
+1. Read-Through: `get(ticket_id, render)` returns the cached instruction or
+   loads the ticket (projected to title, description and ai_summary only),
+   renders it and stores the result. Concurrent misses for the same ticket
+   share one database read.
+2. Eviction: Entries expire after TICKET_CONTEXT_TTL seconds and the least
+   recently used are evicted beyond TICKET_CONTEXT_MAX_ENTRIES.
+3. Invalidation: `invalidate(ticket_id)` is called whenever a ticket or its
+   `ai_summary` changes (e.g. by the background summary worker).
+"""
+
+import os
+import time
+import asyncio
+from collections import OrderedDict
+from bson import ObjectId
+from Config.db import get_db
+
+TICKET_CONTEXT_PROJECTION = {"title": 1, "description": 1, "ai_summary": 1}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class TicketContextCache:
+    def __init__(self, ttl: int = 300, max_entries: int = 500):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # ticket_id -> (expires_at, instruction)
+        self.loading = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, ticket_id: str, render):
+        """Returns the rendered instruction for `ticket_id`, or None if the ticket does not exist."""
+        entry = self.entries.get(ticket_id)
+        if entry is not None:
+            if entry[0] >= time.monotonic():
+                self.entries.move_to_end(ticket_id)
+                self.hits += 1
+                return entry[1]
+            del self.entries[ticket_id]
+
+        self.misses += 1
+        task = self.loading.get(ticket_id)
+        if task is None:
+            task = asyncio.create_task(self._load(ticket_id, render))
+            self.loading[ticket_id] = task
+            task.add_done_callback(lambda t: self.loading.pop(ticket_id, None) if self.loading.get(ticket_id) is t else None)
+        return await asyncio.shield(task)
+
+    async def _load(self, ticket_id: str, render):
+        db = get_db()
+        if db is None:
+            raise Exception("Database not connected")
+        ticket = await db.tickets.find_one({"_id": ObjectId(ticket_id)}, TICKET_CONTEXT_PROJECTION)
+        if not ticket:
+            return None
+        instruction = render(ticket)
+        if self.loading.get(ticket_id) is not asyncio.current_task():
+            return instruction  # invalidated while loading; don't cache stale text
+        self.entries[ticket_id] = (time.monotonic() + self.ttl, instruction)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return instruction
+
+    def invalidate(self, ticket_id: str):
+        ticket_id = str(ticket_id)
+        self.entries.pop(ticket_id, None)
+        self.loading.pop(ticket_id, None)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries)}
+
+
+# Initialize a global instance
+ticket_context_cache = TicketContextCache(
+    ttl=max(0, _env_int("TICKET_CONTEXT_TTL", 300)),
+    max_entries=max(1, _env_int("TICKET_CONTEXT_MAX_ENTRIES", 500)),
+)
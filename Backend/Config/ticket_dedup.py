@@ -0,0 +1,210 @@
+"""
+Near-Duplicate Ticket Detection Module
+
+This module spots tickets that are near-copies of existing ones, so their AI
+summary can be reused instead of paying for another `generate_content` call.
+
+Key Features:
+1. MinHash Signatures: The normalized title + description is split into word
+   3-shingles and hashed into a DUPLICATE_NUM_PERM-value MinHash signature,
+   whose agreement rate estimates Jaccard similarity.
+2. LSH Buckets: Signatures are cut into DUPLICATE_BANDS bands; tickets sharing
+   any band are candidates, and only candidates at or above
+   TICKET_DUPLICATE_THRESHOLD estimated similarity count as duplicates.
+3. Persistence: Signatures are stored in the `ticket_signatures` collection and
+   loaded at startup; tickets without one are backfilled.
+4. Metrics: Checks, duplicate hits and summaries reused are exposed via
+   `stats()` (see `GET /api/chat/stats`).
+"""
+
+import os
+import re
+import zlib
+import asyncio
+import numpy as np
+from bson import Binary, ObjectId
+from pymongo.errors import BulkWriteError
+from Config.db import get_db
+from Config.logger import log_error, log_success
+
+DUPLICATE_NUM_PERM = 64
+DUPLICATE_BANDS = 16  # 4 rows per band: 0.7-similar pairs share a band ~99% of the time
+SHINGLE_SIZE = 3
+BACKFILL_BATCH = 1000
+
+# Mersenne prime keeping (a * x + b) inside uint64
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.RandomState(20240607)  # fixed seed: signatures must match across restarts
+_PERM_A = _rng.randint(1, (1 << 31) - 1, size=DUPLICATE_NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, (1 << 31) - 1, size=DUPLICATE_NUM_PERM).astype(np.uint64)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def shingles(text: str) -> set:
+    words = TOKEN_PATTERN.findall((text or "").lower())
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(ticket: dict) -> np.ndarray:
+    """MinHash signature (uint32) of a ticket's title and description."""
+    text = f"{ticket.get('title', '')} {ticket.get('description', '')}"
+    hashes = np.array([zlib.crc32(s.encode("utf-8")) for s in shingles(text)], dtype=np.uint64) % _PRIME
+    permuted = (np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+class DuplicateIndex:
+    def __init__(self, threshold: float = 0.7):
+        self.threshold = threshold
+        self.rows = DUPLICATE_NUM_PERM // DUPLICATE_BANDS
+        self.signatures = {}  # ticket_id -> signature
+        self.buckets = {}  # (band, band bytes) -> set of ticket_ids
+        self.task = None
+        self.ready = False
+        self.checks = 0
+        self.duplicates = 0
+        self.summaries_reused = 0
+
+    def _bands(self, signature: np.ndarray):
+        for band in range(DUPLICATE_BANDS):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, ticket_id: str, signature: np.ndarray):
+        self.signatures[ticket_id] = signature
+        for key in self._bands(signature):
+            self.buckets.setdefault(key, set()).add(ticket_id)
+
+    def candidates(self, signature: np.ndarray) -> list:
+        """[(ticket_id, estimated_similarity), ...] at or above the threshold, most similar first."""
+        seen = set()
+        for key in self._bands(signature):
+            seen |= self.buckets.get(key, set())
+        matches = []
+        for ticket_id in seen:
+            similarity = float(np.mean(self.signatures[ticket_id] == signature))
+            if similarity >= self.threshold:
+                matches.append((ticket_id, similarity))
+        return sorted(matches, key=lambda m: m[1], reverse=True)
+
+    async def find_original(self, signature: np.ndarray, projection: dict):
+        """
+        Returns (ticket, similarity) for the most similar existing ticket, preferring
+        one whose summary is already completed, or None when nothing is close enough.
+        """
+        self.checks += 1
+        matches = self.candidates(signature)
+        db = get_db()
+        if not matches or db is None:
+            return None
+        similarity = dict(matches)
+        tickets = await db.tickets.find(
+            {"_id": {"$in": [ObjectId(ticket_id) for ticket_id in similarity]}}, projection
+        ).to_list(length=len(similarity))
+        if not tickets:
+            return None
+        self.duplicates += 1
+        tickets.sort(key=lambda t: (t.get("summary_status") == "completed", similarity[str(t["_id"])]), reverse=True)
+        return tickets[0], similarity[str(tickets[0]["_id"])]
+
+    def record_reuse(self):
+        self.summaries_reused += 1
+
+    async def save(self, ticket_id: str, signature: np.ndarray):
+        """Indexes and persists the signature of a new ticket."""
+        self.add(ticket_id, signature)
+        db = get_db()
+        if db is None:
+            return
+        try:
+            await db.ticket_signatures.replace_one(
+                {"_id": ObjectId(ticket_id)},
+                {"signature": Binary(signature.astype("<u4").tobytes())},
+                upsert=True,
+            )
+        except Exception as e:
+            log_error(f"Failed to persist duplicate signature for ticket {ticket_id}: {e}")
+
+    async def save_many(self, items: list):
+        """Indexes and persists [(ticket_id, signature), ...] with one write."""
+        for ticket_id, signature in items:
+            self.add(ticket_id, signature)
+        db = get_db()
+        if db is None or not items:
+            return
+        try:
+            await db.ticket_signatures.insert_many(
+                [{"_id": ObjectId(t), "signature": Binary(s.astype("<u4").tobytes())} for t, s in items],
+                ordered=False,
+            )
+        except BulkWriteError:
+            pass  # some signatures were already saved (e.g. by create_ticket during the backfill)
+        except Exception as e:
+            log_error(f"Failed to persist {len(items)} duplicate signatures: {e}")
+
+    # ── Startup load ────────────────────────────────────────────────────────
+    async def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._load())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    async def _load(self):
+        db = get_db()
+        if db is None:
+            log_error("Duplicate index cannot load: database not connected.")
+            return
+        try:
+            async for doc in db.ticket_signatures.find({}):
+                signature = np.frombuffer(doc["signature"], dtype="<u4").astype(np.uint32)
+                if signature.size == DUPLICATE_NUM_PERM:
+                    self.add(str(doc["_id"]), signature)
+            loaded = len(self.signatures)
+
+            # Backfill tickets created before signatures existed
+            batch = []
+            async for ticket in db.tickets.find({}, {"title": 1, "description": 1}):
+                if str(ticket["_id"]) not in self.signatures:
+                    batch.append(ticket)
+                if len(batch) >= BACKFILL_BATCH:
+                    await self._backfill(db, batch)
+                    batch = []
+            if batch:
+                await self._backfill(db, batch)
+            self.ready = True
+            log_success(f"Duplicate index loaded {loaded} signatures, backfilled {len(self.signatures) - loaded}.")
+        except Exception as e:
+            log_error(f"Duplicate index load failed: {e}")
+
+    async def _backfill(self, db, tickets: list):
+        signatures = await asyncio.to_thread(lambda: [minhash(t) for t in tickets])
+        await self.save_many([(str(t["_id"]), s) for t, s in zip(tickets, signatures)])
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "signatures": len(self.signatures),
+            "checks": self.checks,
+            "duplicates": self.duplicates,
+            "hit_rate": round(self.duplicates / self.checks, 4) if self.checks else 0.0,
+            "summaries_reused": self.summaries_reused,
+        }
+
+
+# Initialize a global instance
+duplicate_index = DuplicateIndex(
+    threshold=min(1.0, max(0.0, _env_float("TICKET_DUPLICATE_THRESHOLD", 0.7))),
+)
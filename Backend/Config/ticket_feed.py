@@ -0,0 +1,229 @@
+"""
+Real-Time Ticket Feed Module
+
+This module pushes ticket inserts and updates (e.g. a freshly generated AI
+summary) to every client connected to `GET /api/tickets/stream`, so the
+frontend no longer re-fetches the whole list to notice changes.
+
+Key Features:
+1. One Shared Watcher: A single MongoDB change stream on `tickets` serves all
+   connected clients; it starts with the first subscriber and stops
+   TICKET_FEED_LINGER seconds after the last one leaves, so a client that
+   reconnects (a page reload, a dropped connection) still finds its events.
+   The watcher resumes from its own resume token after transient errors.
+2. Polling Fallback: Standalone mongod has no change streams, so the watcher
+   falls back to polling every TICKET_FEED_POLL_INTERVAL seconds, walking
+   (`updated_at`, `_id`) so any number of tickets sharing one `updated_at`
+   (e.g. a batched summary write) is read exactly once.
+3. Fan-Out: Every subscriber has a bounded queue. A subscriber that falls
+   more than TICKET_FEED_QUEUE_SIZE events behind is dropped and reconnects.
+4. Resumable Clients: Events carry IDs of the form "<epoch>-<seq>". The last
+   TICKET_FEED_REPLAY events are kept, so a reconnect with `Last-Event-ID`
+   replays what it missed. If the ID is unknown (too old, from another
+   process, or from before the watcher was restarted) the client is told to
+   `reset` and re-fetch the list.
+"""
+
+import os
+import uuid
+import asyncio
+import datetime
+from collections import deque
+from bson import ObjectId
+from pymongo.errors import OperationFailure, PyMongoError
+from Config.db import get_db
+from Config.logger import log_info, log_error, log_warning
+from Schema.post_model import post_serializer
+
+# Ticket fields never pushed through the feed (large inline payloads)
+FEED_EXCLUDED_FIELDS = {"image": 0}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class TicketFeed:
+    def __init__(self, replay_size: int = 500, queue_size: int = 100, poll_interval: float = 2.0, linger: float = 60.0):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.seq = 0
+        self.replay = deque(maxlen=replay_size)  # (event_id, event)
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.linger = linger
+        self.subscribers = set()
+        self.task = None
+        self.linger_timer = None  # stops the watcher once nobody reconnected
+        self.resume_token = None
+        self.mode = None
+
+    # ── Subscribers ─────────────────────────────────────────────────────────
+    def subscribe(self, last_event_id: str = None):
+        """
+        Registers a subscriber queue and returns (queue, missed_events).
+        missed_events is None when `last_event_id` cannot be resumed.
+        """
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._cancel_linger()
+        if self.task is None or self.task.done():
+            # Changes made while nothing was watching cannot be replayed
+            self.epoch = uuid.uuid4().hex[:8]
+            self.replay.clear()
+            self.task = asyncio.create_task(self._run())
+        missed = [] if not last_event_id else self._events_after(last_event_id)
+        self.subscribers.add(queue)
+        return queue, missed
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+        if not self.subscribers and self.task is not None and self.linger_timer is None:
+            # Keep watching (and the replay buffer valid) for clients about to reconnect
+            self.linger_timer = asyncio.get_running_loop().call_later(self.linger, self._stop_watcher)
+
+    def _stop_watcher(self):
+        self.linger_timer = None
+        if self.subscribers or self.task is None:
+            return
+        self.task.cancel()
+        self.task = None
+        self.resume_token = None
+
+    def _cancel_linger(self):
+        if self.linger_timer is not None:
+            self.linger_timer.cancel()
+            self.linger_timer = None
+
+    def _events_after(self, last_event_id: str):
+        epoch, _, seq = last_event_id.partition("-")
+        try:
+            seq = int(seq)
+        except ValueError:
+            return None
+        oldest = self.replay[0][1]["seq"] if self.replay else self.seq + 1
+        if epoch != self.epoch or seq > self.seq or seq < oldest - 1:
+            return None
+        return [(event_id, event) for event_id, event in self.replay if event["seq"] > seq]
+
+    def _publish(self, event_type: str, ticket: dict):
+        self.seq += 1
+        event_id = f"{self.epoch}-{self.seq}"
+        event = {"seq": self.seq, "type": event_type, "ticket": post_serializer(ticket)}
+        self.replay.append((event_id, event))
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait((event_id, event))
+            except asyncio.QueueFull:
+                # Slow consumer: end its stream; it reconnects with Last-Event-ID and replays
+                log_warning("Dropping slow ticket feed subscriber.")
+                self.subscribers.discard(queue)
+                self._close_queue(queue)
+
+    @staticmethod
+    def _close_queue(queue):
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    # ── Watcher ─────────────────────────────────────────────────────────────
+    async def _run(self):
+        db = get_db()
+        if db is None:
+            log_error("Ticket feed cannot start: database not connected.")
+            return
+        try:
+            await self._watch(db)
+        except OperationFailure as e:
+            log_warning(f"Change streams unavailable ({e.code}); ticket feed falls back to polling.")
+            await self._poll(db)
+
+    async def _watch(self, db):
+        self.mode = "change_stream"
+        pipeline = [
+            {"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}},
+            {"$project": {f"fullDocument.{field}": 0 for field in FEED_EXCLUDED_FIELDS}},
+        ]
+        log_info("Ticket feed watching change stream.")
+        while True:
+            try:
+                async with db.tickets.watch(
+                    pipeline, full_document="updateLookup", resume_after=self.resume_token
+                ) as stream:
+                    async for change in stream:
+                        self.resume_token = stream.resume_token
+                        ticket = change.get("fullDocument")
+                        if ticket:
+                            self._publish("insert" if change["operationType"] == "insert" else "update", ticket)
+            except OperationFailure as e:
+                if self.resume_token is None:
+                    raise  # change streams are not supported (standalone mongod)
+                log_warning(f"Ticket change stream cannot resume ({e.code}); restarting from now.")
+                self.resume_token = None
+            except PyMongoError as e:
+                log_warning(f"Ticket change stream interrupted, resuming: {e}")
+                await asyncio.sleep(1)
+
+    async def _poll(self, db):
+        self.mode = "polling"
+        # Keyset position: the last (updated_at, _id) published
+        position = (datetime.datetime.utcnow(), ObjectId("0" * 24))
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                position = await self._poll_once(db, position)
+            except PyMongoError as e:
+                log_warning(f"Ticket feed poll failed: {e}")
+
+    async def _poll_once(self, db, position: tuple) -> tuple:
+        """Publishes every ticket changed after `position`, a page at a time; returns the new position."""
+        while True:
+            updated_at, ticket_id = position
+            tickets = await db.tickets.find(
+                {"$or": [
+                    {"updated_at": {"$gt": updated_at}},
+                    {"updated_at": updated_at, "_id": {"$gt": ticket_id}},
+                ]},
+                FEED_EXCLUDED_FIELDS,
+            ).sort([("updated_at", 1), ("_id", 1)]).limit(self.queue_size).to_list(length=self.queue_size)
+            for ticket in tickets:
+                same_moment = ticket.get("created_at") == ticket["updated_at"]
+                self._publish("insert" if same_moment else "update", ticket)
+                position = (ticket["updated_at"], ticket["_id"])
+            if len(tickets) < self.queue_size:
+                return position
+
+    async def stop(self):
+        self._cancel_linger()
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        for queue in list(self.subscribers):
+            self._close_queue(queue)
+        self.subscribers.clear()
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "running": self.task is not None and not self.task.done(),
+            "subscribers": len(self.subscribers),
+            "last_event_id": f"{self.epoch}-{self.seq}",
+        }
+
+
+# Initialize a global instance
+ticket_feed = TicketFeed(
+    replay_size=max(1, _env_int("TICKET_FEED_REPLAY", 500)),
+    queue_size=max(1, _env_int("TICKET_FEED_QUEUE_SIZE", 100)),
+    poll_interval=max(0.1, _env_float("TICKET_FEED_POLL_INTERVAL", 2.0)),
+    linger=max(0.0, _env_float("TICKET_FEED_LINGER", 60.0)),
+)
@@ -0,0 +1,223 @@
+"""
+Ticket List Cache Module
+
+`GET /api/tickets` is the most frequent request and usually returns exactly
+what it returned a moment ago. This module lets the route skip the database
+scan, the serialization and even the response body when nothing has changed.
+
+Key Features:
+1. Collection Version: A cheap version of the `tickets` collection made of
+   the newest `updated_at` (indexed), its `_id` and the estimated document
+   count. It is recomputed at most every TICKET_LIST_VERSION_TTL seconds, or
+   right away after a local write calls `invalidate()` (the change counter).
+2. Page Cache: Encoded list pages are kept in an LRU (TICKET_LIST_CACHE_ENTRIES
+   / TICKET_LIST_CACHE_MAX_BYTES) keyed by (view, limit, cursor) and tagged
+   with the version they were built at; pages from an older version are rebuilt.
+3. ETags: Each page has a weak ETag derived from the version and its key, so a
+   client's `If-None-Match` can be answered with 304.
+4. Compression: Pages of at least TICKET_LIST_COMPRESS_MIN bytes are sent with
+   brotli or gzip, as negotiated by `Accept-Encoding`. The compressed body is
+   kept with the page, so each variant is compressed once.
+5. Metrics: Hits, misses, 304s and version refreshes via `stats()`.
+"""
+
+import os
+import gzip
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+import brotli
+from pymongo import DESCENDING
+from Config.db import get_db
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def accepted_encodings(header: str) -> set:
+    """Content codings an `Accept-Encoding` header allows (q > 0)."""
+    accepted = set()
+    for item in (header or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def page_etag(version: str, key: tuple) -> str:
+    """Weak ETag of a list page; identical in every worker for the same data."""
+    return 'W/"' + hashlib.sha1(f"{version}|{key}".encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    """Weak comparison of an ETag against an `If-None-Match` header."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or etag[2:] in tags
+
+
+class CachedPage:
+    """One encoded list page, plus its compressed variants once requested."""
+
+    def __init__(self, version: str, key: tuple, body: bytes, next_cursor: str = None):
+        self.version = version
+        self.key = key
+        self.body = body
+        self.next_cursor = next_cursor
+        self.etag = page_etag(version, key)
+        self.encoded = {}  # content coding -> compressed body
+
+    def body_for(self, encoding: str) -> bytes:
+        if encoding not in self.encoded:
+            if encoding == "br":
+                self.encoded[encoding] = brotli.compress(self.body, quality=5)
+            else:
+                self.encoded[encoding] = gzip.compress(self.body, compresslevel=6)
+        return self.encoded[encoding]
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(body) for body in self.encoded.values())
+
+
+class TicketListCache:
+    def __init__(self, version_ttl: float = 1.0, max_entries: int = 64, max_bytes: int = 32 * 1024 * 1024, compress_min: int = 1024):
+        self.version_ttl = version_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.compress_min = compress_min
+        self.pages = OrderedDict()  # key -> CachedPage
+        self.bytes = 0
+        self.changes = 0  # bumped by local writes
+        self.current = None  # (version, changes, computed_at)
+        self.version_lock = None  # created on first use, inside the event loop
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.version_queries = 0
+
+    def invalidate(self):
+        """Called after local ticket writes so the next request sees a new version."""
+        self.changes += 1
+
+    async def version(self) -> str:
+        current = self.current
+        if current and current[1] == self.changes and time.monotonic() - current[2] < self.version_ttl:
+            return current[0]
+        if self.version_lock is None:
+            self.version_lock = asyncio.Lock()
+        async with self.version_lock:
+            # Another request may have refreshed it while we waited
+            current = self.current
+            if current and current[1] == self.changes and time.monotonic() - current[2] < self.version_ttl:
+                return current[0]
+            changes = self.changes
+            version = await self._query_version()
+            self.current = (version, changes, time.monotonic())
+            return version
+
+    async def _query_version(self) -> str:
+        db = get_db()
+        if db is None:
+            raise Exception("Database not connected")
+        self.version_queries += 1
+        # Sorted on the indexed updated_at alone: a compound sort with _id could not use
+        # that index. Ties need no tiebreak, count and the local change counter cover them.
+        latest, count = await asyncio.gather(
+            db.tickets.find_one({}, {"updated_at": 1}, sort=[("updated_at", DESCENDING)]),
+            db.tickets.estimated_document_count(),
+        )
+        if latest is None:
+            return f"0-{count}"
+        updated_at = latest.get("updated_at")
+        stamp = updated_at.isoformat() if updated_at else ""
+        return f"{stamp}-{latest['_id']}-{count}"
+
+    async def get_page(self, key: tuple, version: str, build):
+        """
+        Returns the CachedPage for `key` at `version`; `build()` is awaited on a miss
+        and must return (body bytes, next_cursor).
+        """
+        page = self.pages.get(key)
+        if page is not None and page.version == version:
+            self.pages.move_to_end(key)
+            self.hits += 1
+            return page
+        self.misses += 1
+        body, next_cursor = await build()
+        page = CachedPage(version, key, body, next_cursor)
+        self._store(key, page)
+        return page
+
+    def _store(self, key: tuple, page: CachedPage):
+        if key in self.pages:
+            self._remove(key)
+        if len(page.body) > self.max_bytes:
+            return
+        self.pages[key] = page
+        self.bytes += page.size
+        while len(self.pages) > self.max_entries or self.bytes > self.max_bytes:
+            self._remove(next(iter(self.pages)))
+
+    def _remove(self, key: tuple):
+        page = self.pages.pop(key)
+        self.bytes -= page.size
+
+    def encode(self, page: CachedPage, accept_encoding: str):
+        """(content coding or None, body) for the client's Accept-Encoding."""
+        if len(page.body) < self.compress_min:
+            return None, page.body
+        accepted = accepted_encodings(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in accepted:
+                before = page.size
+                body = page.body_for(encoding)
+                if self.pages.get(page.key) is page:
+                    self.bytes += page.size - before
+                return encoding, body
+        return None, page.body
+
+    def record_not_modified(self):
+        self.not_modified += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "not_modified": self.not_modified,
+            "pages": len(self.pages),
+            "bytes": self.bytes,
+            "version_queries": self.version_queries,
+        }
+
+
+# Initialize a global instance
+ticket_list_cache = TicketListCache(
+    version_ttl=max(0.0, _env_float("TICKET_LIST_VERSION_TTL", 1.0)),
+    max_entries=max(1, _env_int("TICKET_LIST_CACHE_ENTRIES", 64)),
+    max_bytes=max(0, _env_int("TICKET_LIST_CACHE_MAX_BYTES", 32 * 1024 * 1024)),
+    compress_min=max(0, _env_int("TICKET_LIST_COMPRESS_MIN", 1024)),
+)
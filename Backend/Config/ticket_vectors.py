@@ -0,0 +1,221 @@
+"""
+Related Tickets Vector Index Module
+
+This module finds tickets similar to a given one, so a student opening a
+ticket chat can be shown related past tickets (and their AI summaries) instead
+of asking the LLM the same question again. Everything runs in-process and
+offline: no embedding API is called.
+
+Key Features:
+1. Hashing Vectorizer: Title (x2), tags (x2) and description are tokenized,
+   hashed with CRC32 into TICKET_VECTOR_DIM signed buckets with sublinear term
+   frequency, and L2-normalized. Vectors are deterministic, so they are
+   recomputed rather than stored.
+2. Matrix Index: Vectors live in one float32 NumPy matrix stored
+   dimension-major (dim x tickets) that grows by doubling. Hashed vectors are
+   sparse, so cosine top-k only reads the matrix rows of the query's non-zero
+   buckets, then uses `argpartition`. `top_k` accepts a batch of queries.
+3. Sync: Existing tickets are backfilled at startup in batches (vectorized off
+   the event loop). New tickets are added on create, and tickets created by
+   other processes are picked up every TICKET_VECTOR_SYNC_INTERVAL seconds.
+"""
+
+import os
+import re
+import zlib
+import math
+import asyncio
+import datetime
+from collections import Counter
+import numpy as np
+from Config.db import get_db
+from Config.logger import log_info, log_error, log_success
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "for", "from", "how", "i",
+    "in", "is", "it", "my", "of", "on", "or", "that", "the", "this", "to", "what", "when",
+    "why", "with", "you",
+}
+
+# Fields the vectorizer reads, with their weights
+VECTOR_FIELDS = {"title": 2.0, "tags": 2.0, "description": 1.0}
+VECTOR_PROJECTION = {field: 1 for field in VECTOR_FIELDS} | {"created_at": 1}
+
+BACKFILL_BATCH = 1000
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def tokenize(text: str) -> list:
+    return [t for t in TOKEN_PATTERN.findall((text or "").lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+def vectorize(ticket: dict, dim: int) -> np.ndarray:
+    """Signed feature hashing of a ticket into a unit-length float32 vector."""
+    weights = Counter()
+    for field, field_weight in VECTOR_FIELDS.items():
+        value = ticket.get(field)
+        text = " ".join(value) if isinstance(value, list) else value
+        for token, count in Counter(tokenize(text)).items():
+            weights[token] += field_weight * (1.0 + math.log(count))
+
+    vector = np.zeros(dim, dtype=np.float32)
+    for token, weight in weights.items():
+        h = zlib.crc32(token.encode("utf-8"))
+        vector[h % dim] += weight if h & 0x80000000 else -weight
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+class VectorIndex:
+    def __init__(self, dim: int = 256, min_score: float = 0.1, sync_interval: float = 30.0):
+        self.dim = dim
+        self.min_score = min_score
+        self.sync_interval = sync_interval
+        self.matrix = np.zeros((dim, 0), dtype=np.float32)  # column per ticket
+        self.ids = []
+        self.positions = {}  # ticket_id -> column
+        self.task = None
+        self.ready = False
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ── Index maintenance ───────────────────────────────────────────────────
+    def add(self, ticket_id: str, ticket: dict = None, vector: np.ndarray = None):
+        """Inserts or replaces the vector of one ticket."""
+        if vector is None:
+            vector = vectorize(ticket, self.dim)
+        column = self.positions.get(ticket_id)
+        if column is None:
+            column = len(self.ids)
+            if column >= self.matrix.shape[1]:
+                grown = np.zeros((self.dim, max(1024, 2 * self.matrix.shape[1])), dtype=np.float32)
+                grown[:, :column] = self.matrix[:, :column]
+                self.matrix = grown
+            self.ids.append(ticket_id)
+            self.positions[ticket_id] = column
+        self.matrix[:, column] = vector
+
+    def add_many(self, ticket_ids: list, vectors: np.ndarray):
+        for ticket_id, vector in zip(ticket_ids, vectors):
+            self.add(ticket_id, vector=vector)
+
+    def vector(self, ticket_id: str):
+        column = self.positions.get(ticket_id)
+        return None if column is None else self.matrix[:, column].copy()
+
+    # ── Queries ─────────────────────────────────────────────────────────────
+    def top_k(self, queries: np.ndarray, k: int = 5, exclude: list = None) -> list:
+        """
+        Cosine top-k for a batch of unit query vectors (shape m x dim).
+        Returns one [(ticket_id, score), ...] list per query, best first.
+        """
+        count = len(self.ids)
+        queries = np.atleast_2d(queries)
+        if count == 0 or k <= 0:
+            return [[] for _ in queries]
+        # Only buckets that are non-zero in some query contribute to the dot product
+        active = np.flatnonzero(np.any(queries != 0, axis=0))
+        scores = queries[:, active] @ self.matrix[active, :count]
+        for i, ticket_id in enumerate(exclude or []):
+            column = self.positions.get(ticket_id)
+            if column is not None:
+                scores[i, column] = -np.inf
+
+        k = min(k, count)
+        results = []
+        for row_scores in scores:
+            top = np.argpartition(-row_scores, k - 1)[:k]
+            top = top[np.argsort(-row_scores[top])]
+            results.append([
+                (self.ids[j], float(row_scores[j])) for j in top if row_scores[j] >= self.min_score
+            ])
+        return results
+
+    def related(self, ticket_id: str, k: int = 5, ticket: dict = None) -> list:
+        """Tickets most similar to `ticket_id`; `ticket` is indexed first if it is missing."""
+        vector = self.vector(ticket_id)
+        if vector is None:
+            if ticket is None:
+                return []
+            self.add(ticket_id, ticket)
+            vector = self.vector(ticket_id)
+        return self.top_k(vector, k, exclude=[ticket_id])[0]
+
+    # ── Sync with MongoDB ───────────────────────────────────────────────────
+    async def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    async def _index_batch(self, tickets: list):
+        ids = [str(t["_id"]) for t in tickets]
+        vectors = await asyncio.to_thread(lambda: [vectorize(t, self.dim) for t in tickets])
+        self.add_many(ids, vectors)
+
+    async def _run(self):
+        db = get_db()
+        if db is None:
+            log_error("Related-ticket index cannot start: database not connected.")
+            return
+        started = datetime.datetime.utcnow()
+        try:
+            batch = []
+            async for ticket in db.tickets.find({}, VECTOR_PROJECTION):
+                batch.append(ticket)
+                if len(batch) >= BACKFILL_BATCH:
+                    await self._index_batch(batch)
+                    batch = []
+            if batch:
+                await self._index_batch(batch)
+            self.ready = True
+            log_success(f"Related-ticket index built with {len(self)} tickets.")
+        except Exception as e:
+            log_error(f"Related-ticket index backfill failed: {e}")
+
+        # Pick up tickets created by other processes; the overlap covers in-flight inserts
+        last_seen = started
+        overlap = datetime.timedelta(seconds=2 * self.sync_interval)
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                tickets = await db.tickets.find({"created_at": {"$gte": last_seen - overlap}}, VECTOR_PROJECTION) \
+                    .to_list(length=None)
+                new = [t for t in tickets if str(t["_id"]) not in self.positions]
+                if new:
+                    await self._index_batch(new)
+                    log_info(f"Related-ticket index synced {len(new)} new tickets.")
+                if tickets:
+                    last_seen = max(last_seen, max(t["created_at"] for t in tickets))
+            except Exception as e:
+                log_error(f"Related-ticket index sync failed: {e}")
+
+    def stats(self) -> dict:
+        return {"ready": self.ready, "tickets": len(self), "dim": self.dim}
+
+
+# Initialize a global instance
+ticket_index = VectorIndex(
+    dim=max(16, _env_int("TICKET_VECTOR_DIM", 256)),
+    min_score=_env_float("TICKET_RELATED_MIN_SCORE", 0.1),
+    sync_interval=max(1.0, _env_float("TICKET_VECTOR_SYNC_INTERVAL", 30.0)),
+)
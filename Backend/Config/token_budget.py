@@ -0,0 +1,194 @@
+"""
+Token Budget Module
+
+Request counts alone do not bound LLM spend: one long chat costs as much as
+dozens of short ones. This module meters estimated tokens (~4 characters per
+token) against per-route and per-model budgets, stored in the same `limits`
+backend as the request limiter (see Config/limiter.py), so the budgets are
+shared by every worker when that backend is MongoDB.
+
+Key Features:
+1. Route Budgets: Each chat route has a per-client budget (ROUTE_TOKEN_BUDGETS,
+   e.g. "global_chat=50000/hour,ticket_chat=50000/hour"). A client whose budget
+   is spent gets 429 until the sliding window frees up room.
+2. Model Budgets: MODEL_TOKEN_BUDGETS ("model=limit,..."; "*" applies to every
+   other model) caps upstream tokens per model across all clients and
+   background work. `AIHandler` skips models whose budget is spent, like an
+   open circuit.
+3. After-the-Fact Charging: Budgets are checked before a call and charged with
+   the actual prompt + answer size afterwards (also for aborted streams). A
+   charge larger than what remains fills the window instead of being dropped.
+4. Fail Open: Storage errors are logged and counted, and the call is allowed.
+5. Metrics: Charged tokens per route/model and rejections are exposed via
+   `stats()` (see `GET /api/chat/stats`).
+"""
+
+import os
+from collections import Counter
+from limits import parse
+from limits.storage import storage_from_string
+from limits.aio.strategies import STRATEGIES
+from Config.limiter import rate_limit_storage_uri, RATE_LIMIT_STRATEGY
+from Config.logger import log_warning
+
+# Rough characters-per-token ratio, shared by budget charging and chat history
+# trimming so both price the same text alike (no tokenizer dependency)
+CHARS_PER_TOKEN = 4
+
+TOKEN_BUDGET_MESSAGE = "Token budget for this chat exceeded. Please try again later."
+
+
+def estimate_chars(chars: int) -> int:
+    """Estimated tokens of `chars` characters (rounded up)."""
+    return (chars + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def estimate_tokens(text: str) -> int:
+    return estimate_chars(len(text or ""))
+
+
+def estimate_message_tokens(messages: list) -> int:
+    return sum(estimate_tokens(m.get("content")) for m in messages)
+
+
+def parse_budget_map(raw: str, name: str) -> dict:
+    budgets = {}
+    for item in (raw or "").split(","):
+        key, _, limit = item.partition("=")
+        if not key.strip():
+            continue
+        try:
+            budgets[key.strip()] = parse(limit.strip())
+        except ValueError:
+            log_warning(f"Ignoring invalid {name} entry: {item}")
+    return budgets
+
+
+class TokenBudget:
+    def __init__(self, storage_uri: str = "memory://", strategy: str = "sliding-window-counter", routes: dict = None, models: dict = None):
+        self.storage_uri = storage_uri
+        self.strategy = strategy
+        self.routes = routes or {}
+        self.models = models or {}
+        self.limiter = None
+        self.charged = Counter()  # "route:<name>" / "model:<name>" -> tokens
+        self.rejected = 0
+        self.errors = 0
+
+    def _get_limiter(self):
+        # Created on first use so the async storage binds to the running event loop
+        if self.limiter is None:
+            self.limiter = STRATEGIES[self.strategy](storage_from_string(f"async+{self.storage_uri}"))
+        return self.limiter
+
+    def _model_limit(self, model: str):
+        return self.models.get(model, self.models.get("*"))
+
+    async def _allow(self, limit, *identifiers) -> bool:
+        if limit is None:
+            return True
+        try:
+            allowed = await self._get_limiter().test(limit, "tokens", *identifiers)
+        except Exception as e:
+            self.errors += 1
+            log_warning(f"Token budget check failed, allowing request: {e}")
+            return True
+        if not allowed:
+            self.rejected += 1
+        return allowed
+
+    async def _charge(self, limit, tokens: int, *identifiers):
+        if limit is None or tokens <= 0:
+            return
+        try:
+            limiter = self._get_limiter()
+            if not await limiter.hit(limit, "tokens", *identifiers, cost=tokens):
+                # hit() refuses costs above what is left; spend the remainder instead
+                remaining = (await limiter.get_window_stats(limit, "tokens", *identifiers)).remaining
+                if remaining > 0:
+                    await limiter.hit(limit, "tokens", *identifiers, cost=remaining)
+        except Exception as e:
+            self.errors += 1
+            log_warning(f"Failed to charge {tokens} tokens to budget {'/'.join(identifiers)}: {e}")
+
+    async def allow_route(self, route: str, client: str) -> bool:
+        """False when `client` has spent its token budget for `route`."""
+        return await self._allow(self.routes.get(route), "route", route, client)
+
+    async def charge_route(self, route: str, client: str, tokens: int):
+        self.charged[f"route:{route}"] += tokens
+        await self._charge(self.routes.get(route), tokens, "route", route, client)
+
+    async def model_available(self, model: str) -> bool:
+        """False when the shared token budget of `model` is spent."""
+        return await self._allow(self._model_limit(model), "model", model)
+
+    async def charge_model(self, model: str, tokens: int):
+        self.charged[f"model:{model}"] += tokens
+        await self._charge(self._model_limit(model), tokens, "model", model)
+
+    def stats(self) -> dict:
+        return {
+            "storage": self.storage_uri.split("://", 1)[0],
+            "strategy": self.strategy,
+            "routes": {route: str(limit) for route, limit in self.routes.items()},
+            "models": {model: str(limit) for model, limit in self.models.items()},
+            "charged_tokens": dict(self.charged),
+            "rejected": self.rejected,
+            "errors": self.errors,
+        }
+
+
+class MeteredStream:
+    """Wraps an upstream stream and charges its model budget once, when it ends or is closed."""
+
+    def __init__(self, upstream, budget: TokenBudget, model: str, prompt_tokens: int):
+        self.upstream = upstream
+        self.iterator = upstream.__aiter__()
+        self.budget = budget
+        self.model = model
+        self.prompt_tokens = prompt_tokens
+        self.chars = 0
+        self.charged = False
+
+    async def _charge(self):
+        if not self.charged:
+            self.charged = True
+            await self.budget.charge_model(self.model, self.prompt_tokens + estimate_chars(self.chars))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            chunk = await self.iterator.__anext__()
+        except Exception:
+            # StopAsyncIteration and upstream errors both end the stream
+            await self._charge()
+            raise
+        if chunk.choices and chunk.choices[0].delta.content:
+            self.chars += len(chunk.choices[0].delta.content)
+        return chunk
+
+    async def close(self):
+        try:
+            close = getattr(self.upstream, "close", None)
+            if close is not None:
+                await close()
+        finally:
+            await self._charge()
+
+
+def create_token_budget():
+    return TokenBudget(
+        storage_uri=rate_limit_storage_uri(),
+        strategy=RATE_LIMIT_STRATEGY,
+        routes=parse_budget_map(
+            os.getenv("ROUTE_TOKEN_BUDGETS", "global_chat=50000/hour,ticket_chat=50000/hour"), "ROUTE_TOKEN_BUDGETS"
+        ),
+        models=parse_budget_map(os.getenv("MODEL_TOKEN_BUDGETS", ""), "MODEL_TOKEN_BUDGETS"),
+    )
+
+
+# Initialize a global instance
+token_budget = create_token_budget()
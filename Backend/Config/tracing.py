@@ -0,0 +1,366 @@
+"""
+Tracing and Metrics Module
+
+This module shows where chat and ticket latency goes. It keeps request-scoped
+traces and in-process Prometheus metrics, without an external agent or extra
+dependency.
+
+Key Features:
+1. Request Traces: `TracingMiddleware` (plain ASGI, so streamed bodies are
+   timed to their last byte) gives each request a trace with a request ID
+   (the incoming `X-Request-Id`, or a new one), echoed in the response. Request
+   latency is recorded per route template, method and status.
+2. Spans: `with span("db.get_ticket"):` times a block. Durations go to a
+   per-(route, span) histogram and onto the current trace; non-streaming
+   requests slower than TRACE_SLOW_REQUEST seconds log their span breakdown.
+   Spans outside a request (background workers) use the route "background".
+3. Model Timing: `observe_connect` / `observe_generate` record upstream call
+   latency per model, and `TracedStream` records time-to-first-token, stream
+   duration and token throughput per model.
+4. Prometheus Export: `render_metrics()` writes every metric in the Prometheus
+   text format, served at `GET /metrics` (optionally behind METRICS_TOKEN),
+   including log records dropped or sampled out by Config/logger.py.
+5. Low Overhead: A span costs two `perf_counter` calls and a bisect into fixed
+   buckets. There are no locks (one event loop) and no per-observation allocation
+   once a label set has been seen.
+"""
+
+import os
+import re
+import time
+import uuid
+from bisect import bisect_left
+from contextvars import ContextVar
+from Config.logger import logger, log_warning
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+THROUGHPUT_BUCKETS = (1, 5, 10, 20, 40, 60, 80, 100, 150, 200, 400)
+
+# Spans kept on one trace for the slow-request log
+TRACE_MAX_SPANS = 32
+
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+TRACE_SLOW_REQUEST = _env_float("TRACE_SLOW_REQUEST", 2.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self.series = {}  # label values -> [per-bucket counts (+Inf last), sum]
+
+    def observe(self, value: float, *labels):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in self.series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.series = {}  # label values -> value
+
+    def inc(self, amount: float = 1, *labels):
+        self.series[labels] = self.series.get(labels, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in self.series.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, *labels):
+        self.inc(-amount, *labels)
+
+
+class MetricsRegistry:
+    def __init__(self, prefix: str = "thinkback_"):
+        self.prefix = prefix
+        self.metrics = []
+
+    def _register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(self.prefix + name, help_text, labelnames, buckets))
+
+    def counter(self, name: str, help_text: str, labelnames: tuple = ()) -> Counter:
+        return self._register(Counter(self.prefix + name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: tuple = ()) -> Gauge:
+        return self._register(Gauge(self.prefix + name, help_text, labelnames))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Initialize a global instance
+metrics = MetricsRegistry()
+
+request_seconds = metrics.histogram("http_request_duration_seconds", "HTTP request latency, until the last body byte.", ("route", "method", "status"))
+requests_in_flight = metrics.gauge("http_requests_in_flight", "HTTP requests currently being served.")
+span_seconds = metrics.histogram("span_duration_seconds", "Duration of instrumented steps within a route.", ("route", "span"))
+ai_connect_seconds = metrics.histogram("ai_connect_seconds", "Time to open an upstream chat stream.", ("model",))
+ai_generate_seconds = metrics.histogram("ai_generate_seconds", "Latency of non-streaming upstream completions.", ("model",))
+ai_ttft_seconds = metrics.histogram("ai_ttft_seconds", "Upstream time to first token, from the request.", ("model",))
+ai_stream_seconds = metrics.histogram("ai_stream_duration_seconds", "Total upstream stream time, from the request.", ("model",))
+ai_tokens_per_second = metrics.histogram("ai_tokens_per_second", "Upstream token throughput after the first token.", ("model",), THROUGHPUT_BUCKETS)
+ai_stream_tokens = metrics.counter("ai_stream_tokens_total", "Content deltas received from upstream streams.", ("model",))
+ai_failures = metrics.counter("ai_failures_total", "Failed upstream calls.", ("model", "stage"))
+log_records_lost = metrics.counter("log_records_lost_total", "Log records not written: queue full (dropped) or sampled out.", ("reason",))
+
+
+def render_metrics() -> str:
+    log_stats = logger.stats()
+    log_records_lost.series[("dropped",)] = log_stats["dropped"]
+    log_records_lost.series[("sampled_out",)] = log_stats["sampled_out"]
+    return metrics.render()
+
+
+# ── Traces and spans ─────────────────────────────────────────────────────────
+class Trace:
+    """One request: its ID, route and the spans recorded while serving it."""
+
+    __slots__ = ("scope", "request_id", "started", "spans", "_route")
+
+    def __init__(self, scope: dict, request_id: str):
+        self.scope = scope
+        self.request_id = request_id
+        self.started = time.perf_counter()
+        self.spans = []
+        self._route = None
+
+    @property
+    def route(self) -> str:
+        """Path template of the matched route, e.g. /api/tickets/{ticket_id}; unmatched paths share one label."""
+        if self._route is None:
+            if "endpoint" not in self.scope:
+                return "unmatched"  # not routed (yet)
+            self._route = route_template(self.scope.get("path", ""), self.scope.get("path_params"))
+        return self._route
+
+
+def route_template(path: str, path_params: dict = None) -> str:
+    """Replaces path parameter values in `path` with their {names}, so IDs never become labels."""
+    if not path_params:
+        return path
+    names = {str(value): name for name, value in path_params.items()}
+    return "/".join("{" + names[segment] + "}" if segment in names else segment for segment in path.split("/"))
+
+
+_current_trace = ContextVar("trace", default=None)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def current_request_id():
+    trace = _current_trace.get()
+    return trace.request_id if trace is not None else None
+
+
+# Log records carry the ID of the request that wrote them
+logger.set_request_id_provider(current_request_id)
+
+
+def record_span(name: str, seconds: float):
+    trace = _current_trace.get()
+    if trace is None:
+        span_seconds.observe(seconds, "background", name)
+        return
+    span_seconds.observe(seconds, trace.route, name)
+    if len(trace.spans) < TRACE_MAX_SPANS:
+        trace.spans.append((name, seconds))
+
+
+class span:
+    """Context manager timing a block: `with span("db.get_ticket"): ...`"""
+
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record_span(self.name, time.perf_counter() - self.started)
+        return False
+
+
+def observe_connect(model: str, seconds: float, ok: bool = True):
+    if ok:
+        ai_connect_seconds.observe(seconds, model)
+        record_span("ai.connect", seconds)
+    else:
+        ai_failures.inc(1, model, "connect")
+
+
+def observe_generate(model: str, seconds: float, ok: bool = True):
+    if ok:
+        ai_generate_seconds.observe(seconds, model)
+        record_span("ai.generate", seconds)
+    else:
+        ai_failures.inc(1, model, "generate")
+
+
+class TracedStream:
+    """Wraps an upstream stream and records its TTFT, duration and token throughput per model."""
+
+    def __init__(self, upstream, model: str, started: float):
+        self.upstream = upstream
+        self.iterator = upstream.__aiter__()
+        self.model = model
+        self.started = started  # time.perf_counter() when the request was sent
+        self.first_token_at = None
+        self.deltas = 0
+        self.recorded = False
+
+    def _record(self):
+        if self.recorded:
+            return
+        self.recorded = True
+        ended = time.perf_counter()
+        ai_stream_seconds.observe(ended - self.started, self.model)
+        record_span("ai.stream", ended - self.started)
+        if self.deltas:
+            ai_stream_tokens.inc(self.deltas, self.model)
+        if self.first_token_at is not None and ended > self.first_token_at and self.deltas > 1:
+            ai_tokens_per_second.observe((self.deltas - 1) / (ended - self.first_token_at), self.model)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            chunk = await self.iterator.__anext__()
+        except StopAsyncIteration:
+            self._record()
+            raise
+        except Exception:
+            ai_failures.inc(1, self.model, "stream")
+            self._record()
+            raise
+        if chunk.choices and chunk.choices[0].delta.content:
+            self.deltas += 1
+            if self.first_token_at is None:
+                self.first_token_at = time.perf_counter()
+                ai_ttft_seconds.observe(self.first_token_at - self.started, self.model)
+                record_span("ai.ttft", self.first_token_at - self.started)
+        return chunk
+
+    async def close(self):
+        self._record()
+        close = getattr(self.upstream, "close", None)
+        if close is not None:
+            await close()
+
+
+# ── ASGI middleware ──────────────────────────────────────────────────────────
+def _request_id(scope: dict) -> str:
+    for name, value in scope.get("headers") or ():
+        if name == b"x-request-id":
+            candidate = value.decode("latin-1")
+            if REQUEST_ID_PATTERN.match(candidate):
+                return candidate
+            break
+    return uuid.uuid4().hex[:16]
+
+
+class TracingMiddleware:
+    """Starts a trace per HTTP request, times it to the last body byte and echoes `X-Request-Id`."""
+
+    def __init__(self, app, slow_request: float = TRACE_SLOW_REQUEST):
+        self.app = app
+        self.slow_request = slow_request
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(scope, _request_id(scope))
+        token = _current_trace.set(trace)
+        status = 500
+        streaming = False
+
+        async def send_with_request_id(message):
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers") or [])
+                streaming = any(name == b"content-type" and value.startswith(b"text/event-stream") for name, value in headers)
+                headers.append((b"x-request-id", trace.request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            requests_in_flight.dec()
+            _current_trace.reset(token)
+            duration = time.perf_counter() - trace.started
+            route = trace.route
+            request_seconds.observe(duration, route, scope["method"], str(status))
+            if duration >= self.slow_request and not streaming:
+                breakdown = ", ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in trace.spans) or "no spans"
+                log_warning(f"Slow request {scope['method']} {route} took {duration:.2f}s: {breakdown}",
+                            request_id=trace.request_id, route=route, duration=round(duration, 3))
@@ -7,21 +7,51 @@ It facilitates streaming responses for two primary use cases:
 1. Global Educational Chat: An AI tutor providing step-by-step explanations 
    for general user queries.
 2. Ticket-Specific Chat: Context-aware assistance that retrieves ticket 
-   data from MongoDB to provide targeted support.
+   data from MongoDB to provide targeted support. The rendered ticket system 
+   instruction is served from `ticket_context_cache` on repeat turns.
 
 The module integrates with:
 - ai_handler: For LLM content generation and streaming.
 - MongoDB: For ticket data persistence and retrieval.
 - Custom Logging: For tracking stream lifecycle and error diagnostics.
 
-Responses are yielded in standard SSE format: `data: {json}\n\n`.
+Responses are yielded in standard SSE format: `data: {json}\n\n`, as pre-encoded
+bytes (see Config/fast_json.py).
+
+Each chat belongs to a session (`session_id`); prior turns are loaded from
+`conversation_store` within a token budget and the finished exchange is saved.
+
+Each exchange (prompt, history and answer, also when aborted) is charged to the
+client's per-route token budget in `token_budget`.
+
+Upstream deltas are grouped into fewer, larger frames by `TokenCoalescer` (first text
+is never delayed); frames carry sequential event IDs and idle streams get heartbeat
+comments.
+
+Answers are generated in the background by `chat_streams` (see Config/chat_streams.py);
+responses follow that stream, so a client whose connection drops can reconnect with
+`Last-Event-ID` and continue where it left off (`resume_chat`). When nobody follows a
+stream for the detach grace period, `relay_stream` is cancelled: it closes the upstream
+stream and records the abort in `stream_stats`.
+
+Each step is timed as a span (see Config/tracing.py): `db.ticket_context`,
+`db.chat_history`, `chat.prompt`, `ai.open_stream` and, once the answer ends,
+`chat.relay` for the whole relayed stream.
 """
 import os
-import json
-from Config.logger import log_info, log_error, log_success
-from Config.db import get_db
-from bson import ObjectId
+import time
+import uuid
+from Config.logger import log_info, log_error, log_success, log_warning
 from Config.ai_config import ai_handler
+from Config.stream_stats import stream_stats
+from Config.chat_history import conversation_store
+from Config.ticket_context import ticket_context_cache
+from Config.token_budget import token_budget, estimate_tokens
+
+from Config.fast_json import text_frame, error_frame, with_event_id, DONE_FRAME, HEARTBEAT_FRAME
+from Config.sse_coalescer import TokenCoalescer
+from Config.chat_streams import chat_streams, stream_event_id
+from Config.tracing import span, record_span
 
 from Config.chat_prompts import GLOBAL_SYSTEM_PROMPT, TICKET_SYSTEM_PROMPT
 
@@ -38,63 +68,178 @@ def get_base_style():
 
 BASE_STYLE_RULES = get_base_style()
 
-async def stream_global_chat(message: str, model: str = None):
+async def close_upstream(response):
+    """Closes the upstream HTTP stream so OpenRouter stops generating tokens."""
+    close = getattr(response, "close", None)
+    if close is None:
+        return
     try:
-        # Combine the Global System Prompt with detailed formatting rules
-        system_instruction = f"{GLOBAL_SYSTEM_PROMPT}\n\nFORMATTING & QUALITY STANDARDS:\n{BASE_STYLE_RULES}"
-        
-        response = ai_handler.stream_content(message, model=model, system_instruction=system_instruction)
+        result = close()
+        if hasattr(result, "__await__"):
+            await result
+    except Exception as e:
+        log_error(f"Error closing upstream stream: {e}")
+
+async def relay_stream(response, request=None, label: str = "chat", on_complete=None, on_close=None, stream_id: str = None):
+    """
+    Relays upstream deltas as SSE frames, grouped by `TokenCoalescer` and numbered
+    with event IDs ("<stream_id>-<seq>" when `stream_id` is given), with heartbeat
+    comments while the model is silent. Every frame except heartbeats carries the next ID.
+    Stops when `request` reports a disconnect or the task is cancelled, and closes the
+    upstream stream right away instead of draining it. Behind `chat_streams` no request
+    is passed: the answer outlives a dropped connection and is only cancelled once
+    nobody has followed it for CHAT_STREAM_DETACH_GRACE seconds.
+    `on_complete(text)` is awaited with the full answer when the stream finishes;
+    `on_close(text)` is awaited with whatever was relayed, however the stream ended.
+    """
+    def event_id_of(seq: int):
+        return stream_event_id(stream_id, seq) if stream_id else seq
+
+    started = time.perf_counter()
+    parts = []
+    coalescer = TokenCoalescer(response)
+    frames = coalescer.__aiter__()
+    event_id = 0
+    sent_bytes = 0
+    finished = False
+    failed = False
+    try:
+        async for text in frames:
+            if request is not None and await request.is_disconnected():
+                break
+            if text is None:
+                frame = HEARTBEAT_FRAME
+            else:
+                event_id += 1
+                parts.append(text)
+                frame = with_event_id(event_id_of(event_id), text_frame(text))
+            sent_bytes += len(frame)
+            yield frame
+        else:
+            finished = True
+    except Exception as iter_error:
+        failed = True
+        log_error(f"Mid-stream error in {label}: {iter_error}")
+        yield with_event_id(event_id_of(event_id + 1), error_frame("AI connection lost mid-stream. Please try again."))
+    finally:
+        await frames.aclose()  # cancels a pending upstream read before the upstream is closed
+        record_span("chat.relay", time.perf_counter() - started)
+        tokens = coalescer.deltas
+        stream_stats.record_frames(event_id, sent_bytes)
+        if finished:
+            stream_stats.record_completed(tokens)
+        elif not failed:
+            stream_stats.record_aborted(tokens)
+            log_warning(f"Client disconnected from {label}; upstream cancelled after {tokens} tokens.")
+        await close_upstream(response)
+        if on_close is not None:
+            await on_close("".join(parts))
+
+    if finished:
+        log_success(f"{label.capitalize()} stream completed.", sample="chat.completed")
+        if on_complete is not None:
+            await on_complete("".join(parts))
+        yield with_event_id(event_id_of(event_id + 1), DONE_FRAME)
+
+def render_ticket_instruction(ticket) -> str:
+    """Formats the ticket-specific system prompt with actual metadata plus formatting rules."""
+    ticket_system = TICKET_SYSTEM_PROMPT.format(
+        title=ticket.get("title", "Unknown"),
+        description=ticket.get("description", "No description"),
+        # ai_summary is None while the background summary is still pending
+        ai_summary=ticket.get("ai_summary") or "No summary available"
+    )
+    return f"{ticket_system}\n\nFORMATTING & QUALITY STANDARDS:\n{BASE_STYLE_RULES}"
+
+def remember_exchange(session_id: str, ticket_id: str, message: str):
+    """Builds the on_complete callback that stores a finished exchange in the session history."""
+    async def store(answer: str):
+        if answer:
+            await conversation_store.append_exchange(session_id, ticket_id, message, answer)
+    return store
+
+def charge_exchange(route: str, client: str, system_instruction: str, history: list, message: str):
+    """Builds the on_close callback that charges one exchange to the client's route token budget."""
+    if client is None:
+        return None
+    prompt_tokens = estimate_tokens(system_instruction) + estimate_tokens(message) \
+        + sum(estimate_tokens(turn.get("content")) for turn in history or [])
+    async def charge(answer: str):
+        await token_budget.charge_route(route, client, prompt_tokens + estimate_tokens(answer))
+    return charge
+
+def stream_key(route: str, ticket_id: str, message: str) -> tuple:
+    """What a resumed stream must match: a reconnect has to ask the same question."""
+    return (route, ticket_id, message)
+
+async def follow_stream(stream, after: int = 0, request=None):
+    """Relays a background chat stream from event `after` to one client."""
+    frames = stream.follow(after, request)
+    try:
+        async for frame in frames:
+            yield frame
+    finally:
+        # Detach now, not at GC, so the detach grace period starts on disconnect
+        await frames.aclose()
+
+def resume_chat(route: str, ticket_id: str, message: str, last_event_id: str, client: str, request=None):
+    """(stream, frames) continuing the stream named by `last_event_id`, or None when it cannot be resumed."""
+    stream, after = chat_streams.resume(last_event_id, client, stream_key(route, ticket_id, message))
+    if stream is None:
+        return None
+    return stream, follow_stream(stream, after, request)
+
+async def stream_global_chat(message: str, model: str = None, request=None, session_id: str = None, client: str = None, stream_id: str = None):
+    stream_id = stream_id or uuid.uuid4().hex
+    try:
+        with span("chat.prompt"):
+            # Combine the Global System Prompt with detailed formatting rules
+            system_instruction = f"{GLOBAL_SYSTEM_PROMPT}\n\nFORMATTING & QUALITY STANDARDS:\n{BASE_STYLE_RULES}"
+        with span("db.chat_history"):
+            history = await conversation_store.load_context(session_id)
         
-        try:
-            for chunk in response:
-                content = chunk.choices[0].delta.content
-                if content:
-                    yield f"data: {json.dumps({'text': content})}\n\n"
-        except Exception as iter_error:
-            log_error(f"Mid-stream error in global chat: {iter_error}")
-            yield f"data: {json.dumps({'error': 'AI connection lost mid-stream. Please try again.'})}\n\n"
-            return
+        with span("ai.open_stream"):
+            response = await ai_handler.stream_content(message, model=model, system_instruction=system_instruction, history=history)
         
-        log_success("Global chat stream completed.")
-        yield "data: [DONE]\n\n"
+        frames = relay_stream(
+            response, None, "global chat", remember_exchange(session_id, None, message),
+            charge_exchange("global_chat", client, system_instruction, history, message), stream_id
+        )
     except Exception as e:
         log_error(f"Initial error in global chat stream: {e}")
-        yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        yield error_frame(str(e))
+        return
 
-async def stream_ticket_chat(ticket_id: str, message: str, model: str = None):
-    log_info(f"Starting ticket chat stream for ID: {ticket_id}...")
+    stream = chat_streams.start(stream_id, client, stream_key("global_chat", None, message), frames, session_id)
+    async for frame in follow_stream(stream, 0, request):
+        yield frame
+
+async def stream_ticket_chat(ticket_id: str, message: str, model: str = None, request=None, session_id: str = None, client: str = None, stream_id: str = None):
+    log_info(f"Starting ticket chat stream for ID: {ticket_id}...", sample="chat.ticket_start")
+    stream_id = stream_id or uuid.uuid4().hex
     try:
-        db = get_db()
-        ticket = await db.tickets.find_one({"_id": ObjectId(ticket_id)})
+        with span("db.ticket_context"):
+            system_instruction = await ticket_context_cache.get(ticket_id, render_ticket_instruction)
         
-        if not ticket:
-            yield f"data: {json.dumps({'error': 'Ticket not found'})}\n\n"
+        if system_instruction is None:
+            yield error_frame("Ticket not found")
             return
 
-        # Format the ticket-specific system prompt with actual metadata
-        ticket_system = TICKET_SYSTEM_PROMPT.format(
-            title=ticket.get("title", "Unknown"),
-            description=ticket.get("description", "No description"),
-            ai_summary=ticket.get("ai_summary", "No summary available")
-        )
-
-        # Combine with formatting rules
-        system_instruction = f"{ticket_system}\n\nFORMATTING & QUALITY STANDARDS:\n{BASE_STYLE_RULES}"
+        with span("db.chat_history"):
+            history = await conversation_store.load_context(session_id, ticket_id)
         
-        response = ai_handler.stream_content(message, model=model, system_instruction=system_instruction)
+        with span("ai.open_stream"):
+            response = await ai_handler.stream_content(message, model=model, system_instruction=system_instruction, history=history)
         
-        try:
-            for chunk in response:
-                content = chunk.choices[0].delta.content
-                if content:
-                    yield f"data: {json.dumps({'text': content})}\n\n"
-        except Exception as iter_error:
-            log_error(f"Mid-stream error in ticket chat: {iter_error}")
-            yield f"data: {json.dumps({'error': 'AI connection lost mid-stream. Please try again.'})}\n\n"
-            return
-        
-        log_success("Ticket chat stream completed.")
-        yield "data: [DONE]\n\n"
+        frames = relay_stream(
+            response, None, "ticket chat", remember_exchange(session_id, ticket_id, message),
+            charge_exchange("ticket_chat", client, system_instruction, history, message), stream_id
+        )
     except Exception as e:
         log_error(f"Initial error in ticket chat stream: {e}")
-        yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        yield error_frame(str(e))
+        return
+
+    stream = chat_streams.start(stream_id, client, stream_key("ticket_chat", ticket_id, message), frames, session_id)
+    async for frame in follow_stream(stream, 0, request):
+        yield frame
@@ -6,62 +6,584 @@ It serves as the intermediary between the API routes and the MongoDB database, h
 data retrieval, persistence, and AI-driven content enhancement.
 
 Key Functionalities:
-- get_all_tickets: Retrieves a list of all tickets from the database, sorted by the most recent.
-- create_ticket: Validates incoming ticket data, leverages an AI handler (OpenRouter) to 
-  generate a concise summary of the issue, and stores the enriched document in the database.
+- get_all_tickets: Retrieves one page of tickets from the database, sorted by the most recent,
+  using keyset (cursor) pagination on (created_at, _id) and an optional lightweight projection.
+- get_ticket_page: One encoded list page from the server-side page cache, checked against
+  the client's `If-None-Match` first so an unchanged page costs neither a scan nor encoding.
+- search_tickets: Full-text search over title, description, ai_summary and tags with category/tag
+  filters, the same cursor pagination as the list, and facet counts on the first page.
+- get_ticket: Retrieves a single ticket by ID (used to poll for summary_status).
+- import_tickets: Bulk import from a streamed JSON array or NDJSON body. Items are validated
+  like single creates, inserted with `insert_many` in chunks and summarized in batches; one
+  NDJSON result line is yielded per item.
+- upload_image / open_image / parse_range: Store an uploaded image (request body) in the image
+  store, and open a stored image for the streamed, ranged image endpoint.
+- stream_ticket_feed: Server-Sent Events generator relaying ticket inserts/updates from the
+  shared ticket feed watcher, replaying missed events after a `Last-Event-ID` reconnect. Each
+  event is encoded once, however many clients receive it.
+- ticket_stats: Counters of the ticket-side components (served at GET /tickets/stats).
+- create_ticket: Stores validated ticket data immediately with `summary_status: pending` and
+  queues it on the background summary worker, which asks the AI handler (OpenRouter) for a
+  concise summary of the issue. Near-duplicates of an existing ticket reuse its summary
+  (`duplicate_of`) instead of calling the LLM. A data-URI image is moved to the image store
+  and only its `image_id` is kept on the ticket.
+
+Database lookups and serialization are timed as `db.*` / `serialize.*` spans (see
+Config/tracing.py), so `GET /metrics` breaks each route's latency down by step.
 
 The module utilizes custom serializers for MongoDB BSON-to-JSON conversion and 
 integrated logging for monitoring system health and operation status.
 """
 
 from Config.logger import log_info, log_error, log_success
+import asyncio
+import base64
+import codecs
 import datetime
+import json
 import os
 from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from pymongo import DESCENDING
+from pymongo.errors import BulkWriteError
 from Config.db import get_db
-from Schema.post_model import post_serializer, posts_serializer, TicketCreate
+from Schema.post_model import post_serializer, posts_serializer, posts_list_serializer, related_serializer, LIST_PROJECTION, TicketCreate, allowed
+
+from Middleware.middleware_post import validate_ticket_data
+from Config.summary_worker import summary_worker, SUMMARY_STATUS_PENDING, SUMMARY_STATUS_COMPLETED
+from Config.ticket_dedup import duplicate_index, minhash
+from Config.ticket_feed import ticket_feed
+from Config.ticket_vectors import ticket_index, VECTOR_PROJECTION
+from Config.fast_json import dumps
+from Config.ticket_list_cache import ticket_list_cache, page_etag, etag_matches
+from Config.tracing import span
+from Config.image_store import image_store, image_url, image_id_from_url, is_data_uri, decode_data_uri, check_image, IMAGE_MAX_BYTES, IMAGE_ID_PATTERN
+
+# Most frequent tags reported in search facets
+SEARCH_TAG_FACETS = 20
+
+# Bulk import: tickets per insert_many call, and the most items one import may contain
+BULK_INSERT_CHUNK = 100
+BULK_MAX_ITEMS = 5000
+# Largest single item (in characters) held while it streams in: room for an inline data URI image
+BULK_MAX_ITEM_CHARS = IMAGE_MAX_BYTES * 4 // 3 + 64 * 1024
+
+# Seconds between SSE keep-alive comments on an idle ticket feed
+FEED_HEARTBEAT_INTERVAL = 15
 
-from Schema.post_model import post_serializer, posts_serializer, TicketCreate
+def encode_cursor(ticket) -> str:
+    """Opaque cursor pointing at the last ticket of a page: base64("<created_at iso>|<_id>")."""
+    raw = f"{ticket['created_at'].isoformat()}|{ticket['_id']}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
 
-from Config.ai_config import ai_handler
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, ticket_id = raw.split("|", 1)
+        return datetime.datetime.fromisoformat(created_at), ObjectId(ticket_id)
+    except (ValueError, InvalidId, UnicodeError) as e:
+        log_error(f"Invalid pagination cursor '{cursor}': {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor."
+        )
+
+def cursor_filter(cursor: str = None) -> dict:
+    """Keyset filter selecting tickets strictly older than the cursor position."""
+    if not cursor:
+        return {}
+    created_at, ticket_id = decode_cursor(cursor)
+    return {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": ticket_id}},
+        ]
+    }
 
-async def get_all_tickets():
-    log_info("Fetching all tickets...")
+async def get_all_tickets(limit: int = 50, cursor: str = None, view: str = "full"):
+    """
+    Returns (tickets, next_cursor). next_cursor is None on the last page.
+    """
+    log_info(f"Fetching tickets (limit={limit}, view={view}, cursor={'yes' if cursor else 'no'})...", sample="tickets.list")
     db = get_db()
     if db is None:
         raise Exception("Database not connected")
-    
-    # await to_list(): Since we are using Motor (Async), the find() method returns a cursor.
-    # to_list() asynchronously fetches all documents without blocking the event loop.
-    tickets = await db.tickets.find().sort("created_at", -1).to_list(length=None)
-    log_success(f"Retrieved {len(tickets)} tickets.")
-    return posts_serializer(tickets)
 
-async def create_ticket(ticket_data: TicketCreate):
-    log_info(f"Creating new ticket: {ticket_data.title}...")
+    projection = LIST_PROJECTION if view == "list" else None
+
+    # Fetch one extra document to know whether another page exists, so memory
+    # stays bounded by `limit` instead of growing with the collection.
+    with span("db.list_tickets"):
+        tickets = await db.tickets.find(cursor_filter(cursor), projection) \
+            .sort([("created_at", DESCENDING), ("_id", DESCENDING)]) \
+            .limit(limit + 1) \
+            .to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(tickets) > limit:
+        tickets = tickets[:limit]
+        next_cursor = encode_cursor(tickets[-1])
+
+    log_success(f"Retrieved {len(tickets)} tickets.", sample="tickets.list_done")
+    with span("serialize.tickets"):
+        if view == "list":
+            return posts_list_serializer(tickets), next_cursor
+        return posts_serializer(tickets), next_cursor
+
+async def get_ticket_page(limit: int = 50, cursor: str = None, view: str = "full", if_none_match: str = None):
+    """
+    Returns (page, etag). `page` is a CachedPage holding the encoded tickets, or None
+    when `if_none_match` already names the current version of this page.
+    """
+    key = (view, limit, cursor or "")
+    with span("db.list_version"):
+        version = await ticket_list_cache.version()
+    etag = page_etag(version, key)
+    if etag_matches(etag, if_none_match):
+        ticket_list_cache.record_not_modified()
+        return None, etag
+
+    async def build():
+        tickets, next_cursor = await get_all_tickets(limit=limit, cursor=cursor, view=view)
+        with span("serialize.json"):
+            return dumps(tickets), next_cursor
+
+    return await ticket_list_cache.get_page(key, version, build), etag
+
+def search_filter(q: str = None, categories: list = None, tags: list = None) -> dict:
+    """Mongo filter for a search; `tags` must all be present on a ticket."""
+    query = {}
+    if q and q.strip():
+        query["$text"] = {"$search": q.strip()}
+    if categories:
+        invalid = [c for c in categories if c not in allowed]
+        if invalid:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid category. Must be one of: {', '.join(sorted(allowed))}"
+            )
+        query["category"] = {"$in": categories}
+    tags = [t.strip() for t in tags or [] if t.strip()]
+    if tags:
+        query["tags"] = {"$all": tags}
+    return query
+
+async def search_facets(db, query: dict) -> dict:
+    pipeline = [
+        {"$match": query},
+        {"$facet": {
+            "total": [{"$count": "count"}],
+            "categories": [{"$group": {"_id": "$category", "count": {"$sum": 1}}}],
+            "tags": [
+                {"$unwind": "$tags"},
+                {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
+                {"$sort": {"count": DESCENDING, "_id": 1}},
+                {"$limit": SEARCH_TAG_FACETS},
+            ],
+        }},
+    ]
+    result = (await db.tickets.aggregate(pipeline).to_list(length=1))[0]
+    return {
+        "total": result["total"][0]["count"] if result["total"] else 0,
+        "categories": {str(f["_id"]): f["count"] for f in result["categories"]},
+        "tags": {f["_id"]: f["count"] for f in result["tags"]},
+    }
+
+async def search_tickets(q: str = None, categories: list = None, tags: list = None,
+                         limit: int = 50, cursor: str = None, view: str = "full"):
+    """
+    Returns {tickets, next_cursor, facets}. Matches are ordered newest-first (not by
+    relevance) so the list endpoint's (created_at, _id) cursor works unchanged.
+    Facets are computed only for the first page.
+    """
+    log_info(f"Searching tickets (q={q!r}, categories={categories}, tags={tags}, limit={limit})...", sample="tickets.search")
     db = get_db()
     if db is None:
         raise Exception("Database not connected")
-    
+
+    query = search_filter(q, categories, tags)
+    projection = LIST_PROJECTION if view == "list" else None
+    find = db.tickets.find({**query, **cursor_filter(cursor)}, projection) \
+        .sort([("created_at", DESCENDING), ("_id", DESCENDING)]) \
+        .limit(limit + 1) \
+        .to_list(length=limit + 1)
+
+    with span("db.search"):
+        if cursor:
+            tickets, facets = await find, None
+        else:
+            tickets, facets = await asyncio.gather(find, search_facets(db, query))
+
+    next_cursor = None
+    if len(tickets) > limit:
+        tickets = tickets[:limit]
+        next_cursor = encode_cursor(tickets[-1])
+
+    log_success(f"Search returned {len(tickets)} tickets.", sample="tickets.search_done")
+    serialize = posts_list_serializer if view == "list" else posts_serializer
+    return {"tickets": serialize(tickets), "next_cursor": next_cursor, "facets": facets}
+
+async def get_ticket(ticket_id: str):
+    log_info(f"Fetching ticket {ticket_id}...", sample="tickets.get")
+    db = get_db()
+    if db is None:
+        raise Exception("Database not connected")
+
+    try:
+        object_id = ObjectId(ticket_id)
+    except InvalidId:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ticket ID.")
+
+    with span("db.get_ticket"):
+        ticket = await db.tickets.find_one({"_id": object_id})
+    if not ticket:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found.")
+    return post_serializer(ticket)
+
+async def get_related_tickets(ticket_id: str, limit: int = 5):
+    db = get_db()
+    if db is None:
+        raise Exception("Database not connected")
+
+    try:
+        object_id = ObjectId(ticket_id)
+    except InvalidId:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ticket ID.")
+
+    ticket = None
+    if ticket_index.vector(ticket_id) is None:
+        # Not indexed yet (e.g. created by another process since the last sync)
+        ticket = await db.tickets.find_one({"_id": object_id}, VECTOR_PROJECTION)
+        if not ticket:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found.")
+
+    matches = ticket_index.related(ticket_id, limit, ticket)
+    if not matches:
+        return []
+    scores = dict(matches)
+    with span("db.related_tickets"):
+        tickets = await db.tickets.find(
+            {"_id": {"$in": [ObjectId(match_id) for match_id in scores]}},
+            {**LIST_PROJECTION, "ai_summary": 1, "summary_status": 1},
+        ).to_list(length=len(scores))
+    related = [related_serializer(t, scores[str(t["_id"])]) for t in tickets]
+    return sorted(related, key=lambda t: t["score"], reverse=True)
+
+async def store_ticket_image(image: str = None) -> dict:
+    """
+    Ticket fields for the submitted image: {"image_id"} for a data URI (stored in the image
+    store) or an uploaded image URL, {"image"} for an external URL, {} for no image.
+    """
+    if not image:
+        return {}
+    if is_data_uri(image):
+        try:
+            content_type, data = decode_data_uri(image)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return {"image_id": await image_store.put(data, content_type)}
+    image_id = image_id_from_url(image)
+    if image_id is None:
+        return {"image": image}
+    if await image_store.open(image_id) is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Image not found; upload it first.")
+    return {"image_id": image_id}
+
+async def upload_image(chunks, content_type: str = None):
+    """Stores a raw image request body (read up to IMAGE_MAX_BYTES) and returns its ID and URL."""
+    content_type = (content_type or "").split(";", 1)[0].strip().lower()
+    try:
+        check_image(content_type, 0)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e))
+
+    data = bytearray()
+    async for chunk in chunks:
+        data += chunk
+        if len(data) > IMAGE_MAX_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Image must be at most {IMAGE_MAX_BYTES // 1024} KiB."
+            )
+    if not data:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Image body is empty.")
+
+    image_id = await image_store.put(bytes(data), content_type)
+    log_success(f"Stored image {image_id} ({len(data)} bytes).")
+    return {"image_id": image_id, "image": image_url(image_id)}
+
+async def open_image(image_id: str):
+    if not IMAGE_ID_PATTERN.match(image_id):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid image ID.")
+    image = await image_store.open(image_id)
+    if image is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found.")
+    return image
+
+def parse_range(header: str, length: int):
+    """
+    Parses a single `bytes=` Range header into an inclusive (start, end), or None to
+    send the whole image (no, malformed or multi-range header). Raises ValueError
+    when the range cannot be satisfied.
+    """
+    unit, _, spec = (header or "").partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        start = int(first) if first else None
+        end = int(last) if last else None
+    except ValueError:
+        return None
+    if start is None:  # suffix range: the last N bytes
+        if end is None:
+            return None
+        if end <= 0:
+            raise ValueError("range not satisfiable")
+        return max(0, length - end), length - 1
+    end = length - 1 if end is None else min(end, length - 1)
+    if start >= length or end < start:
+        raise ValueError("range not satisfiable")
+    return start, end
+
+async def prepare_ticket(ticket_data: TicketCreate):
+    """
+    Builds the document for a new ticket and its MinHash signature. The summary is
+    pending, or reused from a near-duplicate whose summary is already completed.
+    """
     # Prepare ticket document
     ticket_dict = ticket_data.model_dump()
+    ticket_dict.update(await store_ticket_image(ticket_dict.pop("image", None)))
     ticket_dict["created_at"] = datetime.datetime.utcnow()
+    ticket_dict["updated_at"] = ticket_dict["created_at"]
     
     # Internal AI summarization
-    # We automatically generate a summary for every ticket to provide immediate 
-    # context for students and to keep the knowledge hub concise.
-    try:
-        prompt = f"Summarize this educational ticket title and description concisely for a helpdesk: \nTitle: {ticket_data.title}\nDescription: {ticket_data.description}"
-        summary = ai_handler.generate_content(prompt)
-        ticket_dict["ai_summary"] = summary.strip()
-    except Exception as e:
-        log_error(f"Error generating AI summary: {e}")
-        ticket_dict["ai_summary"] = "AI summary generation failed."
+    # Every ticket gets an AI summary, but it is generated by the background
+    # summary worker so the POST returns as soon as the ticket is stored.
+    # Clients poll GET /tickets/{id} until summary_status leaves "pending".
+    ticket_dict["ai_summary"] = None
+    ticket_dict["summary_status"] = SUMMARY_STATUS_PENDING
+
+    # Near-duplicate of an existing ticket: reuse its summary, or link to it so
+    # the worker can copy the summary once it is ready
+    signature = minhash(ticket_dict)
+    duplicate = await duplicate_index.find_original(signature, {"ai_summary": 1, "summary_status": 1})
+    if duplicate:
+        original, similarity = duplicate
+        ticket_dict["duplicate_of"] = str(original["_id"])
+        if original.get("summary_status") == SUMMARY_STATUS_COMPLETED:
+            ticket_dict["ai_summary"] = original["ai_summary"]
+            ticket_dict["summary_status"] = SUMMARY_STATUS_COMPLETED
+            duplicate_index.record_reuse()
+        log_info(f"Ticket is a near-duplicate ({similarity:.2f}) of {original['_id']}.")
+    return ticket_dict, signature
+
+async def create_ticket(ticket_data: TicketCreate):
+    log_info(f"Creating new ticket: {ticket_data.title}...")
+    db = get_db()
+    if db is None:
+        raise Exception("Database not connected")
+
+    with span("ticket.prepare"):
+        ticket_dict, signature = await prepare_ticket(ticket_data)
     
     # Save to MongoDB (Async)
-    result = await db.tickets.insert_one(ticket_dict)
+    with span("db.insert_ticket"):
+        result = await db.tickets.insert_one(ticket_dict)
+    ticket_list_cache.invalidate()
+    if ticket_dict["summary_status"] == SUMMARY_STATUS_PENDING:
+        summary_worker.enqueue(str(result.inserted_id))
+    ticket_index.add(str(result.inserted_id), ticket_dict)
+    await duplicate_index.save(str(result.inserted_id), signature)
     
-    # Return saved ticket (Async)
-    saved_ticket = await db.tickets.find_one({"_id": result.inserted_id})
+    # insert_one sets _id on the dict, so no extra round-trip is needed
     log_success(f"Ticket created successfully with ID: {result.inserted_id}")
-    return post_serializer(saved_ticket)
+    return post_serializer(ticket_dict)
+
+async def iter_bulk_items(chunks):
+    """
+    Yields items from a streamed request body holding either a JSON array or NDJSON
+    (one object per line), decoding incrementally so the whole body is never buffered.
+    An item may not exceed BULK_MAX_ITEM_CHARS. Raises ValueError on malformed input.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    mode = None  # "array" | "ndjson"
+    expect = "item"  # in array mode: "item" | "separator" (a ',' or the closing ']')
+    position = 0
+    finished = False
+
+    async for chunk in chunks:
+        buffer += utf8.decode(chunk)
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n":
+                position += 1
+            if position >= len(buffer):
+                break
+            if finished:
+                raise ValueError("data after the end of the JSON array")
+            if mode is None:
+                mode = "array" if buffer[position] == "[" else "ndjson"
+                if mode == "array":
+                    position += 1
+                    expect = "first"
+                    continue
+            if mode == "ndjson":
+                newline = buffer.find("\n", position)
+                if newline == -1:
+                    break  # wait for the rest of the line
+                line, position = buffer[position:newline], newline + 1
+                yield json.loads(line)
+                continue
+            char = buffer[position]
+            if char == "]" and expect in ("first", "separator"):
+                finished = True
+                position += 1
+                continue
+            if char == "," and expect == "separator":
+                expect = "item"
+                position += 1
+                continue
+            if char in ",]" or expect == "separator":
+                raise ValueError(f"unexpected {char!r} at item boundary")
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break  # item continues in the next chunk
+            expect = "separator"
+            yield item
+        buffer, position = buffer[position:], 0
+        if len(buffer) > BULK_MAX_ITEM_CHARS:
+            # One item (or unterminated garbage) larger than any valid ticket
+            raise ValueError(f"item larger than {BULK_MAX_ITEM_CHARS} characters")
+
+    buffer = (buffer + utf8.decode(b"", final=True))[position:].strip()
+    if mode == "ndjson" and buffer:
+        yield json.loads(buffer)
+    elif mode == "array" and (buffer or not finished):
+        raise ValueError("unterminated JSON array")
+
+def bulk_result(**fields) -> str:
+    return json.dumps(fields) + "\n"
+
+async def _insert_chunk(db, chunk: list):
+    """Inserts one chunk of prepared tickets; returns (NDJSON result lines, created count)."""
+    failed = {}
+    try:
+        await db.tickets.insert_many([ticket_dict for _, ticket_dict, _ in chunk], ordered=False)
+    except BulkWriteError as e:
+        failed = {error["index"]: error.get("errmsg", "insert failed") for error in e.details.get("writeErrors", [])}
+    ticket_list_cache.invalidate()
+
+    lines, signatures = [], []
+    for position, (index, ticket_dict, signature) in enumerate(chunk):
+        if position in failed:
+            lines.append(bulk_result(index=index, status="error", error=failed[position]))
+            continue
+        ticket_id = str(ticket_dict["_id"])
+        if ticket_dict["summary_status"] == SUMMARY_STATUS_PENDING:
+            if ticket_dict.get("duplicate_of"):
+                summary_worker.enqueue(ticket_id)  # waits for its original's summary
+            else:
+                summary_worker.enqueue_batch(ticket_id)
+        ticket_index.add(ticket_id, ticket_dict)
+        signatures.append((ticket_id, signature))
+        lines.append(bulk_result(index=index, status="created", id=ticket_id, summary_status=ticket_dict["summary_status"]))
+    await duplicate_index.save_many(signatures)
+    return lines, len(signatures)
+
+async def import_tickets(chunks):
+    """
+    Bulk-creates tickets from a streamed JSON array or NDJSON body. Yields one NDJSON
+    line per item ({"index", "status": "created" | "error", ...}) and a final summary.
+    """
+    db = get_db()
+    if db is None:
+        raise Exception("Database not connected")
+
+    received = created = 0
+    chunk = []
+    try:
+        async for item in iter_bulk_items(chunks):
+            index = received
+            received += 1
+            if received > BULK_MAX_ITEMS:
+                yield bulk_result(index=index, status="error", error=f"Import limited to {BULK_MAX_ITEMS} items.")
+                break
+            try:
+                ticket = await validate_ticket_data(TicketCreate.model_validate(item))
+                prepared = await prepare_ticket(ticket)
+            except ValidationError as e:
+                reason = "; ".join(f"{'.'.join(map(str, err['loc'])) or 'item'}: {err['msg']}" for err in e.errors())
+                yield bulk_result(index=index, status="error", error=reason)
+                continue
+            except HTTPException as e:
+                yield bulk_result(index=index, status="error", error=e.detail)
+                continue
+
+            chunk.append((index, *prepared))
+            if len(chunk) >= BULK_INSERT_CHUNK:
+                lines, inserted = await _insert_chunk(db, chunk)
+                created += inserted
+                chunk = []
+                for line in lines:
+                    yield line
+    except ValueError as e:
+        log_error(f"Bulk import stopped on malformed input: {e}")
+        yield bulk_result(index=received, status="error", error=f"Malformed input: {e}")
+
+    if chunk:
+        lines, inserted = await _insert_chunk(db, chunk)
+        created += inserted
+        for line in lines:
+            yield line
+    log_success(f"Bulk import created {created} of {received} tickets.")
+    yield bulk_result(summary={"received": received, "created": created, "failed": received - created})
+
+def ticket_stats() -> dict:
+    return {
+        "ticket_feed": ticket_feed.stats(),
+        "duplicates": duplicate_index.stats(),
+        "ticket_list": ticket_list_cache.stats(),
+    }
+
+def feed_frame(event_id: str, event: dict) -> bytes:
+    """SSE frame of a feed event, encoded once and shared by every subscriber and replay."""
+    frame = event.get("frame")
+    if frame is None:
+        payload = {"type": event["type"], "ticket": event["ticket"]}
+        frame = event["frame"] = b"id: " + event_id.encode("ascii") + b"\nevent: ticket\ndata: " + dumps(payload) + b"\n\n"
+    return frame
+
+async def stream_ticket_feed(request=None, last_event_id: str = None):
+    """
+    Yields SSE frames for ticket inserts/updates until the client disconnects.
+    A reconnect that cannot be resumed gets a `reset` event so it re-fetches the list.
+    """
+    queue, missed = ticket_feed.subscribe(last_event_id)
+    log_info(f"Ticket feed client connected ({len(ticket_feed.subscribers)} active).", sample="feed.connect")
+    try:
+        # Tell EventSource how long to wait before reconnecting
+        yield "retry: 3000\n\n"
+        if missed is None:
+            yield "event: reset\ndata: {}\n\n"
+        for event_id, event in missed or []:
+            yield feed_frame(event_id, event)
+
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=FEED_HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                if request is not None and await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            if item is None:
+                break  # dropped as a slow consumer or shutting down
+            yield feed_frame(*item)
+    finally:
+        ticket_feed.unsubscribe(queue)
+        log_info("Ticket feed client disconnected.", sample="feed.disconnect")
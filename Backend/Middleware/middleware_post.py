@@ -9,6 +9,8 @@ Validation checks include:
 - Title length (minimum 5 non-whitespace characters).
 - Description length (minimum 10 non-whitespace characters).
 - Category membership (must be within the `VALID_CATEGORIES` set).
+- Image: a data URI must be an accepted image type within the size limit, and an
+  image URL of ours must name a valid image ID.
 
 If any validation criteria are not met, the middleware logs a warning 
 and raises an HTTPException with a 400 Bad Request status code.
@@ -16,6 +18,7 @@ and raises an HTTPException with a 400 Bad Request status code.
 
 from fastapi import HTTPException, status
 from Schema.post_model import TicketCreate
+from Config.image_store import check_data_uri, is_data_uri, image_id_from_url, IMAGE_URL_PREFIX
 
 from Config.logger import log_warning, log_error
 
@@ -50,4 +53,15 @@ async def validate_ticket_data(ticket: TicketCreate):
             detail=f"Invalid category. Must be one of: {', '.join(VALID_CATEGORIES)}"
         )
 
+    # Check image (decoded and stored by the controller)
+    if is_data_uri(ticket.image):
+        try:
+            check_data_uri(ticket.image)
+        except ValueError as e:
+            log_warning(f"Validation failed: {e}")
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    elif ticket.image and ticket.image.startswith(IMAGE_URL_PREFIX) and not image_id_from_url(ticket.image):
+        log_warning("Validation failed: Invalid image URL")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid image URL.")
+
     return ticket
\ No newline at end of file
@@ -9,19 +9,47 @@ Endpoints:
 - POST /global/stream: Initiates a streaming chat session for general queries.
 - POST /ticket/{ticket_id}/stream: Initiates a context-aware streaming chat session 
   linked to a specific support ticket.
+- GET /stats: Completed/aborted stream counters, estimated tokens saved by
+  cancelling upstream generation when a client disconnects, response cache
+  hit/miss metrics, single-flight leader/follower counts and upstream
+  admission queue depth/wait times, hedge win counts, mid-stream failovers, token
+  budget usage and resumable stream buffers.
+- GET /models/health: Per-model circuit state, success rate and latency/TTFT used
+  by the adaptive router to order fallbacks.
 
 Security & Performance:
 - Rate Limiting: Each endpoint is restricted to 10 requests per minute to prevent 
   resource exhaustion and ensure fair usage.
+- Token Budgets: Each client also has a per-route token budget; once it is spent
+  the endpoint answers 429 until the window frees up (see Config/token_budget.py).
 - Data Validation: Uses Pydantic models to enforce strict request body schemas.
+- Conversation Memory: Requests may carry a `session_id`; the (possibly new)
+  session ID is returned in the `X-Session-Id` response header.
+- Resumable Streams: Each answer's stream ID is returned in `X-Stream-Id` and
+  every frame has an `id:`. Re-sending the same request with `Last-Event-ID`
+  replays what was missed and follows the still-running answer, without
+  generating (or charging) it again (see Config/chat_streams.py).
 """
 
-from fastapi import APIRouter, Request
+import uuid
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Request
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from Controllers import chat_controller
 
 from Config.limiter import limiter
+from slowapi.util import get_remote_address
+from Config.token_budget import token_budget, TOKEN_BUDGET_MESSAGE
+from Config.stream_stats import stream_stats
+from Config.ai_cache import response_cache
+from Config.ai_singleflight import single_flight
+from Config.ai_admission import admission
+from Config.ai_config import ai_handler
+from Config.ai_hedging import hedge_policy
+from Config.ai_failover import failover_policy
+from Config.ticket_context import ticket_context_cache
+from Config.chat_streams import chat_streams
 
 router = APIRouter(
     prefix="/chat",
@@ -31,20 +59,67 @@ router = APIRouter(
 class ChatMessage(BaseModel):
     message: str
     model: str = None
+    # Conversation to continue; a new one is started (and returned in X-Session-Id) when omitted
+    session_id: Optional[str] = Field(None, max_length=64, pattern=r"^[A-Za-z0-9_-]+$")
+
+def sse_response(frames, session_id: str, stream_id: str):
+    return StreamingResponse(
+        frames,
+        media_type="text/event-stream",
+        headers={"X-Session-Id": session_id, "X-Stream-Id": stream_id}
+    )
 
 # 10/minutes limit to prevent API Exhaustion
 @router.post("/global/stream")
 @limiter.limit("10/minute")
-async def global_chat(chat_msg: ChatMessage, request: Request):
-    return StreamingResponse(
-        chat_controller.stream_global_chat(chat_msg.message, chat_msg.model),
-        media_type="text/event-stream"
+async def global_chat(chat_msg: ChatMessage, request: Request, last_event_id: Optional[str] = Header(None, max_length=128)):
+    client = get_remote_address(request)
+    if last_event_id:
+        resumed = chat_controller.resume_chat("global_chat", None, chat_msg.message, last_event_id, client, request)
+        if resumed is not None:
+            stream, frames = resumed
+            return sse_response(frames, stream.session_id, stream.stream_id)
+    if not await token_budget.allow_route("global_chat", client):
+        raise HTTPException(status_code=429, detail=TOKEN_BUDGET_MESSAGE)
+    session_id = chat_msg.session_id or uuid.uuid4().hex
+    stream_id = uuid.uuid4().hex
+    return sse_response(
+        chat_controller.stream_global_chat(chat_msg.message, chat_msg.model, request, session_id, client, stream_id),
+        session_id, stream_id
     )
 
 @router.post("/ticket/{ticket_id}/stream")
 @limiter.limit("10/minute")
-async def ticket_chat(ticket_id: str, chat_msg: ChatMessage, request: Request):
-    return StreamingResponse(
-        chat_controller.stream_ticket_chat(ticket_id, chat_msg.message, chat_msg.model),
-        media_type="text/event-stream"
+async def ticket_chat(ticket_id: str, chat_msg: ChatMessage, request: Request, last_event_id: Optional[str] = Header(None, max_length=128)):
+    client = get_remote_address(request)
+    if last_event_id:
+        resumed = chat_controller.resume_chat("ticket_chat", ticket_id, chat_msg.message, last_event_id, client, request)
+        if resumed is not None:
+            stream, frames = resumed
+            return sse_response(frames, stream.session_id, stream.stream_id)
+    if not await token_budget.allow_route("ticket_chat", client):
+        raise HTTPException(status_code=429, detail=TOKEN_BUDGET_MESSAGE)
+    session_id = chat_msg.session_id or uuid.uuid4().hex
+    stream_id = uuid.uuid4().hex
+    return sse_response(
+        chat_controller.stream_ticket_chat(ticket_id, chat_msg.message, chat_msg.model, request, session_id, client, stream_id),
+        session_id, stream_id
     )
+
+@router.get("/stats")
+async def chat_stats():
+    return {
+        **stream_stats.snapshot(),
+        "cache": response_cache.stats() if response_cache is not None else None,
+        "single_flight": single_flight.stats() if single_flight is not None else None,
+        "admission": admission.stats(),
+        "hedging": hedge_policy.stats(),
+        "failover": failover_policy.stats(),
+        "ticket_context": ticket_context_cache.stats(),
+        "token_budget": token_budget.stats(),
+        "resumable_streams": chat_streams.stats(),
+    }
+
+@router.get("/models/health")
+async def models_health():
+    return ai_handler.router.status(ai_handler._get_model_list())
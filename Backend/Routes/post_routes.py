@@ -6,20 +6,53 @@ endpoints for fetching and creating tickets, integrating business logic from
 the post_controller and applying security/validation measures.
 
 Key Features:
-- GET /tickets: Retrieves a collection of all existing tickets.
+- GET /tickets: Retrieves a page of tickets, newest first:
+    - Pagination: `limit` + opaque `cursor`; the next page's cursor is returned in
+      the `X-Next-Cursor` response header (absent on the last page).
+    - Projection: `view=list` omits heavy fields (description, ai_summary, image).
+    - Conditional GET: Pages carry a weak `ETag` derived from the collection version;
+      `If-None-Match` is answered with 304. Encoded pages are cached server-side and
+      large ones are sent brotli/gzip-compressed per `Accept-Encoding`.
+- POST /tickets/bulk: Bulk import from a JSON array or NDJSON body (streamed, never
+  buffered whole). Items get the same validation as POST /tickets; the response is an
+  NDJSON stream with one result per item and a final summary line.
+- GET /tickets/search: Full-text search (`q`) over title, description, ai_summary and tags,
+  filtered by repeatable `category` / `tag` params, with the same `limit`/`cursor`/`view`
+  paging as the list and per-category/per-tag facet counts on the first page.
+- GET /tickets/stream: Server-Sent Events feed of ticket inserts/updates (e.g. a finished
+  AI summary). Each event has an `id:`; reconnects send it back as `Last-Event-ID`.
+- GET /tickets/stats: Ticket-side counters: the change feed's mode, subscribers and last
+  event ID, near-duplicate detection hits and summaries reused, and list page cache
+  hits, misses and 304s.
+- POST /tickets/images: Stores a raw image body (`Content-Type: image/...`) and returns the
+  image URL to send as `image` when creating a ticket.
+- GET /tickets/images/{image_id}: Streams a stored image in chunks, with a strong `ETag`
+  (`If-None-Match` -> 304), single `Range` requests (206/416) and year-long immutable caching.
+- GET /tickets/{ticket_id}: Retrieves a single ticket, e.g. to poll `summary_status`.
+- GET /tickets/{ticket_id}/related: Most similar tickets (with their AI summaries and a
+  cosine `score`), from the in-process vector index.
 - POST /tickets: Handles ticket creation with:
     - Rate Limiting: Restricted to 10 requests per minute to prevent abuse.
     - Validation: Uses validate_ticket_data middleware to ensure data integrity.
     - Schema: Utilizes TicketCreate and TicketResponse for structured data handling.
+    - Background Summary: Returns immediately with `summary_status: pending`.
+    - Images: A data-URI `image` is moved to the image store; tickets only carry its URL.
+
+Ticket responses are built by the controller's serializers from MongoDB documents and
+returned as `FastJSONResponse` (orjson), skipping a second validation against the
+`response_model`, which only documents the response shape.
 """
 
 
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
-from Schema.post_model import TicketCreate, TicketResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional, Union
+from Schema.post_model import TicketCreate, TicketResponse, TicketListItem, TicketSearchResponse, RelatedTicket, ImageUpload
 from Controllers import post_controller
 from Middleware.middleware_post import validate_ticket_data
 from Config.limiter import limiter
+from Config.fast_json import FastJSONResponse
+from Config.ticket_list_cache import ticket_list_cache
 from fastapi import Request
 
 router = APIRouter(
@@ -27,12 +60,126 @@ router = APIRouter(
     tags=["tickets"]
 )
 
-@router.get("/", response_model=List[TicketResponse])
-async def get_tickets():
-    return await post_controller.get_all_tickets()
+@router.get("/", response_model=Union[List[TicketResponse], List[TicketListItem]])
+async def get_tickets(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    view: Literal["full", "list"] = "full",
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    page, etag = await post_controller.get_ticket_page(limit=limit, cursor=cursor, view=view, if_none_match=if_none_match)
+    # no-cache: browsers keep the page but revalidate it with If-None-Match on every load
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if page is None:
+        return Response(status_code=304, headers=headers)
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    encoding, body = ticket_list_cache.encode(page, accept_encoding)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
 
 # 10/minutes limit to prevent API Exhaustion
 @router.post("/", response_model=TicketResponse)
 @limiter.limit("10/minute")
 async def create_ticket(request: Request, ticket: TicketCreate = Depends(validate_ticket_data)):
-    return await post_controller.create_ticket(ticket)
+    return FastJSONResponse(await post_controller.create_ticket(ticket))
+
+# /search and /stream are declared before /{ticket_id} so they are not parsed as ticket IDs
+@router.get("/search", response_model=TicketSearchResponse)
+async def search_tickets(
+    q: Optional[str] = Query(None, max_length=200),
+    category: Optional[List[str]] = Query(None),
+    tag: Optional[List[str]] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    view: Literal["full", "list"] = "full",
+):
+    result = await post_controller.search_tickets(
+        q=q, categories=category, tags=tag, limit=limit, cursor=cursor, view=view
+    )
+    return FastJSONResponse(result, headers={"X-Next-Cursor": result["next_cursor"]} if result["next_cursor"] else None)
+
+@router.get("/stream")
+async def ticket_feed(request: Request, last_event_id: Optional[str] = Header(None, max_length=64)):
+    return StreamingResponse(
+        post_controller.stream_ticket_feed(request, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/stats")
+async def ticket_stats():
+    return post_controller.ticket_stats()
+
+class BodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for generators that keep reading the request body. The base
+    class watches for client disconnects by consuming `receive()`, which would
+    swallow the body chunks; here a disconnect surfaces as a failed send instead.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+# One bulk import replaces hundreds of single creates, so it gets its own tighter limit
+@router.post("/bulk")
+@limiter.limit("5/minute")
+async def bulk_import_tickets(request: Request):
+    return BodyStreamingResponse(
+        post_controller.import_tickets(request.stream()),
+        media_type="application/x-ndjson",
+    )
+
+@router.post("/images", response_model=ImageUpload)
+@limiter.limit("10/minute")
+async def upload_image(request: Request, content_type: Optional[str] = Header(None)):
+    return await post_controller.upload_image(request.stream(), content_type)
+
+# Image IDs are content hashes, so a given URL always serves the same bytes
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+@router.get("/images/{image_id}")
+async def get_image(
+    image_id: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_none_match: Optional[str] = Header(None),
+    if_range: Optional[str] = Header(None),
+):
+    image = await post_controller.open_image(image_id)
+    headers = {
+        "ETag": image.etag,
+        "Cache-Control": IMAGE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+        "X-Content-Type-Options": "nosniff",
+    }
+    if if_none_match and (if_none_match.strip() == "*" or image.etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+
+    span = None
+    if range_header and (if_range is None or if_range.strip() == image.etag):
+        try:
+            span = post_controller.parse_range(range_header, image.length)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{image.length}"})
+    if span is None:
+        return StreamingResponse(
+            image.iter_range(), media_type=image.content_type,
+            headers={**headers, "Content-Length": str(image.length)},
+        )
+    start, end = span
+    return StreamingResponse(
+        image.iter_range(start, end), status_code=206, media_type=image.content_type,
+        headers={**headers, "Content-Length": str(end - start + 1), "Content-Range": f"bytes {start}-{end}/{image.length}"},
+    )
+
+@router.get("/{ticket_id}", response_model=TicketResponse)
+async def get_ticket(ticket_id: str):
+    return FastJSONResponse(await post_controller.get_ticket(ticket_id))
+
+@router.get("/{ticket_id}/related", response_model=List[RelatedTicket])
+async def get_related_tickets(ticket_id: str, limit: int = Query(5, ge=1, le=50)):
+    return FastJSONResponse(await post_controller.get_related_tickets(ticket_id, limit))
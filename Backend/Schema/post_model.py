@@ -10,8 +10,9 @@ Allowed categories for posts are predefined to maintain consistency.
 
 # schema for post monogodb 
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 from datetime import datetime
+from Config.image_store import image_url
 
 
 allowed = {"AI", "Podcast", "Education", "Programming", "Science", "Math", "Other"}
@@ -22,7 +23,7 @@ class TicketBase(BaseModel):
     description: str
     category: str
     tags: List[str] = []
-    image: Optional[str] = None
+    image: Optional[str] = None  # data URI or uploaded image URL on create; image URL in responses
 
 class TicketCreate(TicketBase):
     pass
@@ -30,19 +31,74 @@ class TicketCreate(TicketBase):
 class TicketResponse(TicketBase):
     id: str
     ai_summary: Optional[str] = None
+    summary_status: Optional[str] = None  # pending | completed | failed
+    duplicate_of: Optional[str] = None  # near-duplicate ticket whose summary was reused
     created_at: datetime
 
+class TicketListItem(BaseModel):
+    id: str
+    title: str
+    category: str
+    tags: List[str] = []
+    created_at: datetime
+
+class RelatedTicket(TicketListItem):
+    ai_summary: Optional[str] = None
+    summary_status: Optional[str] = None
+    score: float  # cosine similarity to the requested ticket
+
+class ImageUpload(BaseModel):
+    image_id: str
+    image: str  # URL to put in TicketCreate.image
+
+class SearchFacets(BaseModel):
+    total: int
+    categories: Dict[str, int]
+    tags: Dict[str, int]
+
+class TicketSearchResponse(BaseModel):
+    tickets: Union[List[TicketResponse], List[TicketListItem]]
+    next_cursor: Optional[str] = None
+    facets: Optional[SearchFacets] = None  # only on the first page
+
+# Fields fetched for the lightweight list view (skips description, ai_summary, image)
+LIST_PROJECTION = {"title": 1, "category": 1, "tags": 1, "created_at": 1}
+
 def post_serializer(post) -> dict:
     return {
         "id": str(post["_id"]),
         "title": post.get("title", "Title is missing"),
-        "image": post.get("image"),
+        # Stored images are referenced by ID; only legacy/external images are inline
+        "image": image_url(post["image_id"]) if post.get("image_id") else post.get("image"),
         "description": post.get("description", "Description is missing"),
         "category": post.get("category", "Category is missing") if post.get("category") in allowed else "Please select a valid category",
         "tags": post.get("tags", []),
         "ai_summary": post.get("ai_summary"),
+        # Tickets created before background summarization have no status field
+        "summary_status": post.get("summary_status", "completed" if post.get("ai_summary") else None),
+        "duplicate_of": post.get("duplicate_of"),
         "created_at": post.get("created_at"),
     }
 
 def posts_serializer(posts) -> list:
-    return [post_serializer(post) for post in posts]
\ No newline at end of file
+    return [post_serializer(post) for post in posts]
+
+def post_list_serializer(post) -> dict:
+    return {
+        "id": str(post["_id"]),
+        "title": post.get("title", "Title is missing"),
+        "category": post.get("category", "Category is missing") if post.get("category") in allowed else "Please select a valid category",
+        "tags": post.get("tags", []),
+        "created_at": post.get("created_at"),
+    }
+
+def posts_list_serializer(posts) -> list:
+    return [post_list_serializer(post) for post in posts]
+
+def related_serializer(post, score: float) -> dict:
+    return {
+        **post_list_serializer(post),
+        "ai_summary": post.get("ai_summary"),
+        "summary_status": post.get("summary_status", "completed" if post.get("ai_summary") else None),
+        "score": round(score, 4),
+    }
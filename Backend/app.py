@@ -6,12 +6,19 @@ It facilitates a flashcard-based knowledge-sharing platform with AI-driven
 chat capabilities.
 
 Key Features:
-- Lifecycle Management: Handles MongoDB connection/disconnection via async lifespan.
+- Lifecycle Management: Handles MongoDB connection/disconnection, index creation, the
+  background AI summary worker, the near-duplicate and related-ticket indexes and the
+  real-time ticket feed, the inline image migration and resumable chat streams via
+  async lifespan.
 - Middleware Integration: 
     - SlowAPI for rate limiting to prevent abuse.
     - CORSMiddleware for cross-origin resource sharing.
 - Routing: Modular API routes for posts and chat functionalities.
 - Health Monitoring: Simple health check endpoint for deployment verification.
+- Observability: Every request is traced (request ID in `X-Request-Id`) and latency
+  histograms per route, step and model are served in Prometheus format at `/metrics`
+  (Bearer METRICS_TOKEN required when set). Logs are JSON lines tagged with the
+  request ID and written by a background thread (see Config/logger.py), flushed on shutdown.
 - Environment Configuration: Dynamic port and development mode detection using .env.
 
 Usage:
@@ -19,15 +26,24 @@ Usage:
 """
 
 import os
+import hmac
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import PlainTextResponse
 import uvicorn
 
-from Config.db import ConnectToDB, DisconnectFromDB
+from Config.db import ConnectToDB, DisconnectFromDB, CreateIndexes
+from Config.summary_worker import summary_worker
+from Config.ticket_feed import ticket_feed
+from Config.ticket_vectors import ticket_index
+from Config.ticket_dedup import duplicate_index
+from Config.image_store import image_migration
+from Config.chat_streams import chat_streams
 from Routes.post_routes import router as post_router
 from Routes.chat_routes import router as chat_router
-from Config.logger import log_info, log_success, log_error
+from Config.logger import logger, log_info, log_success, log_error
+from Config.tracing import TracingMiddleware, render_metrics
 
 from Config.limiter import limiter
 from slowapi import _rate_limit_exceeded_handler
@@ -39,16 +55,30 @@ load_dotenv()
 
 DEVELOPMENT = os.getenv("DEVELOPMENT", "False").lower() == "true"
 PORT = int(os.getenv("PORT", 8000))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    logger.start()  # no-op on first start; restarts the writer stopped by a previous shutdown
     log_info("Connecting to MongoDB (Async)...")
     await ConnectToDB()
+    await CreateIndexes()
+    await duplicate_index.start()
+    await summary_worker.start()
+    await ticket_index.start()
+    await image_migration.start()
     yield
     # Shutdown
+    await chat_streams.stop()
+    await image_migration.stop()
+    await ticket_index.stop()
+    await duplicate_index.stop()
+    await ticket_feed.stop()
+    await summary_worker.stop()
     log_info("Disconnecting from MongoDB (Async)...")
     await DisconnectFromDB()
+    logger.stop()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -68,8 +98,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Session-Id", "X-Stream-Id", "X-Request-Id"], # pagination cursor, chat session and stream ids, trace id
 )
 
+# outermost, so traced latency covers every other middleware and the full streamed body
+app.add_middleware(TracingMiddleware)
+
 # Include routes
 log_info("Registering routes...")
 app.include_router(post_router, prefix="/api")
@@ -79,9 +113,16 @@ log_success("Routes registered successfully.")
 # health check of api
 @app.get("/")
 def health_check():
-    log_info("Health check endpoint called.")
+    log_info("Health check endpoint called.", sample="health")
     return {"message": "ThinkBack Backend is healthy!"}
 
+# prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+def metrics(authorization: str = Header(None)):
+    if METRICS_TOKEN and not hmac.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token.")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 def main():
     if DEVELOPMENT:
         log_success("Starting server in development mode...")
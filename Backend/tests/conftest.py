@@ -0,0 +1,47 @@
+"""
+Shared test setup. Tests run against an in-memory stand-in for the Motor
+database (tests/fake_mongo.py), so they need neither MongoDB nor an API key.
+"""
+
+import os
+
+# AIHandler refuses to start without a key; no test talks to OpenRouter
+os.environ.setdefault("OPENROUTER_API_KEY", "test-key")
+os.environ.setdefault("LOG_LEVEL", "warning")
+
+import pytest
+import Config.db as db_module
+from tests.fake_mongo import FakeDatabase
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """Fresh in-memory database, returned by `Config.db.get_db()` for the test."""
+    database = FakeDatabase()
+    monkeypatch.setattr(db_module, "db", database)
+    return database
+
+
+@pytest.fixture
+def api(db, monkeypatch):
+    """TestClient for the ticket and chat routers, without the app's MongoDB lifespan."""
+    from collections import OrderedDict
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from Config.limiter import limiter
+    from Config.ticket_list_cache import ticket_list_cache
+    from Routes.post_routes import router as post_router
+    from Routes.chat_routes import router as chat_router
+
+    monkeypatch.setattr(limiter, "enabled", False)
+    monkeypatch.setattr(ticket_list_cache, "pages", OrderedDict())
+    monkeypatch.setattr(ticket_list_cache, "bytes", 0)
+    monkeypatch.setattr(ticket_list_cache, "current", None)
+    monkeypatch.setattr(ticket_list_cache, "version_lock", None)
+
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.include_router(post_router, prefix="/api")
+    app.include_router(chat_router, prefix="/api")
+    with TestClient(app) as client:
+        yield client
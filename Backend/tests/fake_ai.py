@@ -0,0 +1,98 @@
+"""
+In-memory stand-in for the OpenRouter client used by AIHandler
+(`client.chat.completions.create`), plus the chunk/stream shapes it returns.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+
+def chunk(text):
+    """One streamed completion chunk carrying `text`."""
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+def completion(text):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+class FakeStream:
+    """
+    Yields `parts` as chunks, each after `delay` seconds. With `error`, raises it
+    once `fail_after` parts were sent.
+    """
+
+    def __init__(self, parts, delay=0.0, error=None, fail_after=0, model=None):
+        self.parts = list(parts)
+        self.delay = delay
+        self.error = error
+        self.fail_after = fail_after
+        self.model = model
+        self.sent = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(self.delay)
+        if self.closed:
+            raise StopAsyncIteration
+        if self.error is not None and self.sent >= self.fail_after:
+            raise self.error
+        if not self.parts:
+            raise StopAsyncIteration
+        self.sent += 1
+        return chunk(self.parts.pop(0))
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeClient:
+    """
+    `replies` maps a model to its reply: a string (split into word chunks when
+    streamed), a FakeStream, an exception to raise, or a callable taking the
+    messages and returning one of those. Every call is recorded in `calls`.
+    """
+
+    def __init__(self, replies: dict, delay: float = 0.0):
+        self.replies = replies
+        self.delay = delay
+        self.calls = []  # (model, messages, stream)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, stream=False):
+        self.calls.append((model, messages, stream))
+        await asyncio.sleep(self.delay)
+        reply = self.replies.get(model, RuntimeError(f"unknown model {model}"))
+        if callable(reply) and not isinstance(reply, FakeStream):
+            reply = reply(messages)
+        if isinstance(reply, Exception):
+            raise reply
+        if not stream:
+            return completion(reply)
+        if isinstance(reply, FakeStream):
+            return reply
+        words = reply.split(" ")
+        return FakeStream([word if i == 0 else " " + word for i, word in enumerate(words)])
+
+    def models_called(self):
+        return [model for model, _, _ in self.calls]
+
+
+def make_handler(client: FakeClient, **components):
+    """AIHandler over `client` with fresh admission/router state and no other layers unless given."""
+    from Config.ai_config import AIHandler
+    from Config.ai_admission import AdmissionController
+    from Config.ai_router import ModelRouter
+
+    options = {
+        "cache": None, "coalescer": None, "hedging": None, "budget": None, "failover": None,
+        "admission_controller": AdmissionController(), "router": ModelRouter(),
+    }
+    options.update(components)
+    handler = AIHandler(**options)
+    handler.client = client
+    handler.max_retries = 1
+    return handler
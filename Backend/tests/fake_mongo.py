@@ -0,0 +1,311 @@
+"""
+In-memory stand-in for the subset of the Motor API the backend uses: filters
+with the comparison/logical operators we query with, sorted/limited cursors,
+the update operators we write with and simple aggregation pipelines.
+"""
+
+import copy
+from types import SimpleNamespace
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+
+
+def _compare(value, op, operand) -> bool:
+    if op == "$in":
+        if isinstance(value, list):
+            return bool(set(value) & set(operand))
+        return value in operand
+    if op == "$nin":
+        return not _compare(value, "$in", operand)
+    if op == "$all":
+        return isinstance(value, list) and set(operand) <= set(value)
+    if op == "$ne":
+        return value != operand
+    if value is None:
+        return False
+    if op == "$lt":
+        return value < operand
+    if op == "$lte":
+        return value <= operand
+    if op == "$gt":
+        return value > operand
+    if op == "$gte":
+        return value >= operand
+    raise NotImplementedError(op)
+
+
+def matches(doc: dict, query: dict) -> bool:
+    for key, condition in (query or {}).items():
+        if key == "$or":
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, sub) for sub in condition):
+                return False
+        elif key == "$text":
+            words = condition["$search"].lower().split()
+            text = " ".join(str(doc.get(field) or "") for field in ("title", "description", "ai_summary"))
+            text = f"{text} {' '.join(doc.get('tags') or [])}".lower()
+            if not any(word in text for word in words):
+                return False
+        elif isinstance(condition, dict) and condition and all(op.startswith("$") for op in condition):
+            for op, operand in condition.items():
+                if op == "$exists":
+                    if (key in doc) != operand:
+                        return False
+                elif not _compare(doc.get(key), op, operand):
+                    return False
+        else:
+            value = doc.get(key)
+            if isinstance(value, list) and not isinstance(condition, list):
+                if condition not in value:
+                    return False
+            elif value != condition:
+                return False
+    return True
+
+
+def _included(value, path: list):
+    """What an inclusion projection on the dotted `path` keeps of `value` (arrays of subdocuments too)."""
+    if not path:
+        return copy.deepcopy(value)
+    if isinstance(value, list):
+        return [_included(item, path) for item in value if isinstance(item, dict)]
+    if path[0] in value:
+        return {path[0]: _included(value[path[0]], path[1:])}
+    return {}
+
+
+def project(doc: dict, projection: dict = None) -> dict:
+    if not projection:
+        return copy.deepcopy(doc)
+    included = [key for key, keep in projection.items() if keep]
+    if included:
+        result = {}
+        for key in included:
+            root, *rest = key.split(".")
+            if root in doc:
+                result[root] = _included(doc[root], rest)
+        if projection.get("_id", 1):
+            result["_id"] = doc["_id"]
+        return result
+    return {key: copy.deepcopy(value) for key, value in doc.items() if key not in projection}
+
+
+def sort_documents(docs: list, keys) -> list:
+    if isinstance(keys, str):
+        keys = [(keys, 1)]
+    for key, direction in reversed(keys):
+        docs = sorted(docs, key=lambda doc: (doc.get(key) is not None, doc.get(key)), reverse=direction == -1)
+    return docs
+
+
+class FakeCursor:
+    def __init__(self, docs: list):
+        self.docs = docs
+        self._limit = 0
+
+    def sort(self, key, direction=None):
+        self.docs = sort_documents(self.docs, key if direction is None else [(key, direction)])
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def skip(self, count: int):
+        self.docs = self.docs[count:]
+        return self
+
+    def _results(self) -> list:
+        return self.docs[:self._limit] if self._limit else self.docs
+
+    async def to_list(self, length=None):
+        docs = self._results()
+        return docs[:length] if length else docs
+
+    def __aiter__(self):
+        self._iterator = iter(self._results())
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = []
+        self.indexes = {}  # name -> (keys, options)
+        self.fail_next = None  # exception raised by the next operation, for error paths
+
+    def _maybe_fail(self):
+        if self.fail_next is not None:
+            error, self.fail_next = self.fail_next, None
+            raise error
+
+    async def insert_one(self, doc: dict):
+        self._maybe_fail()
+        doc.setdefault("_id", ObjectId())
+        self.docs.append(copy.deepcopy(doc))
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    async def insert_many(self, docs: list, ordered: bool = True):
+        return SimpleNamespace(inserted_ids=[(await self.insert_one(doc)).inserted_id for doc in docs])
+
+    def find(self, query: dict = None, projection: dict = None, **kwargs):
+        self._maybe_fail()
+        return FakeCursor([project(doc, projection) for doc in self.docs if matches(doc, query)])
+
+    async def find_one(self, query: dict = None, projection: dict = None, sort=None, **kwargs):
+        self._maybe_fail()
+        docs = [doc for doc in self.docs if matches(doc, query)]
+        if sort:
+            docs = sort_documents(docs, sort)
+        return project(docs[0], projection) if docs else None
+
+    async def count_documents(self, query: dict):
+        self._maybe_fail()
+        return sum(1 for doc in self.docs if matches(doc, query))
+
+    async def estimated_document_count(self):
+        return len(self.docs)
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False):
+        self._maybe_fail()
+        for doc in self.docs:
+            if matches(doc, query):
+                self._apply(doc, update)
+                return SimpleNamespace(matched_count=1, modified_count=1, upserted_id=None)
+        if upsert:
+            doc = self._upsert(query, update)
+            return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=doc["_id"])
+        return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+
+    async def update_many(self, query: dict, update: dict):
+        self._maybe_fail()
+        matched = [doc for doc in self.docs if matches(doc, query)]
+        for doc in matched:
+            self._apply(doc, update)
+        return SimpleNamespace(matched_count=len(matched), modified_count=len(matched))
+
+    async def find_one_and_update(self, query: dict, update: dict, upsert: bool = False,
+                                  return_document=None, projection: dict = None, **kwargs):
+        self._maybe_fail()
+        for doc in self.docs:
+            if matches(doc, query):
+                self._apply(doc, update)
+                return project(doc, projection)
+        if upsert:
+            return project(self._upsert(query, update), projection)
+        return None
+
+    async def bulk_write(self, requests: list, ordered: bool = True):
+        for request in requests:
+            await self.update_one(request._filter, request._doc, upsert=getattr(request, "_upsert", False))
+        return SimpleNamespace(modified_count=len(requests))
+
+    async def replace_one(self, query: dict, replacement: dict, upsert: bool = False):
+        self._maybe_fail()
+        for index, doc in enumerate(self.docs):
+            if matches(doc, query):
+                self.docs[index] = {"_id": doc["_id"], **copy.deepcopy(replacement)}
+                return SimpleNamespace(matched_count=1, modified_count=1, upserted_id=None)
+        if upsert:
+            doc = {key: value for key, value in query.items() if not key.startswith("$")}
+            doc.update(copy.deepcopy(replacement))
+            doc.setdefault("_id", ObjectId())
+            self.docs.append(doc)
+            return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=doc["_id"])
+        return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+
+    async def delete_one(self, query: dict):
+        for doc in self.docs:
+            if matches(doc, query):
+                self.docs.remove(doc)
+                return SimpleNamespace(deleted_count=1)
+        return SimpleNamespace(deleted_count=0)
+
+    async def delete_many(self, query: dict):
+        before = len(self.docs)
+        self.docs = [doc for doc in self.docs if not matches(doc, query)]
+        return SimpleNamespace(deleted_count=before - len(self.docs))
+
+    async def create_index(self, keys, name: str = None, **options):
+        self._maybe_fail()
+        name = name or str(keys)
+        self.indexes[name] = (keys, options)
+        return name
+
+    def watch(self, *args, **kwargs):
+        # Like a standalone mongod: no change streams, callers fall back to polling
+        raise OperationFailure("The $changeStream stage is only supported on replica sets", code=40573)
+
+    def aggregate(self, pipeline: list):
+        return FakeCursor(run_pipeline([copy.deepcopy(doc) for doc in self.docs], pipeline))
+
+    def _upsert(self, query: dict, update: dict) -> dict:
+        doc = {key: value for key, value in query.items() if not key.startswith("$")}
+        doc.setdefault("_id", ObjectId())
+        for key, value in update.get("$setOnInsert", {}).items():
+            doc[key] = value
+        self._apply(doc, update)
+        self.docs.append(doc)
+        return doc
+
+    def _apply(self, doc: dict, update: dict):
+        for key, value in update.get("$set", {}).items():
+            doc[key] = copy.deepcopy(value)
+        for key in update.get("$unset", {}):
+            doc.pop(key, None)
+        for key, value in update.get("$inc", {}).items():
+            doc[key] = doc.get(key, 0) + value
+        for key, value in update.get("$push", {}).items():
+            items = value["$each"] if isinstance(value, dict) and "$each" in value else [value]
+            doc.setdefault(key, []).extend(copy.deepcopy(items))
+            if isinstance(value, dict) and "$slice" in value:
+                cut = value["$slice"]
+                doc[key] = doc[key][cut:] if cut < 0 else doc[key][:cut]
+        for key, condition in update.get("$pull", {}).items():
+            doc[key] = [item for item in doc.get(key, []) if not matches(item, condition)]
+
+
+def run_pipeline(docs: list, pipeline: list) -> list:
+    for stage in pipeline:
+        (op, argument), = stage.items()
+        if op == "$match":
+            docs = [doc for doc in docs if matches(doc, argument)]
+        elif op == "$count":
+            docs = [{argument: len(docs)}]
+        elif op == "$unwind":
+            field = argument[1:]
+            docs = [{**doc, field: item} for doc in docs for item in doc.get(field) or []]
+        elif op == "$group":
+            field, counts = argument["_id"][1:], {}
+            for doc in docs:
+                counts[doc.get(field)] = counts.get(doc.get(field), 0) + 1
+            docs = [{"_id": key, "count": count} for key, count in counts.items()]
+        elif op == "$sort":
+            docs = sort_documents(docs, list(argument.items()))
+        elif op == "$limit":
+            docs = docs[:argument]
+        elif op == "$facet":
+            docs = [{name: run_pipeline(docs, sub) for name, sub in argument.items()}]
+        else:
+            raise NotImplementedError(op)
+    return docs
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.collections = {}
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.collections.setdefault(name, FakeCollection())
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        return getattr(self, name)
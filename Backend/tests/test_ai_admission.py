@@ -0,0 +1,92 @@
+"""Upstream admission control (Config/ai_admission.py)."""
+
+import asyncio
+import pytest
+from Config.ai_admission import (
+    AdmissionController, AdmissionRejected, AdmittedStream, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND,
+    parse_concurrency_map,
+)
+from tests.fake_ai import FakeStream
+
+
+def test_parse_concurrency_map():
+    assert parse_concurrency_map("model-a=4, model-b=2,broken,x=nan") == {"model-a": 4, "model-b": 2}
+
+
+def test_interactive_waiters_are_admitted_before_background():
+    async def scenario():
+        controller = AdmissionController(default_limit=1)
+        order = []
+        await controller.acquire("m")
+
+        async def wait(name, priority):
+            await controller.acquire("m", priority)
+            order.append(name)
+            controller.release("m")
+
+        waiters = [
+            asyncio.create_task(wait("summary-1", PRIORITY_BACKGROUND)),
+            asyncio.create_task(wait("summary-2", PRIORITY_BACKGROUND)),
+            asyncio.create_task(wait("chat", PRIORITY_INTERACTIVE)),
+        ]
+        await asyncio.sleep(0.01)
+        depth = controller.stats()["queue_depth"]
+        controller.release("m")
+        await asyncio.gather(*waiters)
+        return order, depth, controller.stats()
+
+    order, depth, stats = asyncio.run(scenario())
+    assert order == ["chat", "summary-1", "summary-2"]
+    assert depth == 3
+    assert stats["queue_depth"] == 0 and stats["models"]["m"]["active"] == 0
+
+
+def test_overflow_is_shed():
+    async def scenario():
+        controller = AdmissionController(default_limit=1, max_depth=1, max_wait={PRIORITY_INTERACTIVE: 0.05})
+        await controller.acquire("m")
+        queued = asyncio.create_task(controller.acquire("m"))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire("m")  # queue full
+        with pytest.raises(AdmissionRejected):
+            await queued  # waited too long
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["shed"] == 2 and stats["queue_depth"] == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        controller = AdmissionController(default_limit=1)
+        await controller.acquire("m")
+        waiter = asyncio.create_task(controller.acquire("m"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        controller.release("m")
+        await controller.acquire("m")  # the slot went back to the pool, not to the cancelled waiter
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["queue_depth"] == 0 and stats["models"]["m"]["active"] == 1
+
+
+def test_streams_release_their_slot_exactly_once():
+    async def scenario():
+        controller = AdmissionController(default_limit=1)
+        await controller.acquire("m")
+        stream = AdmittedStream(FakeStream(["a"]), controller, "m")
+        async for _ in stream:
+            pass
+        await stream.close()
+        finished = controller.stats()["models"]["m"]["active"]
+
+        await controller.acquire("m")
+        aborted = AdmittedStream(FakeStream(["a", "b"]), controller, "m")
+        await aborted.__anext__()
+        await aborted.close()
+        return finished, controller.stats()["models"]["m"]["active"]
+
+    assert asyncio.run(scenario()) == (0, 0)
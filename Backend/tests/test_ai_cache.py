@@ -0,0 +1,79 @@
+"""AI response cache (Config/ai_cache.py) and its use by AIHandler."""
+
+import asyncio
+from Config.ai_cache import InMemoryCache, CachedStream, RecordingStream, make_cache_key
+from tests.fake_ai import FakeClient, FakeStream, make_handler
+
+
+async def read(stream):
+    return "".join([c.choices[0].delta.content async for c in stream])
+
+
+def test_cache_key_normalizes_the_message_only():
+    key = make_cache_key("What is  a Set?", "sys", ["m"])
+    assert make_cache_key("  what is a set? ", "sys", ["m"]) == key
+    assert make_cache_key("What is a Set?", "other sys", ["m"]) != key
+    assert make_cache_key("What is a Set?", "sys", ["m", "n"]) != key
+    assert make_cache_key("What is a Set?", "sys", ["m"], [{"role": "user", "content": "x"}]) != key
+
+
+def test_ttl_and_lru_eviction(monkeypatch):
+    async def scenario():
+        cache = InMemoryCache(ttl=60, max_entries=2)
+        await cache.set("a", "1")
+        await cache.set("b", "2")
+        await cache.get("a")  # "b" is now least recently used
+        await cache.set("c", "3")
+        kept = [await cache.get(key) for key in ("a", "b", "c")]
+        expired = InMemoryCache(ttl=-1)
+        await expired.set("a", "1")
+        return kept, cache.stats(), await expired.get("a")
+
+    kept, stats, expired = asyncio.run(scenario())
+    assert kept == ["1", None, "3"]
+    assert stats["evictions"] == 1 and stats["entries"] == 2
+    assert expired is None
+
+
+def test_byte_cap():
+    async def scenario():
+        cache = InMemoryCache(max_bytes=10)
+        await cache.set("big", "x" * 11)
+        await cache.set("a", "x" * 6)
+        await cache.set("b", "y" * 6)
+        return cache.stats(), await cache.get("b")
+
+    stats, value = asyncio.run(scenario())
+    assert stats["entries"] == 1 and stats["bytes"] == 6
+    assert value == "y" * 6
+
+
+def test_only_finished_streams_are_recorded():
+    async def scenario():
+        cache = InMemoryCache()
+        finished = RecordingStream(FakeStream(["Hello", " there"]), cache, "done")
+        text = await read(finished)
+        aborted = RecordingStream(FakeStream(["Hel", "lo"]), cache, "aborted")
+        await aborted.__anext__()
+        await aborted.close()
+        return text, await cache.get("done"), await cache.get("aborted"), await read(CachedStream(text, chunk_size=4))
+
+    text, done, aborted, replayed = asyncio.run(scenario())
+    assert done == text == "Hello there"
+    assert aborted is None
+    assert replayed == "Hello there"
+
+
+def test_handler_serves_repeats_from_cache(monkeypatch):
+    monkeypatch.setenv("AI_MODEL_LIST", "model-a")
+    client = FakeClient({"model-a": "cached answer"})
+    handler = make_handler(client, cache=InMemoryCache())
+
+    async def scenario():
+        first = await handler.generate_content("Define a set")
+        again = await handler.generate_content("define  a SET")
+        streamed = await read(await handler.stream_content("Define a set"))
+        return first, again, streamed
+
+    assert asyncio.run(scenario()) == ("cached answer", "cached answer", "cached answer")
+    assert len(client.calls) == 1
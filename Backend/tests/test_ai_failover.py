@@ -0,0 +1,98 @@
+"""Mid-stream failover (Config/ai_failover.py) and its use in AIHandler.stream_content."""
+
+import asyncio
+import pytest
+from Config.ai_failover import FailoverPolicy, continuation_messages
+from tests.fake_ai import FakeClient, FakeStream, make_handler
+
+
+async def read(stream):
+    return "".join([c.choices[0].delta.content async for c in stream])
+
+
+def run_wrapped(policy, upstream, continuations):
+    """Reads `upstream` wrapped by `policy`; each reopen returns the next of `continuations`."""
+    reopened = []
+
+    async def reopen(partial, failed_models):
+        reopened.append((partial, failed_models))
+        if not continuations:
+            raise RuntimeError("no model left")
+        return continuations.pop(0)
+
+    async def scenario():
+        return await read(policy.wrap(upstream, reopen))
+
+    return asyncio.run(scenario()), reopened
+
+
+def test_continuation_appends_the_partial_answer():
+    messages = [{"role": "user", "content": "Explain sets"}]
+    assert continuation_messages(messages, "") is messages
+    assert continuation_messages(messages, "A set is")[-1] == {"role": "assistant", "content": "A set is"}
+
+
+def test_mid_stream_error_continues_on_the_next_model():
+    policy = FailoverPolicy(max_failovers=2)
+    upstream = FakeStream(["A set ", "is a ", "lost"], error=RuntimeError("reset"), fail_after=2, model="model-a")
+    text, reopened = run_wrapped(policy, upstream, [FakeStream(["collection."], model="model-b")])
+    assert text == "A set is a collection."
+    assert reopened == [("A set is a ", ["model-a"])]
+    assert upstream.closed
+    assert policy.stats()["failovers"] == 1
+    assert policy.stats()["recovered"] == 1
+
+
+def test_restarted_continuation_drops_the_repeated_beginning():
+    policy = FailoverPolicy(max_failovers=1)
+    upstream = FakeStream(["A set is a group ", "of"], error=RuntimeError("reset"), fail_after=1, model="model-a")
+    # The next model ignores the prefix and starts over, split across chunks
+    restart = FakeStream(["A set is ", "a group of ", "distinct items."], model="model-b")
+    text, _ = run_wrapped(policy, upstream, [restart])
+    assert text == "A set is a group of distinct items."
+    assert policy.stats()["echoes_dropped"] == 1
+
+
+def test_exhausted_failovers_raise_the_original_error():
+    policy = FailoverPolicy(max_failovers=1)
+    first = FakeStream(["one "], error=RuntimeError("first"), fail_after=1, model="model-a")
+    second = FakeStream(["two "], error=RuntimeError("second"), fail_after=1, model="model-b")
+    with pytest.raises(RuntimeError, match="second"):
+        run_wrapped(policy, first, [second])
+    assert second.closed
+    assert policy.stats()["exhausted"] == 1
+
+
+def test_reopen_failure_raises_the_stream_error():
+    policy = FailoverPolicy(max_failovers=2)
+    upstream = FakeStream(["partial"], error=RuntimeError("reset"), fail_after=1, model="model-a")
+    with pytest.raises(RuntimeError, match="reset"):
+        run_wrapped(policy, upstream, [])
+    assert policy.stats()["exhausted"] == 1
+
+
+def test_disabled_policy_returns_the_stream_unchanged():
+    upstream = FakeStream(["x"])
+    assert FailoverPolicy(max_failovers=0).wrap(upstream, None) is upstream
+
+
+def test_handler_stitches_the_answer_across_models(monkeypatch):
+    monkeypatch.setenv("AI_MODEL_LIST", "model-a,model-b")
+    seen = []
+
+    def continue_answer(messages):
+        seen.append(messages)
+        return FakeStream(["a collection."])
+
+    client = FakeClient({
+        "model-a": FakeStream(["A set ", "is "], error=RuntimeError("reset"), fail_after=2),
+        "model-b": continue_answer,
+    })
+    handler = make_handler(client, failover=FailoverPolicy(max_failovers=1))
+
+    async def scenario():
+        return await read(await handler.stream_content("Explain sets", system_instruction="sys"))
+
+    assert asyncio.run(scenario()) == "A set is a collection."
+    assert client.models_called() == ["model-a", "model-b"]
+    assert seen[0][-1] == {"role": "assistant", "content": "A set is "}
@@ -0,0 +1,62 @@
+"""AIHandler (Config/ai_config.py): async calls, model fallback and message layout."""
+
+import time
+import asyncio
+from Config.ai_config import AI_EXHAUSTED_MESSAGE
+from tests.fake_ai import FakeClient, make_handler
+
+
+async def read(stream):
+    return "".join([c.choices[0].delta.content async for c in stream])
+
+
+def test_generate_falls_back_to_the_next_model(monkeypatch):
+    monkeypatch.setenv("AI_MODEL_LIST", "model-a, model-b")
+    client = FakeClient({"model-a": RuntimeError("429"), "model-b": "An answer."})
+    handler = make_handler(client)
+    assert asyncio.run(handler.generate_content("Explain sets")) == "An answer."
+    assert client.models_called() == ["model-a", "model-b"]
+
+
+def test_generate_reports_exhaustion(monkeypatch):
+    monkeypatch.setenv("AI_MODEL_LIST", "model-a,model-b")
+    client = FakeClient({"model-a": RuntimeError("down"), "model-b": RuntimeError("down")})
+    assert asyncio.run(make_handler(client).generate_content("hi")) == AI_EXHAUSTED_MESSAGE
+
+
+def test_model_override_and_history_layout(monkeypatch):
+    monkeypatch.setenv("AI_MODEL_LIST", "model-a")
+    client = FakeClient({"model-x": "ok"})
+    history = [{"role": "user", "content": "earlier"}, {"role": "assistant", "content": "reply"}]
+    asyncio.run(make_handler(client).generate_content("now", model="model-x", system_instruction="sys", history=history))
+    [(model, messages, stream)] = client.calls
+    assert model == "model-x" and stream is False
+    assert [m["content"] for m in messages] == ["sys", "earlier", "reply", "now"]
+
+
+def test_concurrent_calls_do_not_block_each_other(monkeypatch):
+    monkeypatch.setenv("AI_MODEL_LIST", "model-a")
+    client = FakeClient({"model-a": "ok"}, delay=0.1)
+    handler = make_handler(client)
+
+    async def scenario():
+        started = time.perf_counter()
+        results = await asyncio.gather(*(handler.generate_content(f"question {i}") for i in range(8)))
+        return results, time.perf_counter() - started
+
+    results, elapsed = asyncio.run(scenario())
+    assert results == ["ok"] * 8
+    assert elapsed < 0.5  # eight 100 ms calls overlap instead of running back to back
+
+
+def test_stream_falls_back_when_opening_fails(monkeypatch):
+    monkeypatch.setenv("AI_MODEL_LIST", "model-a,model-b")
+    client = FakeClient({"model-a": RuntimeError("503"), "model-b": "streamed answer here"})
+    handler = make_handler(client)
+
+    async def scenario():
+        return await read(await handler.stream_content("hi"))
+
+    assert asyncio.run(scenario()) == "streamed answer here"
+    assert [stream for _, _, stream in client.calls] == [True, True]
+    assert handler.admission.stats()["models"]["model-b"]["active"] == 0  # slot released at the end
@@ -0,0 +1,114 @@
+"""Hedged chat streams (Config/ai_hedging.py)."""
+
+import asyncio
+from types import SimpleNamespace
+from Config.ai_hedging import HedgePolicy
+
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class FakeStream:
+    """Yields `parts` after `delay` seconds, or raises `error` instead of the first token."""
+
+    def __init__(self, model, parts=("hello",), delay=0.0, error=None):
+        self.model = model
+        self.parts = list(parts)
+        self.delay = delay
+        self.error = error
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        if not self.parts:
+            raise StopAsyncIteration
+        return chunk(self.parts.pop(0))
+
+    async def close(self):
+        self.closed = True
+
+
+async def read(stream):
+    return "".join([c.choices[0].delta.content async for c in stream])
+
+
+def run_open(policy, primary, secondary):
+    opened = []
+
+    async def open_primary():
+        return primary
+
+    async def open_secondary(current):
+        opened.append(current.model)
+        if isinstance(secondary, Exception):
+            raise secondary
+        return secondary
+
+    async def scenario():
+        return await read(await policy.open(open_primary, open_secondary))
+
+    return asyncio.run(scenario()), opened
+
+
+def test_fast_primary_is_not_hedged():
+    policy = HedgePolicy(enabled=True, delay=0.5, max_fraction=1.0)
+    text, opened = run_open(policy, FakeStream("a", ["he", "llo"]), FakeStream("b"))
+    assert text == "hello"
+    assert opened == []
+    assert policy.stats()["hedges"] == 0
+
+
+def test_slow_primary_loses_to_hedge_and_is_closed():
+    policy = HedgePolicy(enabled=True, delay=0.01, max_fraction=1.0)
+    primary = FakeStream("a", delay=1.0)
+    text, opened = run_open(policy, primary, FakeStream("b", ["fast"]))
+    assert text == "fast"
+    assert opened == ["a"]
+    assert primary.closed
+    assert policy.stats()["hedge_wins"] == 1
+
+
+def test_primary_error_inside_hedge_window_falls_back():
+    policy = HedgePolicy(enabled=True, delay=1.0, max_fraction=0.0)
+    primary = FakeStream("a", error=RuntimeError("upstream 502"))
+    text, opened = run_open(policy, primary, FakeStream("b", ["rescued"]))
+    assert text == "rescued"
+    assert opened == ["a"]
+    assert primary.closed
+    stats = policy.stats()
+    assert stats["fallbacks"] == 1
+    assert stats["hedges"] == 0  # a fallback does not spend the hedge budget
+
+
+def test_primary_error_with_hedge_budget_spent_falls_back():
+    policy = HedgePolicy(enabled=True, delay=0.01, max_fraction=0.0)
+    primary = FakeStream("a", delay=0.05, error=RuntimeError("reset"))
+    text, _ = run_open(policy, primary, FakeStream("b", ["ok"]))
+    assert text == "ok"
+    assert policy.stats()["budget_denied"] == 1
+
+
+def test_primary_error_after_hedge_started_uses_the_hedge():
+    policy = HedgePolicy(enabled=True, delay=0.01, max_fraction=1.0)
+    primary = FakeStream("a", delay=0.05, error=RuntimeError("reset"))
+    text, _ = run_open(policy, primary, FakeStream("b", ["second"], delay=0.1))
+    assert text == "second"
+    assert policy.stats()["hedge_wins"] == 1
+
+
+def test_error_when_no_model_is_left():
+    policy = HedgePolicy(enabled=True, delay=1.0)
+    primary = FakeStream("a", error=RuntimeError("upstream 502"))
+    try:
+        run_open(policy, primary, Exception("All chat models currently unavailable. Please try again."))
+    except Exception as e:
+        assert "unavailable" in str(e)
+    else:
+        raise AssertionError("expected the fallback error")
+    assert primary.closed
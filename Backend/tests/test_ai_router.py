@@ -0,0 +1,79 @@
+"""Adaptive model routing and circuit breakers (Config/ai_router.py)."""
+
+import asyncio
+from Config.ai_router import ModelRouter, RoutedStream, STATE_OPEN, STATE_HALF_OPEN, STATE_CLOSED
+from tests.fake_ai import FakeClient, FakeStream, make_handler
+
+
+def test_configured_order_until_health_differs():
+    router = ModelRouter()
+    assert router.order(["a", "b", "c"]) == ["a", "b", "c"]
+    router.record_success("a", 3.0)
+    router.record_success("b", 0.2)
+    router.record_success("c", 0.3)
+    assert router.order(["a", "b", "c"]) == ["b", "c", "a"]  # a is in a slower latency bucket
+
+
+def test_failures_open_the_circuit_and_move_the_model_last():
+    router = ModelRouter(failure_threshold=2, cooldown=60)
+    router.record_failure("a")
+    assert router.available("a")
+    router.record_failure("a")
+    assert not router.available("a")
+    assert router.order(["a", "b"]) == ["b", "a"]
+    assert router.status(["a"])["a"]["state"] == STATE_OPEN
+
+
+def test_half_open_allows_a_single_probe():
+    router = ModelRouter(failure_threshold=1, cooldown=0)
+    router.record_failure("a")
+    assert router.status(["a"])["a"]["state"] == STATE_HALF_OPEN
+    assert router.order(["b", "a"]) == ["a", "b"]  # the probe goes first
+    router.before_call("a")
+    assert not router.available("a")  # a second caller does not probe too
+    router.record_success("a", 0.1)
+    status = router.status(["a"])["a"]
+    assert status["state"] == STATE_CLOSED
+    assert status["samples"] == 1  # the failures before recovery are forgotten
+
+
+def test_failed_probe_reopens():
+    router = ModelRouter(failure_threshold=3, cooldown=0)
+    for _ in range(3):
+        router.record_failure("a")
+    router.cooldown = 60
+    router.models["a"].opened_at -= 61
+    router.before_call("a")
+    router.record_failure("a")
+    assert router.status(["a"])["a"]["state"] == STATE_OPEN
+
+
+def test_routed_stream_reports_ttft_and_outcome():
+    async def scenario():
+        router = ModelRouter()
+        ok = RoutedStream(FakeStream(["a", "b"], delay=0.01), router, "fast", started=0)
+        async for _ in ok:
+            pass
+        failing = RoutedStream(FakeStream([], error=RuntimeError("reset")), router, "flaky", started=0)
+        try:
+            await failing.__anext__()
+        except RuntimeError:
+            pass
+        return router.status()
+
+    status = asyncio.run(scenario())
+    assert status["fast"]["success_rate"] == 1.0 and status["fast"]["avg_ttft_ms"] is not None
+    assert status["flaky"]["consecutive_failures"] == 1
+
+
+def test_handler_skips_a_model_with_an_open_circuit(monkeypatch):
+    monkeypatch.setenv("AI_MODEL_LIST", "model-a,model-b")
+    client = FakeClient({"model-a": RuntimeError("500"), "model-b": "ok"})
+    handler = make_handler(client, router=ModelRouter(failure_threshold=1, cooldown=60))
+
+    async def scenario():
+        return [await handler.generate_content(f"q{i}") for i in range(3)]
+
+    assert asyncio.run(scenario()) == ["ok"] * 3
+    # model-a failed once, then its circuit sent every request straight to model-b
+    assert client.models_called() == ["model-a", "model-b", "model-b", "model-b"]
@@ -0,0 +1,136 @@
+"""Single-flight coalescing of identical AI requests (Config/ai_singleflight.py)."""
+
+import asyncio
+from Config.ai_singleflight import SingleFlight
+from tests.fake_ai import FakeClient, FakeStream, make_handler
+
+
+async def read(stream):
+    return "".join([c.choices[0].delta.content async for c in stream])
+
+
+def test_concurrent_calls_share_one_upstream_call():
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.call("k", fn) for _ in range(5)))
+        later = await flight.call("k", fn)  # not in flight anymore: a new call
+        return results, later, flight.stats()
+
+    results, later, stats = asyncio.run(scenario())
+    assert results == ["answer"] * 5 and later == "answer"
+    assert len(calls) == 2
+    assert stats["leaders"] == 2 and stats["followers"] == 4 and stats["in_flight_calls"] == 0
+
+
+def test_cancelled_follower_does_not_cancel_the_shared_call():
+    async def fn():
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def scenario():
+        flight = SingleFlight()
+        leader = asyncio.create_task(flight.call("k", fn))
+        follower = asyncio.create_task(flight.call("k", fn))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        return await leader
+
+    assert asyncio.run(scenario()) == "answer"
+
+
+def test_streams_are_shared_and_late_joiners_replay():
+    opened = []
+
+    async def open_stream():
+        opened.append(1)
+        return FakeStream(["a", "b", "c", "d"], delay=0.02)
+
+    async def scenario():
+        flight = SingleFlight()
+        first = await flight.stream("k", open_stream)
+        await first.__anext__()
+        second = await flight.stream("k", open_stream)  # joins after "a" was produced
+        texts = await asyncio.gather(read(first), read(second))
+        return texts, flight.stats()
+
+    texts, stats = asyncio.run(scenario())
+    assert texts == ["bcd", "abcd"]
+    assert len(opened) == 1
+    assert stats["followers"] == 1 and stats["in_flight_streams"] == 0
+
+
+def test_upstream_is_closed_only_when_the_last_subscriber_leaves():
+    upstream = FakeStream(["x"] * 50, delay=0.01)
+
+    async def open_stream():
+        return upstream
+
+    async def scenario():
+        flight = SingleFlight()
+        first = await flight.stream("k", open_stream)
+        second = await flight.stream("k", open_stream)
+        await first.__anext__()
+        await first.close()
+        await asyncio.sleep(0.03)
+        still_open = not upstream.closed
+        await second.__anext__()
+        await second.close()
+        await asyncio.sleep(0.03)
+        return still_open, upstream.closed
+
+    assert asyncio.run(scenario()) == (True, True)
+
+
+def test_request_arriving_while_the_stream_is_cancelled_opens_a_fresh_one():
+    opened = []
+
+    async def open_stream():
+        upstream = FakeStream(["a", "b"], delay=0.01)
+        opened.append(upstream)
+        return upstream
+
+    async def scenario():
+        flight = SingleFlight()
+        first = await flight.stream("k", open_stream)
+        await first.close()  # cancels the pump; its cleanup has not run yet
+        second = await flight.stream("k", open_stream)
+        return await read(second), flight.stats()
+
+    text, stats = asyncio.run(scenario())
+    assert text == "ab"
+    assert len(opened) == 2 and opened[0].closed
+    assert stats["leaders"] == 2 and stats["followers"] == 0
+
+
+def test_open_errors_reach_every_subscriber():
+    async def open_stream():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("All chat models currently unavailable.")
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(flight.stream("k", open_stream), flight.stream("k", open_stream), return_exceptions=True)
+        return results, flight.stats()
+
+    results, stats = asyncio.run(scenario())
+    assert [str(r) for r in results] == ["All chat models currently unavailable."] * 2
+    assert stats["in_flight_streams"] == 0
+
+
+def test_handler_coalesces_identical_generations(monkeypatch):
+    monkeypatch.setenv("AI_MODEL_LIST", "model-a")
+    client = FakeClient({"model-a": "shared"}, delay=0.05)
+    handler = make_handler(client, coalescer=SingleFlight())
+
+    async def scenario():
+        return await asyncio.gather(*(handler.generate_content("same question") for _ in range(4)))
+
+    assert asyncio.run(scenario()) == ["shared"] * 4
+    assert len(client.calls) == 1
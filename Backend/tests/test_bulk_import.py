@@ -0,0 +1,117 @@
+"""Streaming bulk import (POST /api/tickets/bulk, iter_bulk_items in Controllers/post_controller.py)."""
+
+import json
+import asyncio
+import pytest
+from Config.ticket_dedup import DuplicateIndex
+from Config.ticket_vectors import VectorIndex
+from Controllers import post_controller
+
+
+def ticket(i, **fields):
+    return {"title": f"Bulk ticket number {i}", "description": f"Imported description number {i} " + "z" * i,
+            "category": "Math", "tags": ["bulk"], **fields}
+
+
+async def split(body: bytes, size: int):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def items(body: bytes, size: int):
+    async def scenario():
+        return [item async for item in post_controller.iter_bulk_items(split(body, size))]
+    return asyncio.run(scenario())
+
+
+def test_items_decode_across_any_chunk_boundary():
+    array = json.dumps([{"title": "Ünïcode ✓", "n": 1}, {"n": [1, {"x": "]"}]}]).encode()
+    ndjson = b'{"a": "\xc3\xa9"}\n\n{"b": 2}\r\n{"c": 3}'
+    for size in (1, 3, 7, 4096):
+        assert items(array, size) == [{"title": "Ünïcode ✓", "n": 1}, {"n": [1, {"x": "]"}]}]
+        assert items(ndjson, size) == [{"a": "é"}, {"b": 2}, {"c": 3}]
+
+
+@pytest.mark.parametrize("body", [
+    b'{"a": 1}, {"b": 2}', b'[{"a": 1}', b'[{"a": 1}] {"b": 2}', b'{"a": 1}\n{oops}\n',
+    b'[{} {}]', b'[,,{}]', b'[{},,{}]', b'[{},]', b'[,]',
+])
+def test_malformed_bodies_raise(body):
+    with pytest.raises(ValueError):
+        items(body, 5)
+
+
+def test_separators_between_array_items():
+    assert items(b'[]', 1) == []
+    assert items(b'[ {"a": 1} ,\n{"b": 2} ]', 1) == [{"a": 1}, {"b": 2}]
+
+
+@pytest.mark.parametrize("body", [b'[{"a": "' + b"x" * 500, b'{"a": "' + b"x" * 500])
+def test_oversized_item_fails_without_reading_the_rest(body, monkeypatch):
+    monkeypatch.setattr(post_controller, "BULK_MAX_ITEM_CHARS", 100)
+    read = []
+
+    async def chunks():
+        for start in range(0, len(body), 10):
+            read.append(start)
+            yield body[start:start + 10]
+
+    async def scenario():
+        return [item async for item in post_controller.iter_bulk_items(chunks())]
+
+    with pytest.raises(ValueError, match="larger than 100"):
+        asyncio.run(scenario())
+    assert len(read) <= 12
+
+
+@pytest.fixture
+def bulk(api, monkeypatch):
+    monkeypatch.setattr(post_controller, "duplicate_index", DuplicateIndex())
+    monkeypatch.setattr(post_controller, "ticket_index", VectorIndex())
+
+    def post(body: bytes, content_type="application/x-ndjson"):
+        response = api.post("/api/tickets/bulk", content=body, headers={"Content-Type": content_type})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        return [json.loads(line) for line in response.text.splitlines()]
+
+    return post
+
+
+def test_ndjson_import_reports_each_item(bulk, db, monkeypatch):
+    monkeypatch.setattr(post_controller, "BULK_INSERT_CHUNK", 2)
+    body = "\n".join(json.dumps(item) for item in [
+        ticket(1), ticket(2, category="Cooking"), ticket(3), {"title": "No description"}, ticket(4),
+    ]).encode()
+    lines = bulk(body)
+    # Errors are reported right away, created items once their insert chunk is written
+    results, summary = lines[:-1], lines[-1]["summary"]
+    by_index = {r["index"]: r for r in results}
+    assert [by_index[i]["status"] for i in range(5)] == ["created", "error", "created", "error", "created"]
+    assert "category" in by_index[1]["error"].lower()
+    assert "description" in by_index[3]["error"]
+    assert summary == {"received": 5, "created": 3, "failed": 2}
+    assert len(db.tickets.docs) == 3
+    assert all(doc["summary_status"] == "pending" for doc in db.tickets.docs)
+
+
+def test_json_array_import(bulk, db):
+    lines = bulk(json.dumps([ticket(i) for i in range(3)]).encode(), "application/json")
+    assert lines[-1]["summary"] == {"received": 3, "created": 3, "failed": 0}
+    assert {line["id"] for line in lines[:-1]} == {str(doc["_id"]) for doc in db.tickets.docs}
+
+
+def test_malformed_input_keeps_what_was_imported(bulk, db):
+    body = json.dumps(ticket(1)).encode() + b"\n{not json}\n" + json.dumps(ticket(2)).encode()
+    lines = bulk(body)
+    assert [line.get("status") for line in lines[:-1]] == ["error", "created"]
+    assert lines[0]["error"].startswith("Malformed input")
+    assert lines[-1]["summary"]["created"] == 1
+    assert len(db.tickets.docs) == 1
+
+
+def test_import_is_capped(bulk, db, monkeypatch):
+    monkeypatch.setattr(post_controller, "BULK_MAX_ITEMS", 2)
+    lines = bulk("\n".join(json.dumps(ticket(i)) for i in range(4)).encode())
+    assert lines[0] == {"index": 2, "status": "error", "error": "Import limited to 2 items."}
+    assert lines[-1]["summary"]["created"] == 2
@@ -0,0 +1,75 @@
+"""Persistent, token-budgeted chat history (Config/chat_history.py)."""
+
+import asyncio
+from Config import chat_history
+from Config.chat_history import ConversationStore
+
+
+def test_exchanges_are_stored_per_session_and_ticket(db):
+    async def scenario():
+        store = ConversationStore()
+        await store.append_exchange("s1", None, "Hi", "Hello!")
+        await store.append_exchange("s1", None, "What is a set?", "A collection.")
+        await store.append_exchange("s1", "t1", "About this ticket", "Sure.")
+        return await store.load_context("s1"), await store.load_context("s1", "t1"), await store.load_context("other")
+
+    global_chat, ticket_chat, unknown = asyncio.run(scenario())
+    assert [m["content"] for m in global_chat] == ["Hi", "Hello!", "What is a set?", "A collection."]
+    assert [m["role"] for m in global_chat] == ["user", "assistant"] * 2
+    assert [m["content"] for m in ticket_chat] == ["About this ticket", "Sure."]
+    assert unknown == []
+    assert len(db.chat_sessions.docs) == 2
+
+
+def test_context_keeps_the_newest_turns_within_budget(db):
+    async def scenario():
+        store = ConversationStore(token_budget=10**6)
+        for i in range(5):
+            await store.append_exchange("s1", None, f"question {i} " + "x" * 36, f"answer {i} " + "y" * 36)
+        store.token_budget = 50  # each turn costs ~12 tokens
+        return await store.load_context("s1")
+
+    context = asyncio.run(scenario())
+    assert len(context) == 4
+    assert context[0]["content"].startswith("question 3") and context[-1]["content"].startswith("answer 4")
+
+
+def test_oversized_threads_are_compacted_into_a_summary(db, monkeypatch):
+    prompts = []
+
+    async def generate_content(prompt, **kwargs):
+        prompts.append(prompt)
+        return " Student asked about sets. "
+
+    monkeypatch.setattr(chat_history.ai_handler, "generate_content", generate_content)
+
+    async def scenario():
+        store = ConversationStore(token_budget=100, keep_recent_turns=2)
+        for i in range(4):
+            await store.append_exchange("s1", None, f"question {i} " + "x" * 100, f"answer {i}")
+        await asyncio.gather(*list(store.compacting.values()))
+        return await store.load_context("s1")
+
+    context = asyncio.run(scenario())
+    session = db.chat_sessions.docs[0]
+    assert session["summary"] == "Student asked about sets."
+    assert [t["content"] for t in session["turns"]][-1] == "answer 3"
+    assert len(session["turns"]) <= 4
+    assert "question 0" in prompts[0]
+    assert context[0]["role"] == "system" and "Student asked about sets." in context[0]["content"]
+
+
+def test_failed_summary_keeps_the_turns(db, monkeypatch):
+    async def generate_content(prompt, **kwargs):
+        return chat_history.AI_EXHAUSTED_MESSAGE
+
+    monkeypatch.setattr(chat_history.ai_handler, "generate_content", generate_content)
+
+    async def scenario():
+        store = ConversationStore(token_budget=100, keep_recent_turns=0)
+        await store.append_exchange("s1", None, "q" * 500, "a")
+        await asyncio.gather(*list(store.compacting.values()))
+
+    asyncio.run(scenario())
+    session = db.chat_sessions.docs[0]
+    assert session["summary"] is None and len(session["turns"]) == 2
@@ -0,0 +1,86 @@
+"""relay_stream (Controllers/chat_controller.py): upstream cancellation when the client goes away."""
+
+import asyncio
+import pytest
+from Config.stream_stats import StreamStats
+from Controllers import chat_controller
+from tests.fake_ai import FakeStream
+
+
+class FakeRequest:
+    """Reports a disconnect once `connected_checks` calls to is_disconnected() were made."""
+
+    def __init__(self, connected_checks: int):
+        self.checks_left = connected_checks
+
+    async def is_disconnected(self):
+        self.checks_left -= 1
+        return self.checks_left < 0
+
+
+async def collect(frames):
+    return [frame async for frame in frames]
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    stats = StreamStats()
+    monkeypatch.setattr(chat_controller, "stream_stats", stats)
+    return stats
+
+
+def relay(upstream, request=None):
+    completed, closed = [], []
+
+    async def on_complete(text):
+        completed.append(text)
+
+    async def on_close(text):
+        closed.append(text)
+
+    return chat_controller.relay_stream(upstream, request, "test", on_complete, on_close, "s1"), completed, closed
+
+
+def test_completed_stream_ends_with_done(stats):
+    upstream = FakeStream(["Hello", " world"])
+    frames, completed, closed = relay(upstream, FakeRequest(100))
+    sent = asyncio.run(collect(frames))
+    assert sent[-1].endswith(b"data: [DONE]\n\n")
+    assert completed == ["Hello world"] and closed == ["Hello world"]
+    assert stats.snapshot()["completed_streams"] == 1
+
+
+def test_disconnect_closes_upstream_without_draining(stats):
+    upstream = FakeStream([f"t{i} " for i in range(50)], delay=0.01)
+    frames, completed, closed = relay(upstream, FakeRequest(2))
+    sent = asyncio.run(collect(frames))
+    assert upstream.closed
+    assert upstream.sent < 50
+    assert not any(b"[DONE]" in frame for frame in sent)
+    assert completed == [] and len(closed) == 1
+    snapshot = stats.snapshot()
+    assert snapshot["aborted_streams"] == 1 and snapshot["completed_streams"] == 0
+
+
+def test_closing_the_relay_closes_upstream(stats):
+    upstream = FakeStream(["a", "b", "c"], delay=0.01)
+    frames, _, closed = relay(upstream)
+
+    async def scenario():
+        await frames.__anext__()
+        await frames.aclose()  # the response task was cancelled
+
+    asyncio.run(scenario())
+    assert upstream.closed
+    assert closed == ["a"]
+    assert stats.snapshot()["aborted_streams"] == 1
+
+
+def test_mid_stream_error_is_reported_to_the_client(stats):
+    upstream = FakeStream(["partial"], error=RuntimeError("reset"), fail_after=1)
+    frames, completed, _ = relay(upstream)
+    sent = asyncio.run(collect(frames))
+    assert b"AI connection lost mid-stream" in sent[-1]
+    assert sent[-1].startswith(b"id: s1-")
+    assert upstream.closed and completed == []
+
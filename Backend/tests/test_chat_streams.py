@@ -0,0 +1,191 @@
+"""Resumable chat streams (Config/chat_streams.py) and chat resume over the chat routes."""
+
+import asyncio
+from types import SimpleNamespace
+import pytest
+from Config.chat_streams import ChatStreamRegistry, STOPPED_MESSAGE, RESUME_GAP_MESSAGE, parse_event_id
+from Config.fast_json import text_frame, with_event_id
+
+
+def frames_of(stream_id, texts):
+    return [with_event_id(f"{stream_id}-{seq}", text_frame(text)) for seq, text in enumerate(texts, 1)]
+
+
+async def source(frames, delay=0.0, closed=None):
+    try:
+        for frame in frames:
+            await asyncio.sleep(delay)
+            yield frame
+    finally:
+        if closed is not None:
+            closed.append(True)
+
+
+async def collect(frames):
+    return [frame async for frame in frames]
+
+
+def test_parse_event_id():
+    assert parse_event_id("abc-def-12") == ("abc-def", 12)
+    assert parse_event_id("abc") == (None, None)
+    assert parse_event_id("-3") == (None, None)
+    assert parse_event_id(None) == (None, None)
+
+
+def test_follow_replays_then_resume_continues_after_last_event():
+    async def scenario():
+        registry = ChatStreamRegistry()
+        expected = frames_of("s1", ["a", "b", "c"])
+        stream = registry.start("s1", "client", ("global_chat", None, "hi"), source(expected))
+        first = await collect(stream.follow(0))
+        resumed, after = registry.resume("s1-1", "client", ("global_chat", None, "hi"))
+        rest = await collect(resumed.follow(after))
+        misses = [
+            registry.resume("s1-1", "someone else", ("global_chat", None, "hi")),
+            registry.resume("s1-1", "client", ("global_chat", None, "another question")),
+            registry.resume("unknown-1", "client", ("global_chat", None, "hi")),
+        ]
+        await registry.stop()
+        return expected, first, rest, misses, registry.stats()
+
+    expected, first, rest, misses, stats = asyncio.run(scenario())
+    assert first == expected
+    assert rest == expected[1:]
+    assert misses == [(None, None)] * 3
+    assert stats["resumed"] == 1 and stats["resume_misses"] == 3
+
+
+def test_reconnect_within_grace_follows_the_live_answer():
+    async def scenario():
+        registry = ChatStreamRegistry(detach_grace=0.2)
+        expected = frames_of("s2", ["one", "two", "three", "four"])
+        stream = registry.start("s2", "client", ("k",), source(expected, delay=0.02))
+        first = stream.follow(0)
+        seen = [await first.__anext__()]
+        await first.aclose()  # the tab dropped its connection
+        await asyncio.sleep(0.05)
+        seen += await collect(stream.follow(1))
+        await registry.stop()
+        return expected, seen, registry.stats()
+
+    expected, seen, stats = asyncio.run(scenario())
+    assert seen == expected
+    assert stats["abandoned"] == 0
+
+
+def test_stream_nobody_follows_is_cancelled_after_grace():
+    async def scenario():
+        registry = ChatStreamRegistry(detach_grace=0.05)
+        closed = []
+        stream = registry.start("s3", "client", ("k",), source(frames_of("s3", ["x"] * 100), delay=0.01, closed=closed))
+        await asyncio.sleep(0.3)
+        late = await collect(stream.follow(stream.seq - 1))
+        await registry.stop()
+        return stream, closed, late, registry.stats()
+
+    stream, closed, late, stats = asyncio.run(scenario())
+    assert stream.done and closed == [True]
+    assert stream.seq < 100
+    assert STOPPED_MESSAGE.encode() in late[-1]
+    assert stats["abandoned"] == 1
+
+
+def test_resume_past_evicted_frames_reports_a_gap():
+    async def scenario():
+        registry = ChatStreamRegistry(stream_bytes=200)
+        stream = registry.start("s4", "client", ("k",), source(frames_of("s4", ["y" * 50] * 10)))
+        await collect(stream.follow(0))
+        resumed = registry.resume("s4-1", "client", ("k",))
+        stale = await collect(stream.follow(1))
+        await registry.stop()
+        return resumed, stale, registry.stats()
+
+    resumed, stale, stats = asyncio.run(scenario())
+    assert resumed == (None, None)
+    assert RESUME_GAP_MESSAGE.encode() in stale[0]
+    assert stats["evicted_bytes"] > 0
+
+
+def test_resumed_finished_stream_still_expires_after_linger():
+    async def scenario():
+        registry = ChatStreamRegistry(linger=0.05)
+        stream = registry.start("s5", "client", ("k",), source(frames_of("s5", ["a", "b"])))
+        await collect(stream.follow(0))
+        resumed, after = registry.resume("s5-1", "client", ("k",))
+        await collect(resumed.follow(after))
+        await asyncio.sleep(0.1)
+        return registry.streams, registry.stats()
+
+    streams, stats = asyncio.run(scenario())
+    assert streams == {}
+    assert stats["bytes"] == 0
+
+
+# ── Over the chat routes ─────────────────────────────────────────────────────
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class FakeUpstream:
+    def __init__(self, parts):
+        self.parts = list(parts)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.parts:
+            raise StopAsyncIteration
+        await asyncio.sleep(0.01)
+        return chunk(self.parts.pop(0))
+
+    async def close(self):
+        self.parts = []
+
+
+@pytest.fixture
+def chat(api, monkeypatch):
+    from Controllers import chat_controller
+    opened = []
+
+    async def stream_content(prompt, **kwargs):
+        opened.append(prompt)
+        return FakeUpstream(["Hello", " there", ", student."])
+
+    monkeypatch.setattr(chat_controller, "chat_streams", ChatStreamRegistry())
+    monkeypatch.setattr(chat_controller.ai_handler, "stream_content", stream_content)
+    return api, opened
+
+
+def events(body: str):
+    """(id, data) of every SSE event in `body`."""
+    parsed = []
+    for block in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line and not line.startswith(":"))
+        if "data" in fields:
+            parsed.append((fields.get("id"), fields["data"]))
+    return parsed
+
+
+def test_chat_route_resumes_with_last_event_id(chat):
+    api, opened = chat
+    first = api.post("/api/chat/global/stream", json={"message": "What is recursion?"})
+    assert first.status_code == 200
+    stream_id = first.headers["X-Stream-Id"]
+    full = events(first.text)
+    assert full[-1][1] == "[DONE]"
+    assert all(event_id.startswith(stream_id + "-") for event_id, _ in full)
+
+    resumed = api.post(
+        "/api/chat/global/stream", json={"message": "What is recursion?"}, headers={"Last-Event-ID": full[0][0]}
+    )
+    assert resumed.headers["X-Stream-Id"] == stream_id
+    assert resumed.headers["X-Session-Id"] == first.headers["X-Session-Id"]
+    assert events(resumed.text) == full[1:]
+    assert opened == ["What is recursion?"]  # replayed, not generated again
+
+    other = api.post(
+        "/api/chat/global/stream", json={"message": "Something else"}, headers={"Last-Event-ID": full[0][0]}
+    )
+    assert other.headers["X-Stream-Id"] != stream_id
+    assert len(opened) == 2
@@ -0,0 +1,36 @@
+"""orjson encoding and pre-encoded SSE frames (Config/fast_json.py)."""
+
+import json
+import datetime
+from bson import ObjectId
+from pydantic import BaseModel
+from Config.fast_json import FastJSONResponse, dumps, text_frame, error_frame, with_event_id, DONE_FRAME
+
+
+class Stamped(BaseModel):
+    at: datetime.datetime
+
+
+def test_dumps_writes_datetimes_like_pydantic_and_objectids_as_strings():
+    at = datetime.datetime(2024, 5, 1, 12, 30, 15, 123000)
+    ticket_id = ObjectId()
+    encoded = json.loads(dumps({"at": at, "id": ticket_id}))
+    assert encoded["at"] == json.loads(Stamped(at=at).model_dump_json())["at"]
+    assert encoded["id"] == str(ticket_id)
+
+
+def test_fast_json_response_renders_unvalidated_content():
+    response = FastJSONResponse([{"title": "Ünïcode ✓"}], headers={"X-Next-Cursor": "abc"})
+    assert json.loads(response.body) == [{"title": "Ünïcode ✓"}]
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["x-next-cursor"] == "abc"
+
+
+def test_sse_frames_match_json_encoding():
+    text = 'line "one"\nline two '
+    frame = text_frame(text)
+    assert frame.startswith(b"data: ") and frame.endswith(b"\n\n")
+    assert json.loads(frame[len(b"data: "):]) == {"text": text}
+    assert b"\n" not in frame[:-2]  # newlines in the text never split the frame
+    assert json.loads(error_frame("boom")[len(b"data: "):]) == {"error": "boom"}
+    assert with_event_id("ab-3", DONE_FRAME) == b"id: ab-3\ndata: [DONE]\n\n"
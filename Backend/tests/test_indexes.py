@@ -0,0 +1,23 @@
+import asyncio
+from pymongo.errors import OperationFailure
+from Config.db import CreateIndexes, INDEXES
+
+
+def test_every_index_is_created(db):
+    assert asyncio.run(CreateIndexes()) == []
+    names = set(db.tickets.indexes) | set(db.chat_sessions.indexes)
+    assert names == {options["name"] for _, _, options in INDEXES}
+
+
+def test_one_conflicting_index_does_not_skip_the_others(db):
+    create_index = db.tickets.create_index
+
+    async def conflicting(keys, name=None, **options):
+        if name == "ticket_text_search":
+            raise OperationFailure("An equivalent index already exists with different options", code=85)
+        return await create_index(keys, name=name, **options)
+
+    db.tickets.create_index = conflicting
+    assert asyncio.run(CreateIndexes()) == ["ticket_text_search"]
+    assert "updated_at_id" in db.tickets.indexes
+    assert "chat_session_ttl" in db.chat_sessions.indexes
@@ -0,0 +1,93 @@
+"""Structured, queue-backed logging (Config/logger.py)."""
+
+import io
+import json
+import logging
+import threading
+import pytest
+import Config.logger as logger_module
+from Config.logger import StructuredLogger
+
+
+@pytest.fixture
+def make_logger():
+    """Builds StructuredLoggers and afterwards gives the shared "thinkback" logger back to the app's."""
+    shared = logging.getLogger("thinkback")
+    handlers, level = list(shared.handlers), shared.level
+    created = []
+
+    def make(**kwargs):
+        stream = kwargs.pop("stream", None) or io.StringIO()
+        instance = StructuredLogger(stream=stream, **kwargs)
+        created.append(instance)
+        return instance, stream
+
+    yield make
+    for instance in created:
+        instance.stop()
+    shared.handlers, shared.level = handlers, level
+
+
+def lines(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_records_are_written_by_the_listener_and_flushed_on_stop(make_logger):
+    log, stream = make_logger(level="info")
+    log.start()
+    log.log(logging.INFO, "success", "saved", request_id="req-1", ticket_id="t1")
+    log.log(logging.DEBUG, "debug", "hidden")
+    log.stop()
+    [entry] = lines(stream)
+    assert entry["message"] == "saved"
+    assert entry["success"] is True
+    assert entry["request_id"] == "req-1"
+    assert entry["ticket_id"] == "t1"
+
+
+def test_start_is_idempotent_and_restarts_after_stop(make_logger):
+    log, stream = make_logger()
+    log.start()
+    log.start()
+    log.stop()
+    log.start()  # e.g. a second lifespan in the same process
+    assert log.started and log.listener._thread is not None
+    log.log(logging.WARNING, "warning", "after restart")
+    log.stop()
+    assert [entry["message"] for entry in lines(stream)] == ["after restart"]
+
+
+def test_hot_path_messages_are_sampled(make_logger):
+    log, stream = make_logger(sample_every=5)
+    for _ in range(10):
+        log.log(logging.INFO, "info", "chunk", sample="hot")
+    log.log(logging.WARNING, "warning", "never sampled", sample="hot")
+    log.stop()
+    entries = lines(stream)
+    assert [entry.get("sampled", 1) for entry in entries] == [1, 5, 5, 1]
+    assert log.stats()["sampled_out"] == 7
+
+
+def test_full_queue_drops_instead_of_blocking(make_logger):
+    release = threading.Event()
+
+    class BlockingStream(io.StringIO):
+        def write(self, text):
+            release.wait(5)
+            return super().write(text)
+
+    log, _ = make_logger(queue_size=2, stream=BlockingStream())
+    log.start()
+    for i in range(10):
+        log.log(logging.INFO, "info", f"record {i}")
+    assert log.stats()["dropped"] >= 7
+    release.set()
+
+
+def test_log_debug_accepts_the_old_emoji_form(make_logger, monkeypatch):
+    log, stream = make_logger(level="debug", fmt="text")
+    monkeypatch.setattr(logger_module, "logger", log)
+    logger_module.log_debug("🧪", "old style")
+    logger_module.log_debug("new style", step="parse")
+    log.stop()
+    assert stream.getvalue().splitlines() == ["------------->🧪 old style", "------------->🔍 new style"]
@@ -0,0 +1,66 @@
+"""SSE token coalescing (Config/sse_coalescer.py)."""
+
+import asyncio
+from Config.sse_coalescer import TokenCoalescer
+from tests.fake_ai import FakeStream
+
+
+def run(upstream, **options):
+    coalescer = TokenCoalescer(upstream, **options)
+
+    async def scenario():
+        return [text async for text in coalescer]
+
+    return asyncio.run(scenario()), coalescer
+
+
+def test_first_text_is_not_delayed_and_bursts_are_grouped():
+    async def timed():
+        coalescer = TokenCoalescer(FakeStream(["a"] * 40, delay=0.001), max_chars=1000, max_delay=0.5)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        frames = []
+        async for text in coalescer:
+            frames.append((text, loop.time() - started))
+        return frames, coalescer
+
+    frames, coalescer = asyncio.run(timed())
+    assert frames[0][0] == "a" and frames[0][1] < 0.1
+    assert "".join(text for text, _ in frames) == "a" * 40
+    assert len(frames) == 2 and coalescer.deltas == 40 and coalescer.frames == 2
+
+
+def test_size_cap_flushes():
+    frames, _ = run(FakeStream(["abcd"] * 10), max_chars=8, max_delay=10)
+    assert "".join(frames) == "abcd" * 10
+    assert all(len(text) <= 8 for text in frames)
+    assert len(frames) >= 5
+
+
+def test_deadline_flushes_while_upstream_is_slow():
+    frames, _ = run(FakeStream(["x", "y", "z"], delay=0.05), max_chars=1000, max_delay=0.01)
+    assert frames == ["x", "y", "z"]  # each arrives after a quiet gap, so none waits
+
+
+def test_heartbeat_while_the_model_is_silent():
+    frames, coalescer = run(FakeStream(["late"], delay=0.12), heartbeat_interval=0.05)
+    # Silence before the text (and before the end of the stream) is filled with heartbeats
+    assert frames[0] is None
+    assert [text for text in frames if text is not None] == ["late"]
+    assert coalescer.frames == 1
+
+
+def test_error_is_raised_after_buffered_text():
+    coalescer = TokenCoalescer(FakeStream(["a", "b", "c"], error=RuntimeError("reset"), fail_after=3),
+                               max_chars=1000, max_delay=10)
+    received = []
+
+    async def scenario():
+        try:
+            async for text in coalescer:
+                received.append(text)
+        except RuntimeError as e:
+            return str(e)
+
+    assert asyncio.run(scenario()) == "reset"
+    assert "".join(received) == "abc"
@@ -0,0 +1,191 @@
+import asyncio
+import datetime
+import pytest
+from bson import ObjectId
+from Config import summary_worker as module
+from Config.summary_worker import SummaryWorker, AI_EXHAUSTED_MESSAGE, parse_batch_summaries
+
+
+class FakeAI:
+    """Stands in for ai_handler.generate_content; replies are consumed in order."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    async def generate_content(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        reply = self.replies.pop(0) if self.replies else "A summary."
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+@pytest.fixture
+def ai(monkeypatch):
+    fake = FakeAI()
+    monkeypatch.setattr(module, "ai_handler", fake)
+    return fake
+
+
+def add_pending(db, title="Ticket", **fields) -> str:
+    ticket_id = ObjectId()
+    db.tickets.docs.append({
+        "_id": ticket_id, "title": title, "description": "Some description", "summary_status": "pending",
+        "created_at": datetime.datetime(2026, 1, 1), **fields,
+    })
+    return str(ticket_id)
+
+
+async def wait_for(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+def status(db, ticket_id):
+    return next(d for d in db.tickets.docs if str(d["_id"]) == ticket_id)["summary_status"]
+
+
+def run_worker(db, scenario, **settings):
+    async def main():
+        worker = SummaryWorker()
+        worker.retry_delay = 0
+        for name, value in settings.items():
+            setattr(worker, name, value)
+        await worker.start()
+        try:
+            await scenario(worker)
+        finally:
+            await worker.stop()
+    asyncio.run(main())
+
+
+def test_summary_is_stored(db, ai):
+    async def scenario(worker):
+        ticket_id = add_pending(db)
+        worker.enqueue(ticket_id)
+        await wait_for(lambda: status(db, ticket_id) == "completed")
+        assert ticket_id not in worker.queued
+
+    run_worker(db, scenario)
+    assert db.tickets.docs[0]["ai_summary"] == "A summary."
+
+
+def test_database_error_releases_the_ticket_and_retries(db, ai):
+    async def scenario(worker):
+        ticket_id = add_pending(db)
+        db.tickets.fail_next = ConnectionError("connection reset")
+        worker.enqueue(ticket_id)
+        await wait_for(lambda: status(db, ticket_id) == "completed")
+        assert ticket_id not in worker.queued
+
+    run_worker(db, scenario)
+
+
+def test_crash_on_last_attempt_leaves_ticket_pending_but_not_queued(db, ai):
+    async def scenario(worker):
+        ticket_id = add_pending(db)
+        db.tickets.fail_next = ConnectionError("connection reset")
+        worker.enqueue(ticket_id)
+        await wait_for(lambda: ticket_id not in worker.queued and worker.queue.empty())
+        await asyncio.sleep(0.05)
+        assert status(db, ticket_id) == "pending"
+        # A later enqueue is no longer refused as a duplicate
+        worker.enqueue(ticket_id)
+        await wait_for(lambda: status(db, ticket_id) == "completed")
+
+    run_worker(db, scenario, max_attempts=1)
+    assert db.tickets.docs[0]["summary_status"] == "completed"
+
+
+def test_invalid_ticket_id_is_dropped(db, ai):
+    async def scenario(worker):
+        worker.enqueue("not-an-object-id")
+        await wait_for(lambda: "not-an-object-id" not in worker.queued)
+        assert not worker.retry_tasks
+
+    run_worker(db, scenario)
+
+
+def test_failed_generations_are_retried_then_marked_failed(db, ai):
+    ai.replies = [RuntimeError("upstream down")] * 3
+
+    async def scenario(worker):
+        ticket_id = add_pending(db)
+        worker.enqueue(ticket_id)
+        await wait_for(lambda: status(db, ticket_id) == "failed")
+
+    run_worker(db, scenario, max_attempts=3)
+    assert len(ai.prompts) == 3
+
+
+def test_duplicate_reuses_the_original_summary(db, ai):
+    original = ObjectId()
+    db.tickets.docs.append({"_id": original, "ai_summary": "Original summary.", "summary_status": "completed"})
+
+    async def scenario(worker):
+        ticket_id = add_pending(db, duplicate_of=str(original))
+        worker.enqueue(ticket_id)
+        await wait_for(lambda: status(db, ticket_id) == "completed")
+
+    run_worker(db, scenario)
+    assert ai.prompts == []
+    assert db.tickets.docs[1]["ai_summary"] == "Original summary."
+
+
+def test_rescanned_tickets_are_summarized_in_one_batch(db, ai):
+    ids = [add_pending(db, title=f"Ticket {i}") for i in range(3)]
+    ai.replies = ['["One.", "Two.", "Three."]']
+
+    async def scenario(worker):
+        await wait_for(lambda: all(status(db, t) == "completed" for t in ids))
+
+    run_worker(db, scenario, batch_wait=0)
+    assert len(ai.prompts) == 1
+    assert [d["ai_summary"] for d in db.tickets.docs] == ["One.", "Two.", "Three."]
+
+
+def test_ticket_leased_by_another_process_is_left_alone(db, ai):
+    now = datetime.datetime.utcnow()
+    held = add_pending(db, summary_owner="other", summary_lease_until=now + datetime.timedelta(minutes=5))
+    expired = add_pending(db, summary_owner="crashed", summary_lease_until=now - datetime.timedelta(minutes=5))
+
+    async def scenario(worker):
+        await wait_for(lambda: status(db, expired) == "completed")
+        worker.enqueue(held)
+        await wait_for(lambda: held not in worker.queued)
+
+    run_worker(db, scenario, batch_wait=0)
+    assert status(db, held) == "pending"
+    assert len(ai.prompts) == 1
+    assert "summary_owner" not in db.tickets.docs[1] and "summary_lease_until" not in db.tickets.docs[1]
+
+
+def test_late_result_does_not_overwrite_another_processes_summary(db, monkeypatch):
+    ticket_id = add_pending(db)
+
+    class LosesLease:
+        async def generate_content(self, prompt, **kwargs):
+            # Our lease ran out and another process claimed and completed the ticket
+            ticket = db.tickets.docs[0]
+            ticket.update(summary_owner="other", ai_summary="Their summary.", summary_status="completed")
+            return AI_EXHAUSTED_MESSAGE
+
+    monkeypatch.setattr(module, "ai_handler", LosesLease())
+
+    async def scenario(worker):
+        worker.enqueue(ticket_id)
+        await wait_for(lambda: ticket_id not in worker.queued)
+
+    run_worker(db, scenario, max_attempts=1, batch_wait=0)
+    assert db.tickets.docs[0]["summary_status"] == "completed"
+    assert db.tickets.docs[0]["ai_summary"] == "Their summary."
+
+
+def test_parse_batch_summaries():
+    assert parse_batch_summaries('Here: ["a", " b "]', 2) == ["a", "b"]
+    assert parse_batch_summaries('["a", ""]', 2) == ["a", None]
+    assert parse_batch_summaries('["a"]', 2) is None
+    assert parse_batch_summaries("no json", 1) is None
@@ -0,0 +1,96 @@
+"""Ticket context cache for ticket-scoped chat (Config/ticket_context.py)."""
+
+import asyncio
+import datetime
+from Config.ticket_context import TicketContextCache
+
+
+def render(ticket):
+    return f"{ticket['title']} | {ticket.get('ai_summary') or 'no summary'}"
+
+
+def add_ticket(db, **fields):
+    now = datetime.datetime.utcnow()
+    doc = {"title": "Sets", "description": "What is a set?", "ai_summary": None, "image": "big",
+           "created_at": now, "updated_at": now, **fields}
+    asyncio.run(db.tickets.insert_one(doc))
+    return str(doc["_id"])
+
+
+def count_reads(db, monkeypatch):
+    reads = []
+    find_one = db.tickets.find_one
+
+    async def counting_find_one(query, projection=None, **kwargs):
+        reads.append(projection)
+        await asyncio.sleep(0.01)
+        return await find_one(query, projection, **kwargs)
+
+    monkeypatch.setattr(db.tickets, "find_one", counting_find_one)
+    return reads
+
+
+def test_read_through_with_shared_misses(db, monkeypatch):
+    ticket_id = add_ticket(db)
+    reads = count_reads(db, monkeypatch)
+
+    async def scenario():
+        cache = TicketContextCache()
+        concurrent = await asyncio.gather(*(cache.get(ticket_id, render) for _ in range(5)))
+        again = await cache.get(ticket_id, render)
+        return concurrent, again, cache.stats()
+
+    concurrent, again, stats = asyncio.run(scenario())
+    assert concurrent == ["Sets | no summary"] * 5 and again == "Sets | no summary"
+    assert len(reads) == 1
+    assert "image" not in reads[0] and "title" in reads[0]
+    assert stats == {"hits": 1, "misses": 5, "entries": 1}
+
+
+def test_invalidate_picks_up_a_new_summary(db):
+    ticket_id = add_ticket(db)
+
+    async def scenario():
+        cache = TicketContextCache()
+        before = await cache.get(ticket_id, render)
+        await db.tickets.update_one({"title": "Sets"}, {"$set": {"ai_summary": "Sets are collections."}})
+        cached = await cache.get(ticket_id, render)
+        cache.invalidate(ticket_id)
+        return before, cached, await cache.get(ticket_id, render)
+
+    assert asyncio.run(scenario()) == ("Sets | no summary", "Sets | no summary", "Sets | Sets are collections.")
+
+
+def test_invalidated_load_is_not_cached(db, monkeypatch):
+    ticket_id = add_ticket(db)
+    count_reads(db, monkeypatch)
+
+    async def scenario():
+        cache = TicketContextCache()
+        loading = asyncio.create_task(cache.get(ticket_id, render))
+        await asyncio.sleep(0)
+        cache.invalidate(ticket_id)  # e.g. the summary landed while we were reading
+        await loading
+        return cache.stats()["entries"]
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_missing_ticket_ttl_and_lru(db):
+    first, second = add_ticket(db, title="One"), add_ticket(db, title="Two")
+
+    async def scenario():
+        cache = TicketContextCache(max_entries=1)
+        missing = await cache.get("0" * 24, render)
+        await cache.get(first, render)
+        await cache.get(second, render)
+        kept = list(cache.entries)
+        expired = TicketContextCache(ttl=-1)
+        await expired.get(first, render)
+        await expired.get(first, render)
+        return missing, kept, expired.stats()
+
+    missing, kept, expired = asyncio.run(scenario())
+    assert missing is None
+    assert kept == [second]
+    assert expired["hits"] == 0 and expired["misses"] == 2
@@ -0,0 +1,96 @@
+"""Near-duplicate detection (Config/ticket_dedup.py) and summary reuse on create."""
+
+import asyncio
+import numpy as np
+import pytest
+from Config.ticket_dedup import DuplicateIndex, minhash, shingles
+from Config.ticket_vectors import VectorIndex
+from Controllers import post_controller
+
+ORIGINAL = {
+    "title": "How do I reverse a linked list in Python",
+    "description": "I keep losing the rest of the list when I reverse the next pointers of a singly linked list in Python.",
+}
+COPY = {**ORIGINAL, "title": "How do I reverse a linked list in Python?!"}
+DIFFERENT = {
+    "title": "Photosynthesis light reactions",
+    "description": "Where exactly in the chloroplast do the light dependent reactions of photosynthesis happen?",
+}
+
+
+def jaccard(a, b):
+    a, b = shingles(f"{a['title']} {a['description']}"), shingles(f"{b['title']} {b['description']}")
+    return len(a & b) / len(a | b)
+
+
+def test_signatures_are_stable_and_estimate_similarity():
+    signature = minhash(ORIGINAL)
+    assert signature.dtype == np.uint32 and signature.size == 64
+    assert np.array_equal(signature, minhash(dict(ORIGINAL)))
+    estimate = float(np.mean(minhash(COPY) == signature))
+    assert abs(estimate - jaccard(ORIGINAL, COPY)) < 0.2
+    assert float(np.mean(minhash(DIFFERENT) == signature)) < 0.2
+
+
+def test_candidates_above_threshold_only():
+    index = DuplicateIndex(threshold=0.7)
+    index.add("original", minhash(ORIGINAL))
+    index.add("different", minhash(DIFFERENT))
+    matches = index.candidates(minhash(COPY))
+    assert [ticket_id for ticket_id, _ in matches] == ["original"]
+    assert index.candidates(minhash({"title": "Unrelated", "description": "Nothing in common here at all"})) == []
+
+
+def test_signatures_persist_and_tickets_are_backfilled(db):
+    async def scenario():
+        first = DuplicateIndex()
+        original = await db.tickets.insert_one(dict(ORIGINAL))
+        await first.save(str(original.inserted_id), minhash(ORIGINAL))
+        await db.tickets.insert_one(dict(DIFFERENT))  # has no signature yet
+
+        second = DuplicateIndex()
+        await second.start()
+        await second.task
+        return second.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["ready"] and stats["signatures"] == 2
+    assert len(db.ticket_signatures.docs) == 2
+
+
+@pytest.fixture
+def indexes(monkeypatch):
+    index = DuplicateIndex()
+    monkeypatch.setattr(post_controller, "duplicate_index", index)
+    monkeypatch.setattr(post_controller, "ticket_index", VectorIndex())
+    return index
+
+
+def create(api, ticket):
+    response = api.post("/api/tickets/", json={**ticket, "category": "Programming", "tags": ["python"]})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_duplicate_reuses_a_completed_summary(api, db, indexes):
+    original = create(api, ORIGINAL)
+    assert original["summary_status"] == "pending"
+    asyncio.run(db.tickets.update_one(
+        {"title": ORIGINAL["title"]}, {"$set": {"ai_summary": "Keep a prev pointer.", "summary_status": "completed"}}
+    ))
+
+    copy = create(api, COPY)
+    assert copy["duplicate_of"] == original["id"]
+    assert copy["summary_status"] == "completed"
+    assert copy["ai_summary"] == "Keep a prev pointer."
+    assert create(api, DIFFERENT)["summary_status"] == "pending"
+    stats = api.get("/api/tickets/stats").json()["duplicates"]
+    assert stats["checks"] == 3 and stats["duplicates"] == 1 and stats["summaries_reused"] == 1
+    assert "duplicates" not in api.get("/api/chat/stats").json()
+
+
+def test_duplicate_of_a_pending_ticket_stays_pending_but_linked(api, db, indexes):
+    original = create(api, ORIGINAL)
+    copy = create(api, COPY)
+    assert copy["duplicate_of"] == original["id"]
+    assert copy["summary_status"] == "pending" and copy["ai_summary"] is None
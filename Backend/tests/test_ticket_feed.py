@@ -0,0 +1,107 @@
+import asyncio
+import datetime
+from bson import ObjectId
+from Config.ticket_feed import TicketFeed
+
+
+def ticket(updated_at, **fields):
+    return {"_id": ObjectId(), "title": "T", "description": "D", "category": "AI",
+            "created_at": updated_at, "updated_at": updated_at, **fields}
+
+
+def test_reconnect_after_the_only_client_left_replays_missed_events(db):
+    async def main():
+        feed = TicketFeed(poll_interval=60, linger=5)
+        queue, missed = feed.subscribe()
+        assert missed == []
+        feed._publish("insert", ticket(datetime.datetime(2026, 1, 1)))
+        event_id, _ = await queue.get()
+        feed.unsubscribe(queue)  # the single tab reloads
+
+        feed._publish("update", ticket(datetime.datetime(2026, 1, 2)))
+        queue, missed = feed.subscribe(event_id)
+        assert [event["type"] for _, event in missed] == ["update"]
+        feed.unsubscribe(queue)
+        await feed.stop()
+
+    asyncio.run(main())
+
+
+def test_reconnect_after_the_linger_period_is_told_to_reset(db):
+    async def main():
+        feed = TicketFeed(poll_interval=60, linger=0.01)
+        queue, _ = feed.subscribe()
+        feed._publish("insert", ticket(datetime.datetime(2026, 1, 1)))
+        event_id, _ = await queue.get()
+        feed.unsubscribe(queue)
+        await asyncio.sleep(0.05)
+        assert feed.task is None
+
+        queue, missed = feed.subscribe(event_id)
+        assert missed is None
+        await feed.stop()
+
+    asyncio.run(main())
+
+
+def test_unknown_or_malformed_event_ids_cannot_resume(db):
+    async def main():
+        feed = TicketFeed(poll_interval=60)
+        _, missed = feed.subscribe("other-3")
+        assert missed is None
+        _, missed = feed.subscribe(f"{feed.epoch}-x")
+        assert missed is None
+        await feed.stop()
+
+    asyncio.run(main())
+
+
+def test_slow_subscriber_is_dropped(db):
+    async def main():
+        feed = TicketFeed(queue_size=2, poll_interval=60)
+        queue, _ = feed.subscribe()
+        for day in range(1, 4):
+            feed._publish("insert", ticket(datetime.datetime(2026, 1, day)))
+        assert queue not in feed.subscribers
+        assert await queue.get() is None
+        await feed.stop()
+
+    asyncio.run(main())
+
+
+def test_poll_reads_every_ticket_sharing_one_updated_at_exactly_once(db):
+    moment = datetime.datetime(2026, 1, 1, 12)
+    db.tickets.docs.extend(ticket(moment) for _ in range(7))
+
+    async def main():
+        feed = TicketFeed(queue_size=3, poll_interval=60)
+        position = await feed._poll_once(db, (moment - datetime.timedelta(seconds=1), ObjectId("0" * 24)))
+        published = [event["ticket"]["id"] for _, event in feed.replay]
+        assert sorted(published) == sorted(str(doc["_id"]) for doc in db.tickets.docs)
+        assert position == (moment, max(doc["_id"] for doc in db.tickets.docs))
+
+        # Nothing new: the next poll publishes nothing
+        assert await feed._poll_once(db, position) == position
+        assert len(feed.replay) == 7
+
+    asyncio.run(main())
+
+
+def test_feed_falls_back_to_polling_without_change_streams(db):
+    async def main():
+        feed = TicketFeed(poll_interval=0.01)
+        queue, _ = feed.subscribe()
+        await asyncio.sleep(0.02)
+        assert feed.mode == "polling"
+        db.tickets.docs.append(ticket(datetime.datetime.utcnow() + datetime.timedelta(seconds=1)))
+        event_id, event = await asyncio.wait_for(queue.get(), 1)
+        assert event["type"] == "insert"
+        await feed.stop()
+
+    asyncio.run(main())
+
+
+def test_feed_counters_are_served_with_the_ticket_stats(api):
+    stats = api.get("/api/tickets/stats").json()
+    assert set(stats["ticket_feed"]) == {"mode", "running", "subscribers", "last_event_id"}
+    assert "ticket_feed" not in api.get("/api/chat/stats").json()
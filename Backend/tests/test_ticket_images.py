@@ -0,0 +1,107 @@
+"""Ticket images: upload, strong ETags and byte ranges (Config/image_store.py, GET /api/tickets/images/{id})."""
+
+import asyncio
+import hashlib
+import pytest
+from Config.image_store import LocalImageStore
+from Controllers import post_controller
+
+IMAGE = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = LocalImageStore(str(tmp_path))
+    monkeypatch.setattr(post_controller, "image_store", store)
+    return store
+
+
+@pytest.fixture
+def image_path(api, store):
+    response = api.post("/api/tickets/images", content=IMAGE, headers={"Content-Type": "image/png"})
+    assert response.status_code == 200
+    return response.json()["image"]
+
+
+def test_upload_is_content_addressed_and_deduplicated(api, store, image_path):
+    assert image_path.endswith(hashlib.sha256(IMAGE).hexdigest())
+    again = api.post("/api/tickets/images", content=IMAGE, headers={"Content-Type": "image/png"})
+    assert again.json()["image"] == image_path
+    assert store.stats() == {"backend": "local", "stored": 1, "deduplicated": 1}
+
+
+def test_full_image_and_not_modified(api, image_path):
+    response = api.get(image_path)
+    assert response.status_code == 200
+    assert response.content == IMAGE
+    assert response.headers["content-type"] == "image/png"
+    assert "immutable" in response.headers["cache-control"]
+    etag = response.headers["etag"]
+    assert api.get(image_path, headers={"If-None-Match": etag}).status_code == 304
+    assert api.get(image_path, headers={"If-None-Match": "W/" + etag}).status_code == 304
+
+
+def test_ranges(api, image_path):
+    partial = api.get(image_path, headers={"Range": "bytes=10-19"})
+    assert partial.status_code == 206
+    assert partial.content == IMAGE[10:20]
+    assert partial.headers["content-range"] == f"bytes 10-19/{len(IMAGE)}"
+
+    suffix = api.get(image_path, headers={"Range": "bytes=-8"})
+    assert suffix.status_code == 206 and suffix.content == IMAGE[-8:]
+
+    unsatisfiable = api.get(image_path, headers={"Range": f"bytes={len(IMAGE)}-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == f"bytes */{len(IMAGE)}"
+
+    # A stale If-Range sends the whole image
+    stale = api.get(image_path, headers={"Range": "bytes=0-3", "If-Range": '"other"'})
+    assert stale.status_code == 200 and stale.content == IMAGE
+
+
+def test_unknown_and_invalid_images(api, store):
+    assert api.get("/api/tickets/images/" + "0" * 64).status_code == 404
+    assert api.get("/api/tickets/images/not-a-hash").status_code == 400
+
+
+def test_rejects_unsupported_types(api, store):
+    response = api.post("/api/tickets/images", content=b"<svg/>", headers={"Content-Type": "image/svg+xml"})
+    assert response.status_code == 415
+
+
+def test_parse_range():
+    assert post_controller.parse_range("bytes=0-9", 100) == (0, 9)
+    assert post_controller.parse_range("bytes=90-", 100) == (90, 99)
+    assert post_controller.parse_range("bytes=95-200", 100) == (95, 99)
+    assert post_controller.parse_range("bytes=-200", 100) == (0, 99)
+    assert post_controller.parse_range("bytes=0-1,5-6", 100) is None
+    assert post_controller.parse_range("items=0-1", 100) is None
+    with pytest.raises(ValueError):
+        post_controller.parse_range("bytes=100-", 100)
+
+
+def test_local_store_touches_the_disk_off_the_event_loop(tmp_path, monkeypatch):
+    store = LocalImageStore(str(tmp_path))
+    on_loop = []
+    stat = LocalImageStore._stat
+
+    def recording_stat(path):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return stat(path)
+
+    monkeypatch.setattr(LocalImageStore, "_stat", staticmethod(recording_stat))
+
+    async def scenario():
+        image_id = await store.put(IMAGE, "image/png")
+        image = await store.open(image_id)
+        data = b"".join([chunk async for chunk in image.iter_range(8, 15)])
+        return image, data, await store.open("f" * 64)
+
+    image, data, missing = asyncio.run(scenario())
+    assert (image.length, image.content_type, data) == (len(IMAGE), "image/png", IMAGE[8:16])
+    assert missing is None
+    assert on_loop == [False, False]
@@ -0,0 +1,85 @@
+import asyncio
+import datetime
+from bson import ObjectId
+from Config.ticket_list_cache import ticket_list_cache, accepted_encodings, etag_matches
+
+
+def add_ticket(db, title: str, created_at: datetime.datetime = None):
+    created_at = created_at or datetime.datetime(2026, 1, 1) + datetime.timedelta(seconds=len(db.tickets.docs))
+    db.tickets.docs.append({
+        "_id": ObjectId(), "title": title, "description": "x" * 200, "category": "AI", "tags": [],
+        "created_at": created_at, "updated_at": created_at,
+    })
+
+
+def test_if_none_match_gets_304_until_the_list_changes(api, db):
+    for i in range(5):
+        add_ticket(db, f"Ticket {i}")
+    first = api.get("/api/tickets/")
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    cached = api.get("/api/tickets/", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert api.get("/api/tickets/stats").json()["ticket_list"]["not_modified"] >= 1
+    assert "ticket_list" not in api.get("/api/chat/stats").json()
+
+    add_ticket(db, "Newest")
+    ticket_list_cache.invalidate()
+    changed = api.get("/api/tickets/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()[0]["title"] == "Newest"
+
+
+def test_pages_are_served_from_cache_while_the_version_holds(api, db):
+    add_ticket(db, "Only")
+    api.get("/api/tickets/")
+    hits = ticket_list_cache.hits
+    api.get("/api/tickets/")
+    assert ticket_list_cache.hits == hits + 1
+
+
+def test_version_query_sorts_on_the_updated_at_index_only(db):
+    calls = []
+    find_one = db.tickets.find_one
+
+    async def recording_find_one(*args, **kwargs):
+        calls.append(kwargs.get("sort"))
+        return await find_one(*args, **kwargs)
+
+    db.tickets.find_one = recording_find_one
+    add_ticket(db, "One")
+    asyncio.run(ticket_list_cache._query_version())
+    assert calls == [[("updated_at", -1)]]
+
+
+def test_large_pages_are_compressed_per_accept_encoding(api, db):
+    for i in range(40):
+        add_ticket(db, f"Ticket {i}")
+    plain = api.get("/api/tickets/", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in plain.headers
+
+    br = api.get("/api/tickets/", headers={"Accept-Encoding": "br"})
+    assert br.headers["Content-Encoding"] == "br"
+    assert br.headers["Vary"] == "Accept-Encoding"
+    assert br.json() == plain.json()
+    gz = api.get("/api/tickets/", headers={"Accept-Encoding": "gzip, br;q=0"})
+    assert gz.headers["Content-Encoding"] == "gzip"
+    assert gz.json() == plain.json()
+
+
+def test_accepted_encodings_honours_zero_quality():
+    assert accepted_encodings("gzip, br;q=0, deflate;q=0.5") == {"gzip", "deflate"}
+    assert accepted_encodings(None) == set()
+
+
+def test_etag_matching_is_weak_and_supports_lists_and_star():
+    etag = 'W/"abc"'
+    assert etag_matches(etag, 'W/"abc"')
+    assert etag_matches(etag, '"abc"')
+    assert etag_matches(etag, '"other", W/"abc"')
+    assert etag_matches(etag, "*")
+    assert not etag_matches(etag, '"other"')
+    assert not etag_matches(etag, None)
@@ -0,0 +1,68 @@
+import datetime
+from bson import ObjectId
+
+
+def add_tickets(db, count: int, same_time_every: int = 3):
+    """Inserts `count` tickets; every `same_time_every` share a created_at, to exercise the _id tiebreak."""
+    start = datetime.datetime(2026, 1, 1)
+    for i in range(count):
+        created_at = start + datetime.timedelta(minutes=i // same_time_every)
+        db.tickets.docs.append({
+            "_id": ObjectId(),
+            "title": f"Ticket {i}",
+            "description": f"Description {i}",
+            "category": "AI",
+            "tags": [],
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+
+
+def fetch_all(api, **params):
+    """Follows X-Next-Cursor like the frontend's ticketService.getAllTickets."""
+    tickets, cursor, pages = [], None, 0
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        response = api.get("/api/tickets/", params=query)
+        assert response.status_code == 200
+        tickets.extend(response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return tickets, pages
+
+
+def test_default_page_is_bounded_and_has_a_cursor(api, db):
+    add_tickets(db, 75)
+    response = api.get("/api/tickets/")
+    assert len(response.json()) == 50
+    assert response.headers["X-Next-Cursor"]
+
+
+def test_following_cursors_returns_every_ticket_once_newest_first(api, db):
+    add_tickets(db, 130)
+    tickets, pages = fetch_all(api, limit=50)
+    assert pages == 3
+    ids = [ticket["id"] for ticket in tickets]
+    assert len(ids) == len(set(ids)) == 130
+    keys = [(ticket["created_at"], ticket["id"]) for ticket in tickets]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_last_page_has_no_cursor(api, db):
+    add_tickets(db, 50)
+    response = api.get("/api/tickets/", params={"limit": 50})
+    assert len(response.json()) == 50
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_list_view_omits_heavy_fields(api, db):
+    add_tickets(db, 3)
+    ticket = api.get("/api/tickets/", params={"view": "list"}).json()[0]
+    assert "description" not in ticket and "ai_summary" not in ticket
+    assert ticket["title"].startswith("Ticket")
+
+
+def test_invalid_cursor_is_rejected(api, db):
+    add_tickets(db, 3)
+    assert api.get("/api/tickets/", params={"cursor": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,47 @@
+import datetime
+from bson import ObjectId
+
+
+def add(db, title, category="AI", tags=(), minute=0, **fields):
+    created_at = datetime.datetime(2026, 1, 1) + datetime.timedelta(minutes=minute)
+    db.tickets.docs.append({
+        "_id": ObjectId(), "title": title, "description": f"About {title}", "category": category,
+        "tags": list(tags), "created_at": created_at, "updated_at": created_at, **fields,
+    })
+
+
+def test_search_matches_text_and_reports_facets(api, db):
+    add(db, "Neural networks", tags=["ml", "deep"], minute=1)
+    add(db, "Podcast on networks", category="Podcast", tags=["audio"], minute=2)
+    add(db, "Calculus", category="Math", minute=3)
+
+    result = api.get("/api/tickets/search", params={"q": "networks"}).json()
+    assert [t["title"] for t in result["tickets"]] == ["Podcast on networks", "Neural networks"]
+    assert result["facets"]["total"] == 2
+    assert result["facets"]["categories"] == {"AI": 1, "Podcast": 1}
+    assert result["facets"]["tags"] == {"audio": 1, "deep": 1, "ml": 1}
+
+
+def test_search_filters_by_category_and_all_tags(api, db):
+    add(db, "One", tags=["ml", "deep"], minute=1)
+    add(db, "Two", tags=["ml"], minute=2)
+    add(db, "Three", category="Math", tags=["ml", "deep"], minute=3)
+
+    result = api.get("/api/tickets/search", params=[("category", "AI"), ("tag", "ml"), ("tag", "deep")]).json()
+    assert [t["title"] for t in result["tickets"]] == ["One"]
+
+
+def test_search_pages_with_cursor_and_facets_only_on_the_first_page(api, db):
+    for minute in range(5):
+        add(db, f"Topic {minute}", minute=minute)
+    first = api.get("/api/tickets/search", params={"q": "topic", "limit": 3})
+    assert first.headers["X-Next-Cursor"] == first.json()["next_cursor"]
+    second = api.get("/api/tickets/search", params={"q": "topic", "limit": 3, "cursor": first.json()["next_cursor"]}).json()
+    assert second["facets"] is None
+    assert second["next_cursor"] is None
+    titles = [t["title"] for t in first.json()["tickets"] + second["tickets"]]
+    assert titles == [f"Topic {m}" for m in range(4, -1, -1)]
+
+
+def test_search_rejects_unknown_categories(api, db):
+    assert api.get("/api/tickets/search", params={"category": "Cooking"}).status_code == 400
@@ -0,0 +1,100 @@
+"""Related-ticket vector index (Config/ticket_vectors.py) and GET /api/tickets/{id}/related."""
+
+import asyncio
+import datetime
+import numpy as np
+import pytest
+from Config.ticket_vectors import VectorIndex, vectorize, tokenize
+from Controllers import post_controller
+
+TICKETS = {
+    "recursion": {"title": "Recursion base case", "tags": ["python", "recursion"],
+                  "description": "My recursive function never reaches the base case."},
+    "recursion-2": {"title": "Infinite recursion error", "tags": ["recursion"],
+                    "description": "RecursionError: maximum recursion depth exceeded in my function."},
+    "sql": {"title": "SQL join returns duplicates", "tags": ["sql"],
+            "description": "An inner join over orders and customers returns duplicate rows."},
+}
+
+
+def test_vectors_are_deterministic_unit_length():
+    vector = vectorize(TICKETS["recursion"], 64)
+    assert vector.dtype == np.float32
+    assert np.isclose(np.linalg.norm(vector), 1.0)
+    assert np.array_equal(vector, vectorize(dict(TICKETS["recursion"]), 64))
+    assert not vectorize({"title": "the and of"}, 64).any()
+    assert tokenize("What is a B-Tree?") == ["tree"]
+
+
+def test_related_ranks_similar_tickets_first():
+    index = VectorIndex(dim=256, min_score=0.05)
+    for ticket_id, ticket in TICKETS.items():
+        index.add(ticket_id, ticket)
+    related = index.related("recursion", k=2)
+    assert related[0][0] == "recursion-2"
+    assert all(ticket_id != "recursion" for ticket_id, _ in related)
+    assert index.related("unknown") == []
+    # An unindexed ticket is added on the fly
+    assert index.related("new", ticket={"title": "SQL join duplicates", "tags": ["sql"]})[0][0] == "sql"
+
+
+def test_top_k_matches_brute_force_across_growth():
+    rng = np.random.default_rng(7)
+    index = VectorIndex(dim=32, min_score=-1.0)
+    vectors = rng.standard_normal((1500, 32)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    index.add_many([str(i) for i in range(1500)], vectors)  # grows past the first 1024 columns
+    queries = vectors[:3]
+    results = index.top_k(queries, k=5, exclude=["0", "1", "2"])
+    for row, query in enumerate(queries):
+        scores = vectors @ query
+        scores[row] = -np.inf
+        expected = [str(i) for i in np.argsort(-scores)[:5]]
+        assert [ticket_id for ticket_id, _ in results[row]] == expected
+
+
+def test_backfill_from_the_database(db):
+    now = datetime.datetime.utcnow()
+    asyncio.run(db.tickets.insert_many([{**t, "created_at": now} for t in TICKETS.values()]))
+
+    async def scenario():
+        index = VectorIndex(sync_interval=60)
+        await index.start()
+        for _ in range(100):
+            if index.ready:
+                break
+            await asyncio.sleep(0.01)
+        await index.stop()
+        return index.stats()
+
+    assert asyncio.run(scenario()) == {"ready": True, "tickets": 3, "dim": 256}
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = VectorIndex(min_score=0.05)
+    monkeypatch.setattr(post_controller, "ticket_index", index)
+    return index
+
+
+def test_related_route(api, db, index):
+    now = datetime.datetime.utcnow()
+    ids = {}
+    for key, ticket in TICKETS.items():
+        doc = {**ticket, "ai_summary": f"Summary of {key}", "summary_status": "completed", "image": "x" * 100,
+               "created_at": now, "updated_at": now}
+        asyncio.run(db.tickets.insert_one(doc))
+        ids[key] = str(doc["_id"])
+    index.add(ids["recursion-2"], TICKETS["recursion-2"])
+    index.add(ids["sql"], TICKETS["sql"])
+
+    # "recursion" is not indexed yet: it is read from the database and added
+    response = api.get(f"/api/tickets/{ids['recursion']}/related")
+    assert response.status_code == 200
+    related = response.json()
+    assert related[0]["id"] == ids["recursion-2"]
+    assert related[0]["ai_summary"] == "Summary of recursion-2"
+    assert 0 < related[0]["score"] <= 1
+    assert "image" not in related[0]
+    assert api.get(f"/api/tickets/{'0' * 24}/related").status_code == 404
+    assert api.get("/api/tickets/not-an-id/related").status_code == 400
@@ -0,0 +1,144 @@
+"""Token budgets (Config/token_budget.py) and the off-loop rate-limit check (Config/limiter.py)."""
+
+import asyncio
+from types import SimpleNamespace
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from limits import parse
+from slowapi import _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from slowapi.util import get_remote_address
+from Config import chat_history
+from Config.limiter import OffloadingLimiter
+from Config.token_budget import TokenBudget, MeteredStream, estimate_tokens, estimate_message_tokens
+
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class FakeStream:
+    def __init__(self, parts):
+        self.parts = list(parts)
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.parts:
+            raise StopAsyncIteration
+        return chunk(self.parts.pop(0))
+
+    async def close(self):
+        self.closed = True
+
+
+def test_estimate_is_shared_with_chat_history():
+    assert chat_history.estimate_tokens is estimate_tokens
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+    assert estimate_message_tokens([{"content": "abcd"}, {"content": "abcdefgh"}]) >= 3
+
+
+def test_route_budget_rejects_once_spent():
+    async def scenario():
+        budget = TokenBudget(routes={"global_chat": parse("100/hour")})
+        assert await budget.allow_route("global_chat", "1.2.3.4")
+        await budget.charge_route("global_chat", "1.2.3.4", 60)
+        assert await budget.allow_route("global_chat", "1.2.3.4")
+        # Larger than what is left: fills the window instead of being dropped
+        await budget.charge_route("global_chat", "1.2.3.4", 80)
+        allowed = await budget.allow_route("global_chat", "1.2.3.4")
+        other = await budget.allow_route("global_chat", "5.6.7.8")
+        return allowed, other, budget.stats()
+
+    allowed, other, stats = asyncio.run(scenario())
+    assert not allowed
+    assert other
+    assert stats["charged_tokens"] == {"route:global_chat": 140}
+    assert stats["rejected"] == 1
+
+
+def test_unbudgeted_routes_and_models_are_always_allowed():
+    async def scenario():
+        budget = TokenBudget(models={"*": parse("10/hour")})
+        await budget.charge_route("ticket_chat", "client", 10_000)
+        await budget.charge_model("model-a", 50)
+        return (
+            await budget.allow_route("ticket_chat", "client"),
+            await budget.model_available("model-a"),
+            await budget.model_available("model-b"),
+        )
+
+    assert asyncio.run(scenario()) == (True, False, True)
+
+
+def test_metered_stream_charges_prompt_and_answer_once():
+    async def scenario():
+        budget = TokenBudget()
+        upstream = FakeStream(["abcd", "efgh", "i"])
+        stream = MeteredStream(upstream, budget, "model-a", prompt_tokens=10)
+        text = "".join([c.choices[0].delta.content async for c in stream])
+        await stream.close()
+        return text, upstream.closed, budget.charged
+
+    text, closed, charged = asyncio.run(scenario())
+    assert text == "abcdefghi"
+    assert closed
+    assert charged["model:model-a"] == 10 + 3
+
+
+def test_aborted_stream_is_charged_on_close():
+    async def scenario():
+        budget = TokenBudget()
+        stream = MeteredStream(FakeStream(["abcdefgh", "more"]), budget, "model-a", prompt_tokens=5)
+        await stream.__anext__()
+        await stream.close()
+        return budget.charged
+
+    assert asyncio.run(scenario())["model:model-a"] == 5 + 2
+
+
+def limited_app(offload):
+    limiter = OffloadingLimiter(key_func=get_remote_address, offload=offload)
+    on_loop = []  # per check: whether it ran on the event loop thread
+    check = limiter._check_request_limit
+
+    def recording_check(*args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return check(*args, **kwargs)
+
+    limiter._check_request_limit = recording_check
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+    @app.get("/limited")
+    @limiter.limit("2/minute")
+    async def limited(request: Request):
+        return {"ok": True}
+
+    return app, on_loop
+
+
+def test_offloaded_limit_checks_in_a_worker_thread():
+    app, on_loop = limited_app(offload=True)
+    with TestClient(app) as client:
+        codes = [client.get("/limited").status_code for _ in range(3)]
+    assert codes == [200, 200, 429]
+    # Checked once per request, never on the event loop
+    assert on_loop == [False, False, False]
+
+
+def test_memory_limits_stay_inline():
+    app, on_loop = limited_app(offload=False)
+    with TestClient(app) as client:
+        codes = [client.get("/limited").status_code for _ in range(3)]
+    assert codes == [200, 200, 429]
+    assert on_loop == [True, True, True]
@@ -0,0 +1,98 @@
+"""Request tracing, spans and Prometheus metrics (Config/tracing.py)."""
+
+import asyncio
+import time
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from Config import tracing
+from Config.tracing import (
+    MetricsRegistry, TracingMiddleware, TracedStream, current_request_id,
+    render_metrics, route_template, span, span_seconds, request_seconds,
+)
+from tests.fake_ai import FakeStream
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry(prefix="test_")
+    histogram = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, "/a")
+    lines = registry.render().splitlines()
+    assert 'test_latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{route="/a",le="1.0"} 2' in lines
+    assert 'test_latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'test_latency_seconds_count{route="/a"} 3' in lines
+    assert 'test_latency_seconds_sum{route="/a"} 5.55' in lines
+
+
+def test_counters_gauges_and_label_escaping():
+    registry = MetricsRegistry(prefix="test_")
+    counter = registry.counter("events_total", "Events.", ("kind",))
+    gauge = registry.gauge("open", "Open things.")
+    counter.inc(2, 'say "hi"')
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+    text = registry.render()
+    assert "# TYPE test_events_total counter" in text
+    assert 'test_events_total{kind="say \\"hi\\""} 2' in text
+    assert "# TYPE test_open gauge" in text
+    assert "test_open 1" in text
+
+
+def test_route_template_hides_ids():
+    assert route_template("/api/tickets/abc123/related", {"ticket_id": "abc123"}) == "/api/tickets/{ticket_id}/related"
+    assert route_template("/api/tickets", None) == "/api/tickets"
+
+
+def test_spans_outside_a_request_are_background():
+    with span("test.background_step"):
+        pass
+    assert ("background", "test.background_step") in span_seconds.series
+
+
+def traced_app():
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware, slow_request=60.0)
+    seen = {}
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        with span("test.lookup"):
+            seen["request_id"] = current_request_id()
+        return {"id": item_id}
+
+    return app, seen
+
+
+def test_middleware_echoes_request_ids_and_records_route_templates():
+    app, seen = traced_app()
+    with TestClient(app) as client:
+        given = client.get("/items/42", headers={"X-Request-Id": "req-1"})
+        generated = client.get("/items/43", headers={"X-Request-Id": "not valid!"})
+    assert given.headers["x-request-id"] == "req-1"
+    assert generated.headers["x-request-id"] not in ("req-1", "not valid!")
+    assert seen["request_id"] == generated.headers["x-request-id"]
+    assert ("/items/{item_id}", "GET", "200") in request_seconds.series
+    assert ("/items/{item_id}", "test.lookup") in span_seconds.series
+    assert current_request_id() is None
+
+
+def test_traced_stream_records_ttft_and_tokens():
+    async def scenario():
+        stream = TracedStream(FakeStream(["a", "b", "c"], delay=0.01), "test-model", time.perf_counter())
+        text = "".join([c.choices[0].delta.content async for c in stream])
+        await stream.close()  # recorded once, however the stream ended
+        return text
+
+    assert asyncio.run(scenario()) == "abc"
+    assert tracing.ai_stream_tokens.series[("test-model",)] == 3
+    assert sum(tracing.ai_ttft_seconds.series[("test-model",)][0]) == 1
+    assert sum(tracing.ai_stream_seconds.series[("test-model",)][0]) == 1
+    assert sum(tracing.ai_tokens_per_second.series[("test-model",)][0]) == 1
+
+
+def test_render_metrics_includes_lost_log_records():
+    text = render_metrics()
+    assert 'thinkback_log_records_lost_total{reason="dropped"}' in text
+    assert "# TYPE thinkback_http_request_duration_seconds histogram" in text
@@ -1,23 +1,39 @@
 /**
  * Tickets Page Component
  * 
- * Displays all tickets from the database in a grid layout.
+ * Displays tickets from the database in a grid layout, one page at a time;
+ * the next page loads when the end of the grid scrolls into view (or on "Load more").
  * Create a new ticket button should open a modal to create a new ticket.
  */
 
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { Link, useLocation } from 'react-router-dom';
 import ScaleLoader from '../Common/loader';
-import { formatDate, formatCategory, truncateWords } from '../../utils/formatters';
+import { formatDate, formatCategory, truncateWords, resolveImageUrl } from '../../utils/formatters';
 import useTickets from '../../Hooks/useTickets';
 import CreateNewTicket from '../Forms/createNewTicket';
 import Footer from './footer';
 import '../../Styles/tickets.css';
 
 const Tickets = () => {
-    const { tickets, loading, error, fetchTickets } = useTickets(true);
+    const { tickets, loading, loadingMore, hasMore, error, fetchTickets, loadMoreTickets } = useTickets(true);
     const [isCreateModalOpen, setIsCreateModalOpen] = useState(false);
     const location = useLocation();
+    const loadMoreRef = useRef<HTMLDivElement>(null);
+
+    // Load the next page once the end of the grid comes into view
+    useEffect(() => {
+        const sentinel = loadMoreRef.current;
+        if (!sentinel || !hasMore) return;
+        const observer = new IntersectionObserver(
+            (entries) => {
+                if (entries[0].isIntersecting) loadMoreTickets();
+            },
+            { rootMargin: '400px' }
+        );
+        observer.observe(sentinel);
+        return () => observer.disconnect();
+    }, [loading, hasMore, loadMoreTickets]);
 
     // Handle auto-opening modal from dashboard navigation
     useEffect(() => {
@@ -93,7 +109,7 @@ const Tickets = () => {
                                 <div className="ticket-image-container">
                                     {ticket.image ? (
                                         <img
-                                            src={ticket.image}
+                                            src={resolveImageUrl(ticket.image)}
                                             alt={ticket.title}
                                             className="ticket-image"
                                             onError={(e) => {
@@ -156,6 +172,24 @@ const Tickets = () => {
                         ))}
                     </div>
                 )}
+
+                {/* Next Page */}
+                {!loading && hasMore && (
+                    <div ref={loadMoreRef} className="tickets-load-more">
+                        {loadingMore ? (
+                            <ScaleLoader
+                                loading={true}
+                                color="#f97316"
+                                height={25}
+                                width={3}
+                            />
+                        ) : (
+                            <button className="create-ticket-btn" onClick={() => loadMoreTickets()}>
+                                Load more
+                            </button>
+                        )}
+                    </div>
+                )}
             </div>
             <Footer />
         </div>
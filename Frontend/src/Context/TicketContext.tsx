@@ -14,8 +14,11 @@ import logger from '../utils/logger';
 interface TicketContextType {
     tickets: Ticket[];
     loading: boolean;
+    loadingMore: boolean;
+    hasMore: boolean;
     error: string | null;
     fetchTickets: (force?: boolean) => Promise<void>;
+    loadMoreTickets: () => Promise<void>;
     createTicket: (data: TicketCreate) => Promise<Ticket | null>;
 }
 
@@ -24,8 +27,11 @@ const TicketContext = createContext<TicketContextType | undefined>(undefined);
 export const TicketProvider: React.FC<{ children: ReactNode }> = ({ children }) => {
     const [tickets, setTickets] = useState<Ticket[]>([]);
     const [loading, setLoading] = useState<boolean>(false);
+    const [loadingMore, setLoadingMore] = useState<boolean>(false);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
     const [error, setError] = useState<string | null>(null);
 
+    // Loads only the first page; further pages come from loadMoreTickets
     const fetchTickets = useCallback(async (force: boolean = false) => {
         // If we already have tickets and aren't forcing a refresh, skip
         if (tickets.length > 0 && !force) return;
@@ -34,9 +40,10 @@ export const TicketProvider: React.FC<{ children: ReactNode }> = ({ children })
         setError(null);
         try {
             logger.info('Fetching tickets (global)...');
-            const data = await ticketService.getAllTickets();
-            setTickets(data);
-            logger.info(`Fetched ${data.length} tickets globally`);
+            const page = await ticketService.getTicketsPage();
+            setTickets(page.tickets);
+            setNextCursor(page.nextCursor);
+            logger.info(`Fetched ${page.tickets.length} tickets globally`);
         } catch (err: any) {
             const errorMessage = err.message || 'Failed to fetch tickets';
             setError(errorMessage);
@@ -46,6 +53,29 @@ export const TicketProvider: React.FC<{ children: ReactNode }> = ({ children })
         }
     }, [tickets.length]);
 
+    const loadMoreTickets = useCallback(async () => {
+        if (!nextCursor || loadingMore) return;
+
+        setLoadingMore(true);
+        setError(null);
+        try {
+            const page = await ticketService.getTicketsPage(nextCursor);
+            // Skip tickets already shown (e.g. created locally while paging)
+            setTickets((prev) => {
+                const seen = new Set(prev.map((ticket) => ticket.id));
+                return [...prev, ...page.tickets.filter((ticket) => !seen.has(ticket.id))];
+            });
+            setNextCursor(page.nextCursor);
+            logger.info(`Loaded ${page.tickets.length} more tickets`);
+        } catch (err: any) {
+            const errorMessage = err.message || 'Failed to load more tickets';
+            setError(errorMessage);
+            logger.error('Error loading more tickets:', err);
+        } finally {
+            setLoadingMore(false);
+        }
+    }, [nextCursor, loadingMore]);
+
     const createTicket = useCallback(async (data: TicketCreate): Promise<Ticket | null> => {
         setLoading(true);
         setError(null);
@@ -68,8 +98,11 @@ export const TicketProvider: React.FC<{ children: ReactNode }> = ({ children })
     const value = {
         tickets,
         loading,
+        loadingMore,
+        hasMore: nextCursor !== null,
         error,
         fetchTickets,
+        loadMoreTickets,
         createTicket,
     };
 
@@ -2,7 +2,7 @@
  * useTickets Hook
  * 
  * Custom React hook for managing ticket operations.
- * Provides state management for fetching and creating tickets.
+ * Provides state management for fetching (page by page) and creating tickets.
  */
 
 import { useEffect, useCallback } from 'react';
@@ -12,14 +12,17 @@ import type { Ticket, TicketCreate } from '../Types/ticket.types';
 interface UseTicketsReturn {
     tickets: Ticket[];
     loading: boolean;
+    loadingMore: boolean;
+    hasMore: boolean;
     error: string | null;
     fetchTickets: (force?: boolean) => Promise<void>;
+    loadMoreTickets: () => Promise<void>;
     createTicket: (data: TicketCreate) => Promise<Ticket | null>;
     refreshTickets: () => Promise<void>;
 }
 
 export const useTickets = (autoFetch: boolean = true): UseTicketsReturn => {
-    const { tickets, loading, error, fetchTickets, createTicket } = useTicketContext();
+    const { tickets, loading, loadingMore, hasMore, error, fetchTickets, loadMoreTickets, createTicket } = useTicketContext();
 
     const refreshTickets = useCallback(async () => {
         await fetchTickets(true); // Force refresh
@@ -35,8 +38,11 @@ export const useTickets = (autoFetch: boolean = true): UseTicketsReturn => {
     return {
         tickets,
         loading,
+        loadingMore,
+        hasMore,
         error,
         fetchTickets,
+        loadMoreTickets,
         createTicket,
         refreshTickets,
     };
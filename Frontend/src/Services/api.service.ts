@@ -12,6 +12,11 @@ interface ApiRequestOptions extends RequestInit {
     timeout?: number;
 }
 
+interface ApiResponse<T> {
+    data: T;
+    headers: Headers;
+}
+
 interface ApiError {
     message: string;
     status?: number;
@@ -32,6 +37,17 @@ class ApiService {
         endpoint: string,
         options: ApiRequestOptions = {}
     ): Promise<T> {
+        const { data } = await this.requestWithHeaders<T>(endpoint, options);
+        return data;
+    }
+
+    /**
+     * Same as request, but also returns the response headers (e.g. pagination cursors)
+     */
+    async requestWithHeaders<T>(
+        endpoint: string,
+        options: ApiRequestOptions = {}
+    ): Promise<ApiResponse<T>> {
         const { timeout = 30000, ...fetchOptions } = options;
 
         const url = `${this.baseURL}${endpoint}`;
@@ -65,7 +81,7 @@ class ApiService {
 
             const data = await response.json();
             logger.info('API Success:', data);
-            return data as T;
+            return { data: data as T, headers: response.headers };
         } catch (error: any) {
             clearTimeout(timeoutId);
 
@@ -96,6 +112,13 @@ class ApiService {
         return this.request<T>(endpoint, { ...options, method: 'GET' });
     }
 
+    /**
+     * GET request returning the response headers as well
+     */
+    async getWithHeaders<T>(endpoint: string, options?: ApiRequestOptions): Promise<ApiResponse<T>> {
+        return this.requestWithHeaders<T>(endpoint, { ...options, method: 'GET' });
+    }
+
     /**
      * POST request
      */
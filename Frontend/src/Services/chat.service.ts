@@ -13,7 +13,14 @@ export type SSEMessageCallback = (chunk: SSEChunk) => void;
 export type SSECompleteCallback = () => void;
 export type SSEErrorCallback = (error: string) => void;
 
+// Resuming a dropped answer (the backend keeps it for a short while)
+const MAX_RECONNECTS = 3;
+const RECONNECT_DELAY_MS = 1000;
+
 class ChatService {
+    // Backend conversation session per chat endpoint (returned in X-Session-Id)
+    private sessions = new Map<string, string>();
+
     /**
      * Stream global chat responses
      */
@@ -48,7 +55,9 @@ class ChatService {
     }
 
     /**
-     * Internal method to handle SSE streaming
+     * Internal method to handle SSE streaming.
+     * If the connection drops before the answer is finished, the same request is
+     * re-sent with `Last-Event-ID` and the backend continues the running answer.
      */
     private startSSEStream(
         url: string,
@@ -62,57 +71,97 @@ class ChatService {
         logger.info('Starting SSE stream:', url);
 
         let isClosed = false;
-
-        // Use fetch with streaming response
-        fetch(url, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
+        let isFinished = false;
+        let lastEventId: string | null = null;
+        let reconnects = 0;
+
+        const finish = () => { isFinished = true; isClosed = true; };
+        const tracked = {
+            ...callbacks,
+            onError: (error: string) => {
+                isFinished = true;
+                callbacks.onError?.(error);
             },
-            body: JSON.stringify(body),
-        })
-            .then(async (response) => {
-                if (!response.ok) {
-                    throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-                }
+        };
 
-                if (!response.body) {
-                    throw new Error('Response body is null');
-                }
+        const connect = () => {
+            const headers: Record<string, string> = { 'Content-Type': 'application/json' };
+            if (lastEventId) {
+                headers['Last-Event-ID'] = lastEventId;
+            }
 
-                const reader = response.body.getReader();
-                const decoder = new TextDecoder();
-                let buffer = '';
+            // Use fetch with streaming response
+            fetch(url, {
+                method: 'POST',
+                headers,
+                body: JSON.stringify({ ...body, session_id: this.sessions.get(url) }),
+            })
+                .then(async (response) => {
+                    if (!response.ok) {
+                        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+                    }
 
-                while (!isClosed) {
-                    const { done, value } = await reader.read();
+                    const sessionId = response.headers.get('X-Session-Id');
+                    if (sessionId) {
+                        this.sessions.set(url, sessionId);
+                    }
 
-                    if (done) {
-                        logger.info('SSE stream completed');
-                        if (buffer.trim()) {
-                            this.processSSEBuffer(buffer, callbacks, () => { isClosed = true; });
-                        }
-                        callbacks.onComplete?.();
-                        break;
+                    if (!response.body) {
+                        throw new Error('Response body is null');
                     }
 
-                    buffer += decoder.decode(value, { stream: true });
-                    const lines = buffer.split('\n');
+                    const reader = response.body.getReader();
+                    const decoder = new TextDecoder();
+                    let buffer = '';
+
+                    while (!isClosed) {
+                        const { done, value } = await reader.read();
+
+                        if (done) {
+                            if (buffer.trim()) {
+                                this.processSSEBuffer(buffer, tracked, finish);
+                            }
+                            if (!isFinished && lastEventId) {
+                                throw new Error('Stream ended before the answer was complete');
+                            }
+                            logger.info('SSE stream completed');
+                            if (!isClosed) {
+                                callbacks.onComplete?.();
+                            }
+                            break;
+                        }
+
+                        buffer += decoder.decode(value, { stream: true });
+                        const lines = buffer.split('\n');
 
-                    // Keep the last partial line in the buffer
-                    buffer = lines.pop() || '';
+                        // Keep the last partial line in the buffer
+                        buffer = lines.pop() || '';
 
-                    for (const line of lines) {
-                        this.processSSELine(line, callbacks, () => { isClosed = true; });
+                        for (const line of lines) {
+                            if (line.startsWith('id: ')) {
+                                lastEventId = line.slice(4).trim();
+                            } else {
+                                this.processSSELine(line, tracked, finish);
+                            }
+                        }
+                    }
+                })
+                .catch((error) => {
+                    if (isClosed) {
+                        return;
+                    }
+                    if (!isFinished && lastEventId && reconnects < MAX_RECONNECTS) {
+                        reconnects += 1;
+                        logger.warn(`SSE stream dropped, resuming after ${lastEventId}:`, error);
+                        setTimeout(connect, RECONNECT_DELAY_MS * reconnects);
+                        return;
                     }
-                }
-            })
-            .catch((error) => {
-                if (!isClosed) {
                     logger.error('SSE stream error:', error);
                     callbacks.onError?.(error.message || 'Stream connection failed');
-                }
-            });
+                });
+        };
+
+        connect();
 
         // Return cleanup function
         return () => {
@@ -5,15 +5,24 @@
  */
 
 import { API_ENDPOINTS } from '../config/constants';
-import type { Ticket, TicketCreate } from '../Types/ticket.types';
+import type { Ticket, TicketCreate, TicketPage } from '../Types/ticket.types';
 import apiService from './api.service';
 
+// Tickets per page; further pages are loaded on demand
+export const TICKET_PAGE_SIZE = 30;
+
 class TicketService {
     /**
-     * Get all tickets
+     * Get one page of tickets, newest first. Pass the previous page's
+     * nextCursor (from the X-Next-Cursor header) to get the page after it.
      */
-    async getAllTickets(): Promise<Ticket[]> {
-        return apiService.get<Ticket[]>(API_ENDPOINTS.TICKETS);
+    async getTicketsPage(cursor: string | null = null, limit: number = TICKET_PAGE_SIZE): Promise<TicketPage> {
+        const params = new URLSearchParams({ limit: String(limit) });
+        if (cursor) params.set('cursor', cursor);
+        const { data, headers } = await apiService.getWithHeaders<Ticket[]>(
+            `${API_ENDPOINTS.TICKETS}/?${params.toString()}`
+        );
+        return { tickets: data, nextCursor: headers.get('X-Next-Cursor') };
     }
 
     /**
@@ -22,11 +22,19 @@ export interface TicketCreate extends TicketBase { }
 export interface Ticket extends TicketBase {
     id: string;
     ai_summary?: string;
+    summary_status?: 'pending' | 'completed' | 'failed'; // background AI summary state
+    duplicate_of?: string; // near-duplicate ticket whose summary was reused
     created_at: string; // ISO 8601 datetime string
 }
 
 export interface TicketResponse extends Ticket { }
 
+// One page of GET /api/tickets; nextCursor is null on the last page
+export interface TicketPage {
+    tickets: Ticket[];
+    nextCursor: string | null;
+}
+
 // API Response wrapper
 export interface TicketsResponse {
     tickets: Ticket[];
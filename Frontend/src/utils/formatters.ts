@@ -4,6 +4,8 @@
  * Helper functions for data formatting and text manipulation.
  */
 
+import { API_BASE_URL } from '../config/constants';
+
 /**
  * Format ISO datetime string to readable format
  */
@@ -80,3 +82,11 @@ export const parseTags = (tagsString: string): string[] => {
         .map((tag) => tag.trim())
         .filter((tag) => tag.length > 0);
 };
+
+/**
+ * Resolve a ticket image to a loadable URL.
+ * Stored images come back as backend-relative paths (/api/tickets/images/...).
+ */
+export const resolveImageUrl = (image: string): string => {
+    return image.startsWith('/') ? `${API_BASE_URL}${image}` : image;
+};